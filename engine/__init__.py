@@ -0,0 +1,2 @@
+# Bump whenever audit output changes so incremental runs recompute every youth
+__version__ = "0.2.3"
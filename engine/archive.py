@@ -0,0 +1,343 @@
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from engine.decoder import LogValidationError
+from engine.loader import iter_log_paths, read_youth_log
+from engine.model import FILE_DTYPE, NO_DATE, SessionType, YouthFiles, YouthLog
+from engine.rules import compile_rules
+
+ARCHIVE_DIR = Path("data/archive")
+ARCHIVE_VERSION = 1
+RECORDS_FILE = "sessions.bin"
+NAMES_FILE = "names.txt"
+INDEX_FILE = "index.npy"
+META_FILE = "archive.json"
+COMPACT_RATIO = 0.5  # rewrite sessions.bin once more than this share of it is superseded records
+
+# One fixed-width (16 byte) record per file in a youth's log
+RECORD_DTYPE = np.dtype([
+    ("youth", "<i4"),
+    ("name", "<i4"),  # id of the filename (without the "<youth> " prefix) in names.txt
+    ("date", "<i4"),  # date ordinal, NO_DATE if the filename has none
+    ("session_type", "i1"),  # engine.model.SessionType
+    ("valid_gt", "?"),
+    ("prefixed", "?"),
+    ("docx", "?"),
+])
+
+# One row per youth id: where its records are and the log they came from
+INDEX_DTYPE = np.dtype([
+    ("offset", "<i8"),
+    ("count", "<i8"),  # -1 once the youth's log is gone
+    ("start", "<i4"),
+    ("level", "<i4"),
+    ("size", "<i8"),
+    ("mtime_ns", "<i8"),
+])
+
+def _replace_atomically(path, write):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+class SessionArchive:
+    """Every youth's sessions as fixed-width binary records, memory-mapped for reading.
+
+    Built once from the raw logs and then updated incrementally: only logs whose size
+    or mtime changed are read again, and their new records are appended to
+    sessions.bin. Each youth's records stay contiguous, so reading a youth is a slice of
+    the memory map with no JSON or filename parsing. Filenames are stored once in a
+    string table (without the "<youth> " prefix, so most are shared by every youth),
+    youth names and security levels in archive.json, and the per-youth offsets in
+    index.npy. The index and metadata are replaced atomically after the records are
+    written, so an interrupted update leaves the previous archive readable.
+    """
+
+    def __init__(self, path=ARCHIVE_DIR):
+        self.path = Path(path)
+        self._reset()
+        meta_file = self.path / META_FILE
+        if meta_file.exists():
+            with open(meta_file) as f:
+                meta = json.load(f)
+            if meta.get("version") != ARCHIVE_VERSION:
+                raise ValueError(f"{self.path}: archive version {meta.get('version')}, expected {ARCHIVE_VERSION}; rebuild it")
+            self.youths, self.levels, self.paths = meta["youths"], meta["levels"], meta["paths"]
+            self.record_count, self.names_bytes = meta["records"], meta["names_bytes"]
+            self.index = np.load(self.path / INDEX_FILE)
+        self._map_records()
+
+    def _reset(self):
+        self.youths = []  # youth id -> name
+        self.levels = []  # level id -> security level
+        self.paths = []  # youth id -> raw log path
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self.record_count = 0
+        self.names_bytes = 0
+        self._names = None
+        self._name_ids = None
+        self._youth_ids = None
+        self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def _map_records(self):
+        if self.record_count:
+            self.records = np.memmap(self.path / RECORDS_FILE, dtype=RECORD_DTYPE, mode="r", shape=(self.record_count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    @property
+    def names(self):
+        """The filename string table, read on first use (summary audits never need it)."""
+        if self._names is None:
+            self._names = []
+            if self.names_bytes:
+                with open(self.path / NAMES_FILE, "rb") as f:
+                    data = f.read(self.names_bytes)
+                self._names = json.loads(b"[" + data.rstrip(b"\n").replace(b"\n", b",") + b"]")
+        return self._names
+
+    def youth_id(self, youth):
+        if self._youth_ids is None:
+            self._youth_ids = {name: i for i, name in enumerate(self.youths)}
+        return self._youth_ids[youth]
+
+    def live_ids(self):
+        """Ids of youths whose logs are still present, in log path order."""
+        live = np.flatnonzero(self.index["count"] >= 0)
+        return sorted(live.tolist(), key=lambda i: self.paths[i])
+
+    def __len__(self):
+        return int((self.index["count"] >= 0).sum())
+
+    def youth_records(self, youth_id):
+        """The youth's records: a view into the memory map, nothing is copied or parsed."""
+        row = self.index[youth_id]
+        if row["count"] < 0:
+            raise KeyError(self.youths[youth_id])
+        return self.records[row["offset"]:row["offset"] + row["count"]]
+
+    def youth_log(self, youth_id):
+        """An engine.model.YouthLog rebuilt from the youth's records."""
+        records = self.youth_records(youth_id)
+        info = np.empty(len(records), dtype=FILE_DTYPE)
+        for field in FILE_DTYPE.names:
+            info[field] = records[field]
+        names = self.names
+        youth = self.youths[youth_id]
+        row = self.index[youth_id]
+        files = YouthFiles(youth, tuple(names[i] for i in records["name"].tolist()), info)
+        return YouthLog(youth, self.levels[row["level"]], int(row["start"]), files)
+
+    def session_dates(self, youth_id):
+        """{"GT": {ordinal, ...}, "IT": ..., "FT": ...} like engine.calendar.extract_session_dates."""
+        records = self.youth_records(youth_id)
+        dated = records[records["docx"] & (records["date"] != NO_DATE)]
+        return {
+            label: set(dated["date"][dated["session_type"] == SessionType[label]].tolist())
+            for label in ("GT", "IT", "FT")
+        }
+
+    def update(self, logs_dir, decoder="auto", levels=None, quarantine=None, rebuild=False, log=print):
+        """Bring the archive up to date with logs_dir; returns (read, unchanged, removed) counts."""
+        if rebuild:
+            for name in (META_FILE, INDEX_FILE, RECORDS_FILE, NAMES_FILE):
+                (self.path / name).unlink(missing_ok=True)
+            self._reset()
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self._name_ids is None:
+            self._name_ids = {name: i for i, name in enumerate(self.names)}
+        level_ids = {level: i for i, level in enumerate(self.levels)}
+        by_path = {path: i for i, path in enumerate(self.paths)}
+        index = self.index.tolist()  # (offset, count, start, level, size, mtime_ns) per youth id
+
+        records_file = self.path / RECORDS_FILE
+        names_file = self.path / NAMES_FILE
+        read = unchanged = 0
+        seen = set()
+        # Drop anything an interrupted update wrote past the last saved index
+        with open(records_file, "ab") as records_out, open(names_file, "ab") as names_out:
+            records_out.truncate(self.record_count * RECORD_DTYPE.itemsize)
+            names_out.truncate(self.names_bytes)
+            records_out.seek(0, os.SEEK_END)
+            names_out.seek(0, os.SEEK_END)
+
+            for log_path in sorted(iter_log_paths(logs_dir)):
+                key = str(log_path)
+                stat = log_path.stat()
+                youth_id = by_path.get(key)
+                seen.add(key)
+                if youth_id is not None:
+                    _, count, _, _, size, mtime_ns = index[youth_id]
+                    if count >= 0 and (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                        unchanged += 1
+                        continue
+                try:
+                    youth_log = YouthLog.from_dict(read_youth_log(log_path, decoder, levels))
+                except LogValidationError as e:
+                    if quarantine is not None:
+                        quarantine.append(e.to_dict())
+                    if youth_id is not None:
+                        index[youth_id] = (0, -1, 0, 0, 0, 0)  # like the pipeline, an invalid log is skipped
+                    continue
+
+                if youth_id is None:
+                    youth_id = by_path[key] = len(self.paths)
+                    self.paths.append(key)
+                    self.youths.append(youth_log.youth)
+                    index.append(None)
+                else:
+                    self.youths[youth_id] = youth_log.youth
+                if youth_log.security_level not in level_ids:
+                    level_ids[youth_log.security_level] = len(self.levels)
+                    self.levels.append(youth_log.security_level)
+
+                files = youth_log.files
+                name_ids = np.empty(len(files), dtype=np.int32)
+                for i, suffix in enumerate(files.suffixes):
+                    name_id = self._name_ids.get(suffix)
+                    if name_id is None:
+                        name_id = self._name_ids[suffix] = len(self._names)
+                        self._names.append(suffix)
+                        line = (json.dumps(suffix) + "\n").encode()
+                        names_out.write(line)
+                        self.names_bytes += len(line)
+                    name_ids[i] = name_id
+                records = np.zeros(len(files), dtype=RECORD_DTYPE)
+                records["youth"] = youth_id
+                records["name"] = name_ids
+                for field in FILE_DTYPE.names:
+                    records[field] = files.info[field]
+                records["docx"] = [suffix.lower().endswith(".docx") for suffix in files.suffixes]
+                records_out.write(records.tobytes())
+
+                index[youth_id] = (self.record_count, len(files), youth_log.start_ordinal,
+                                   level_ids[youth_log.security_level], stat.st_size, stat.st_mtime_ns)
+                self.record_count += len(files)
+                read += 1
+
+        removed = 0
+        for key, youth_id in by_path.items():
+            if key not in seen and index[youth_id][1] >= 0:
+                index[youth_id] = (0, -1, 0, 0, 0, 0)
+                removed += 1
+        self.index = np.array(index, dtype=INDEX_DTYPE)
+        self._youth_ids = None
+        self._save()
+        if self.record_count and self.live_records() < self.record_count * (1 - COMPACT_RATIO):
+            self.compact()
+        log(f"🗄️ Archive {self.path}: read {read} log(s), {unchanged} unchanged, {removed} removed, "
+            f"{self.live_records()} session records")
+        return read, unchanged, removed
+
+    def live_records(self):
+        counts = self.index["count"]
+        return int(counts[counts > 0].sum())
+
+    def _save(self):
+        _replace_atomically(self.path / INDEX_FILE, lambda f: np.save(f, self.index))
+        meta = {
+            "version": ARCHIVE_VERSION,
+            "records": self.record_count,
+            "names_bytes": self.names_bytes,
+            "youths": self.youths,
+            "levels": self.levels,
+            "paths": self.paths,
+        }
+        _replace_atomically(self.path / META_FILE, lambda f: f.write(json.dumps(meta).encode()))
+        self._map_records()
+
+    def compact(self):
+        """Rewrite sessions.bin without records superseded by later updates."""
+        live = np.flatnonzero(self.index["count"] > 0)
+        offset = 0
+        index = self.index.copy()
+        tmp = self.path / f".{RECORDS_FILE}.tmp"
+        with open(tmp, "wb") as f:
+            for youth_id in live.tolist():
+                records = self.youth_records(youth_id)
+                f.write(np.ascontiguousarray(records).tobytes())
+                index[youth_id]["offset"] = offset
+                offset += len(records)
+        os.replace(tmp, self.path / RECORDS_FILE)
+        self.index, self.record_count = index, offset
+        self._save()
+
+    def live_mask(self):
+        """Boolean mask over the memory map of records that belong to a youth's current log."""
+        if self.live_records() == self.record_count:
+            return None
+        rows = self.index[self.index["count"] > 0]
+        counts = rows["count"]
+        # Position of every live record: its youth's offset plus its rank within the youth
+        rank = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        mask = np.zeros(self.record_count, dtype=bool)
+        mask[np.repeat(rows["offset"], counts) + rank] = True
+        return mask
+
+    def summary_rows(self, audit_rules):
+        """Dashboard summary rows for every youth, computed over the whole archive at once.
+
+        The same rows a full audit writes to dashboard_summary.json, from one grouped
+        count over the memory-mapped records, without rebuilding any filenames.
+        """
+        plan = compile_rules(audit_rules)
+        live = self.live_ids()
+        youth_count = len(live)
+        # Removed logs keep their row (start 0) but must not size the week grid
+        rows = self.index[live]
+        starts = rows["start"].astype(np.int64)
+        required = np.array([plan.gt_required(self.levels[level]) for level in rows["level"].tolist()], dtype=np.int64)
+        aligned = np.array([plan.aligned_start(s) for s in starts.tolist()], dtype=np.int64)
+        first_week = np.array([plan.first_week(s) for s in starts.tolist()], dtype=np.int64)
+        total_weeks = np.array([plan.total_weeks(s) for s in starts.tolist()], dtype=np.int64)
+        max_weeks = int(total_weeks.max()) if youth_count else 0
+        position = np.full(len(self.youths), -1, dtype=np.int64)
+        position[live] = np.arange(youth_count)
+
+        mask = self.live_mask()
+        records = self.records if mask is None else self.records[mask]
+        record_youth = position[records["youth"]]
+        valid = records["valid_gt"]
+        misnamed = np.bincount(record_youth[~valid], minlength=youth_count)
+
+        gt = valid & (records["date"] != NO_DATE)
+        gt_youth = record_youth[gt]
+        offset = records["date"][gt].astype(np.int64) - aligned[gt_youth]
+        week = offset // 7 + 1
+        keep = (offset >= 0) & (week <= max_weeks)
+        counts = np.bincount(
+            gt_youth[keep] * (max_weeks + 1) + week[keep], minlength=youth_count * (max_weeks + 1)
+        ).reshape(youth_count, max_weeks + 1)
+        week_numbers = np.arange(max_weeks + 1)
+        missing = (
+            (week_numbers >= first_week[:, None])
+            & (week_numbers <= total_weeks[:, None])
+            & (counts < required[:, None])
+        )
+        weeks_missing = missing.sum(axis=1)
+        missing_sessions = (counts * missing).sum(axis=1)
+        return [
+            {
+                "youth": self.youths[i],
+                "security_level": self.levels[rows["level"][p]],
+                "start_date": date.fromordinal(int(starts[p])).isoformat(),
+                "missing_gt_sessions": int(missing_sessions[p]),
+                "weeks_missing_gt": int(weeks_missing[p]),
+                "misnamed_count": int(misnamed[p]),
+            }
+            for p, i in enumerate(live)
+        ]
+
+    def audit_results(self, audit_rules, youths=None):
+        """Compact AuditResults (engine.model) for the given youths (default: all), read from the archive."""
+        from engine.model import AuditResult
+
+        plan = compile_rules(audit_rules)
+        ids = self.live_ids() if youths is None else [self.youth_id(y) for y in youths]
+        for youth_id in ids:
+            yield AuditResult.from_log(self.youth_log(youth_id), plan)
@@ -1,30 +1,42 @@
-from engine.validator import group_files_by_week, find_misnamed_files, is_valid_gt_filename, extract_date_from_gt_file
+from engine.rules import DEFAULT_AUDIT_END, compile_rules
+from engine.validator import classify_files, group_records_by_week, parse_date_ordinal
+from engine.weeks import population_weeks
+from engine.windows import population_streaks, streaks
 from datetime import datetime, timedelta
-from math import ceil
+
+# Default end of the audit period; set audit_period.end in audit_rules.json to change it
+AUDIT_END_DATE = datetime.strptime(DEFAULT_AUDIT_END, "%Y-%m-%d")
 
 def audit_youth(youth_data, audit_rules):
+    """Audit one youth. audit_rules is the audit_rules.json dict or a compiled RulePlan."""
+    plan = compile_rules(audit_rules)
     name = youth_data["youth"]
     level = youth_data["security_level"]
     start_date_str = youth_data["start_date"]
     files = youth_data["files"]
 
-    required_per_week = audit_rules["group_therapy"].get(level, 2)
+    required_per_week = plan.gt_required(level)
     start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-    end_date = datetime(2024, 12, 31)
+    start_ordinal = start_date.toordinal()
 
-    valid_gt_files = [f for f in files if is_valid_gt_filename(f)]
-    misnamed_files = find_misnamed_files(files)
+    records = classify_files(files)
+    valid_gt_records = [r for r in records if r.is_valid_gt]
+    valid_gt_files = [r.filename for r in valid_gt_records]
+    misnamed_files = [r.filename for r in records if not r.is_valid_gt]
 
-    # Group valid GT files by week
-    weekly_grouped = group_files_by_week(valid_gt_files, start_date)
+    # Explicitly check every week of the audit period
+    total_weeks = plan.total_weeks(start_ordinal)
 
-    # Explicitly check every week from start_date to end_date
-    total_weeks = ceil((end_date - start_date).days / 7)
+    # Group valid GT files by week
+    weekly_grouped = group_records_by_week(valid_gt_records, start_date, plan.week_start, total_weeks)
+    first_week = plan.first_week(start_ordinal)
     missing_weeks = []
+    short_weeks = []
 
-    for week_index in range(1, total_weeks + 1):
+    for week_index in range(first_week, total_weeks + 1):
         week_key = f"week_{week_index}"
         count = len(weekly_grouped.get(week_key, []))
+        short_weeks.append(count < required_per_week)
         if count < required_per_week:
             missing_weeks.append({
                 "week": week_key,
@@ -32,11 +44,147 @@ def audit_youth(youth_data, audit_rules):
                 "required": required_per_week
             })
 
-    return {
+    result = {
         "youth": name,
         "security_level": level,
         "start_date": start_date_str,
         "valid_gt_files": valid_gt_files,
         "misnamed": misnamed_files,
         "missing_gt_weeks": sorted(missing_weeks, key=lambda w: w["week"])
-    }
\ No newline at end of file
+    }
+    if plan.extra:
+        result["missing_sessions"] = plan.evaluate(start_ordinal, level, records)
+    if plan.streak_weeks:
+        result["gt_streaks"] = plan.gt_streaks(streaks(short_weeks, plan.streak_weeks), first_week)
+    return result
+
+UNIX_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+def build_session_table(youth_logs):
+    import numpy as np
+    import pandas as pd
+
+    # One row per filename across every youth: youth index, label, date, valid flag
+    youth_idx = np.repeat(
+        np.arange(len(youth_logs), dtype=np.int64),
+        [len(y["files"]) for y in youth_logs]
+    )
+    records = [r for y in youth_logs for r in classify_files(y["files"])]
+    ordinals = np.array([-1 if r.date_ordinal is None else r.date_ordinal for r in records], dtype=np.int64)
+    dates = (ordinals - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+    dates[ordinals < 0] = np.datetime64("NaT")
+
+    return pd.DataFrame({
+        "youth": youth_idx,
+        "filename": np.array([r.filename for r in records], dtype=object),
+        "label": np.array([r.session_type for r in records], dtype=object),
+        "date": dates,
+        "valid": np.array([r.is_valid_gt for r in records], dtype=bool),
+    })
+
+def audit_youth_compact(youth_data, audit_rules):
+    """audit_youth returning an engine.model.AuditResult instead of a dict."""
+    from engine.model import AuditResult, YouthLog
+
+    return AuditResult.from_log(YouthLog.from_dict(youth_data), compile_rules(audit_rules))
+
+def audit_all(youth_logs, audit_rules, compact=False):
+    """Audit every youth at once; returns the same dicts as audit_youth, in input order.
+
+    With compact=True the results are engine.model.AuditResult objects instead.
+    """
+    # Imported here so per-youth audits and report-only runs never load numpy/pandas
+    import numpy as np
+
+    youth_logs = list(youth_logs)
+    if not youth_logs:
+        return []
+
+    plan = compile_rules(audit_rules)
+    table = build_session_table(youth_logs)
+
+    start_ordinals = [parse_date_ordinal(y["start_date"]) for y in youth_logs]
+    start_dates = (np.array(start_ordinals, dtype=np.int64) - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+    required = np.array([plan.gt_required(y["security_level"]) for y in youth_logs], dtype=np.int64)
+    first_week = np.array([plan.first_week(o) for o in start_ordinals], dtype=np.int64)
+
+    # First day of each youth's start week, matching group_files_by_week
+    aligned = np.array([plan.aligned_start(o) for o in start_ordinals], dtype=np.int64)
+
+    end_date = np.datetime64(plan.end_ordinal - UNIX_EPOCH_ORDINAL, "D")
+    days_left = (end_date - start_dates).astype(np.int64)
+    total_weeks = np.maximum(-(-days_left // 7), 0)
+    max_weeks = int(total_weeks.max()) if len(total_weeks) else 0
+
+    # Weekly GT counts for the whole population in one grouped pass; weeks come from one
+    # gather over the shared day -> week indexes (engine.weeks)
+    gt = table[table["valid"] & table["date"].notna()]
+    rows = gt["youth"].to_numpy()
+    ordinals = gt["date"].to_numpy().astype("datetime64[D]").astype(np.int64) + UNIX_EPOCH_ORDINAL
+    first = int(aligned.min())
+    week = population_weeks(aligned[rows], ordinals, first, int(aligned.max()) - first + 7 * max_weeks)
+    keep = (week >= 1) & (week <= max_weeks)
+    counts = np.bincount(
+        rows[keep] * (max_weeks + 1) + week[keep],
+        minlength=len(youth_logs) * (max_weeks + 1)
+    ).reshape(len(youth_logs), max_weeks + 1)
+
+    week_numbers = np.arange(max_weeks + 1)
+    missing = (
+        (week_numbers >= first_week[:, None])
+        & (week_numbers <= total_weeks[:, None])
+        & (counts < required[:, None])
+    )
+    # Extra requirements and streaks for every youth at once; column w of `missing` is week w
+    levels = [y["security_level"] for y in youth_logs]
+    extra = plan.evaluate_population(start_ordinals, levels, [classify_files(y["files"]) for y in youth_logs])
+    runs = population_streaks(missing, plan.streak_weeks) if plan.streak_weeks else None
+
+    # audit_youth sorts missing weeks by their "week_N" key, so reuse that order
+    week_order = np.array(sorted(range(1, max_weeks + 1), key=lambda i: f"week_{i}"), dtype=np.int64)
+
+    valid_by_youth = table["valid"].to_numpy()
+    names = table["filename"].to_numpy()
+    bounds = np.concatenate(([0], np.cumsum([len(y["files"]) for y in youth_logs])))
+
+    if compact:
+        from engine.model import AuditResult, YouthLog
+        results = []
+        for i, youth_data in enumerate(youth_logs):
+            log = YouthLog.from_dict(youth_data)
+            weekly_gt = counts[i, 1:total_weeks[i] + 1].astype(np.int32)
+            result = AuditResult(
+                log.youth, log.security_level, log.start_ordinal, log.files, int(required[i]), weekly_gt,
+                int(first_week[i]),
+            )
+            if plan.extra:
+                result.missing_sessions = extra[i]
+            if runs is not None:
+                result.gt_streaks = plan.gt_streaks(runs[i], first_week=0)
+            results.append(result)
+        return results
+
+    results = []
+    for i, youth_data in enumerate(youth_logs):
+        lo, hi = bounds[i], bounds[i + 1]
+        youth_valid = valid_by_youth[lo:hi]
+        youth_names = names[lo:hi]
+        req = int(required[i])
+        weeks = week_order[missing[i, week_order]] if max_weeks else week_order
+        result = {
+            "youth": youth_data["youth"],
+            "security_level": youth_data["security_level"],
+            "start_date": youth_data["start_date"],
+            "valid_gt_files": youth_names[youth_valid].tolist(),
+            "misnamed": youth_names[~youth_valid].tolist(),
+            "missing_gt_weeks": [
+                {"week": f"week_{w}", "count": int(counts[i, w]), "required": req}
+                for w in weeks
+            ]
+        }
+        if plan.extra:
+            result["missing_sessions"] = extra[i]
+        if runs is not None:
+            result["gt_streaks"] = plan.gt_streaks(runs[i], first_week=0)
+        results.append(result)
+    return results
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from engine import __version__ as ENGINE_VERSION
+from engine.calendar import CALENDAR_DPI, calendar_renderer
+from engine.rules import compile_rules
+
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+def result_digest(result, dpi=CALENDAR_DPI, options=None):
+    # The engine version is part of the key so images drawn by an older renderer are not served
+    payload = json.dumps(
+        {"result": result, "dpi": dpi, "options": options or {}, "engine": ENGINE_VERSION}, sort_keys=True
+    ).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+class CalendarCache:
+    """Renders a youth's calendar the first time it is asked for and keeps it on disk.
+
+    Images are keyed by a hash of the audit result, so a changed result gets a new
+    image. Least recently used images are evicted once the directory grows past
+    max_bytes. With audit_rules, the calendar year and GT requirement come from the
+    compiled rules and are part of the key too.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_BYTES, dpi=CALENDAR_DPI, backend="raster", audit_rules=None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self.backend = backend
+        self.plan = compile_rules(audit_rules) if audit_rules is not None else None
+
+    def options_for(self, result):
+        return self.plan.calendar_options(result) if self.plan else {}
+
+    def path_for(self, result):
+        digest = result_digest(result, self.dpi, self.options_for(result))
+        return self.cache_dir / f"{result['youth']}_{digest}.png"
+
+    def get(self, result):
+        path = self.path_for(result)
+        if path.exists():
+            # Touch so eviction sees this image as recently used
+            os.utime(path)
+            return path
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.png")
+        calendar_renderer(self.backend)(
+            result["youth"], result["start_date"],
+            result["valid_gt_files"] + result["misnamed"],
+            tmp_path, dpi=self.dpi, **self.options_for(result)
+        )
+        os.replace(tmp_path, path)
+        self._drop_stale(result["youth"], path)
+        self.evict(keep=path)
+        return path
+
+    def _drop_stale(self, youth, current):
+        # Older renders of the same youth can never be hit again
+        for candidate in self.cache_dir.glob(f"{youth}_*.png"):
+            digest = candidate.stem[len(youth) + 1:]
+            if candidate != current and len(digest) == 16 and all(c in "0123456789abcdef" for c in digest):
+                candidate.unlink(missing_ok=True)
+
+    def evict(self, keep=None):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".png") and not entry.name.startswith("."):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,217 @@
+import json
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+from pathlib import Path
+
+from engine.calendar import CALENDAR_DPI
+from engine.parallel import resolve_workers
+from engine.rules import compile_rules
+
+EXPORT_FORMATS = ("pdf", "sprites")
+SPRITE_COLUMNS = 4
+SPRITES_PER_SHEET = 16
+SPRITE_INDEX = "calendars_index.json"
+PAGE_COMPRESS_LEVEL = 1  # after the Up predictor, higher levels barely shrink the pages
+
+class PdfPageWriter:
+    """Streams RGB images into a multi-page PDF, one full-page image per page.
+
+    Each page is written as soon as it is added, so memory holds one page at a time
+    however many youths are exported. The page tree and cross-reference table are
+    written on close, and the file replaces output_file atomically.
+    """
+
+    def __init__(self, output_file, dpi=CALENDAR_DPI):
+        self.output_file = Path(output_file)
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self.dpi = dpi
+        self._tmp = self.output_file.with_name(f".{self.output_file.name}.tmp")
+        self._file = open(self._tmp, "wb")
+        self._offsets = {}
+        self._pages = []
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # Objects 1 and 2 are the catalog and page tree; the tree is written last
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._next = 3
+
+    @property
+    def count(self):
+        return len(self._pages)
+
+    def _object(self, number, body, stream=None):
+        self._offsets[number] = self._file.tell()
+        self._file.write(b"%d 0 obj\n" % number + body)
+        if stream is not None:
+            self._file.write(b"\nstream\n" + stream + b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def add_page(self, width, height, compressed_rgb):
+        """Add a page from an RGB image encoded by compress_page."""
+        image, content, page = self._next, self._next + 1, self._next + 2
+        self._next += 3
+        self._object(image, (
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+            b"/BitsPerComponent 8 /Filter /FlateDecode "
+            b"/DecodeParms << /Predictor 15 /Colors 3 /BitsPerComponent 8 /Columns %d >> /Length %d >>"
+            % (width, height, width, len(compressed_rgb))
+        ), compressed_rgb)
+        points_w, points_h = width * 72 / self.dpi, height * 72 / self.dpi
+        draw = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (points_w, points_h)
+        self._object(content, b"<< /Length %d >>" % len(draw), draw)
+        self._object(page, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>" % (points_w, points_h, image, content)
+        ))
+        self._pages.append(page)
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % page for page in self._pages)
+        self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        xref = self._file.tell()
+        self._file.write(b"xref\n0 %d\n0000000000 65535 f \n" % self._next)
+        for number in range(1, self._next):
+            self._file.write(b"%010d 00000 n \n" % self._offsets[number])
+        self._file.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self._next, xref))
+        self._file.close()
+        os.replace(self._tmp, self.output_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self._tmp.unlink(missing_ok=True)
+
+class SpriteSheetWriter:
+    """Tiles calendars into PNG sheets of `columns` x rows, at most per_sheet per sheet.
+
+    calendars_index.json maps each youth to its sheet and pixel box, so a viewer can
+    crop one calendar out of a sheet. Only the sheet being filled is kept in memory.
+    """
+
+    def __init__(self, output_dir, columns=SPRITE_COLUMNS, per_sheet=SPRITES_PER_SHEET, dpi=CALENDAR_DPI):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.columns = columns
+        self.per_sheet = per_sheet
+        self.dpi = dpi
+        self.index = {}
+        self.sheets = []
+        self._sheet = None
+        self._used = 0
+
+    @property
+    def count(self):
+        return len(self.index)
+
+    def add(self, youth, canvas):
+        import numpy as np
+
+        height, width = canvas.shape[:2]
+        if self._sheet is None:
+            rows = ceil(self.per_sheet / self.columns)
+            self._sheet = np.full((rows * height, self.columns * width, 3), 255, dtype=np.uint8)
+            self._used = 0
+        row, column = divmod(self._used, self.columns)
+        y, x = row * height, column * width
+        self._sheet[y:y + height, x:x + width] = canvas
+        name = f"calendars_{len(self.sheets) + 1:03d}.png"
+        self.index[youth] = {"sheet": name, "x": x, "y": y, "width": width, "height": height}
+        self._used += 1
+        if self._used == self.per_sheet:
+            self._flush()
+
+    def _flush(self):
+        from PIL import Image
+
+        if self._sheet is None:
+            return
+        name = f"calendars_{len(self.sheets) + 1:03d}.png"
+        tile_height = self._sheet.shape[0] // ceil(self.per_sheet / self.columns)
+        used_rows = ceil(self._used / self.columns)
+        Image.fromarray(self._sheet[:used_rows * tile_height]).save(
+            self.output_dir / name, dpi=(self.dpi, self.dpi), compress_level=1
+        )
+        self.sheets.append(name)
+        self._sheet = None
+
+    def close(self):
+        self._flush()
+        with open(self.output_dir / SPRITE_INDEX, "w") as f:
+            json.dump({"sheets": self.sheets, "youths": self.index}, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+def compress_page(canvas):
+    """Flate data for a PDF image: PNG "Up" filtered rows, so flat colour blocks become zeros."""
+    import numpy as np
+
+    height, width, _ = canvas.shape
+    flat = canvas.reshape(height, width * 3)
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 2  # PNG filter type Up: each byte minus the one above it
+    rows[0, 1:] = flat[0]
+    np.subtract(flat[1:], flat[:-1], out=rows[1:, 1:])
+    return zlib.compress(rows.tobytes(), PAGE_COMPRESS_LEVEL)
+
+def _compose(task):
+    """Worker side: one youth's calendar on the shared template. Returns what the writer needs."""
+    from engine.calendar_render import compose_calendar
+
+    youth, start_date, files, options, dpi, fmt = task
+    canvas = compose_calendar(youth, start_date, files, dpi=dpi, **options)
+    if fmt == "pdf":
+        # Compressing in the worker keeps the pixels out of the pipe back to the writer
+        return youth, (canvas.shape[1], canvas.shape[0], compress_page(canvas))
+    return youth, canvas
+
+def _composed(tasks, workers):
+    """Composed pages in task order; at most a few pages per worker are in flight."""
+    if workers == 1:
+        yield from map(_compose, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_compose, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def export_calendars(results, audit_rules, output, fmt="pdf", dpi=CALENDAR_DPI, workers=1,
+                     columns=SPRITE_COLUMNS, per_sheet=SPRITES_PER_SHEET):
+    """Render every result's calendar into one PDF (output is a file) or sprite sheets (output is a directory).
+
+    Static parts of the calendar are drawn once per dpi and year (calendar_template);
+    each youth only adds its sessions, red boxes and title. Returns the number of
+    calendars exported.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {EXPORT_FORMATS}")
+    plan = compile_rules(audit_rules)
+    tasks = (
+        (r["youth"], r["start_date"], r["valid_gt_files"] + r["misnamed"], plan.calendar_options(r), dpi, fmt)
+        for r in results
+    )
+    pages = _composed(tasks, resolve_workers(workers))
+    if fmt == "pdf":
+        with PdfPageWriter(output, dpi) as writer:
+            for _, (width, height, data) in pages:
+                writer.add_page(width, height, data)
+    else:
+        with SpriteSheetWriter(output, columns, per_sheet, dpi) as writer:
+            for youth, canvas in pages:
+                writer.add(youth, canvas)
+    return writer.count
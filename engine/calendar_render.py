@@ -0,0 +1,390 @@
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties, findfont, get_font
+import numpy as np
+from PIL import Image
+import pandas as pd
+import calendar
+from datetime import datetime
+from functools import lru_cache
+
+from engine.calendar import CALENDAR_DPI, SESSION_COLORS, SESSION_TYPES, day_labels, extract_session_dates
+from engine.rules import DEFAULT_AUDIT_END, DEFAULT_GT_REQUIRED
+from engine.validator import parse_date_ordinal
+from engine.weeks import aligned_start, day_weeks, weekday
+
+DEFAULT_YEAR = int(DEFAULT_AUDIT_END[:4])
+
+import warnings
+warnings.filterwarnings("ignore", message="The figure layout has changed to tight")
+
+_RGB = {
+    "green": (0, 128, 0),
+    "orange": (255, 165, 0),
+    "blue": (0, 0, 255),
+    "lightgrey": (211, 211, 211),
+    "white": (255, 255, 255),
+    "black": (0, 0, 0),
+    "red": (255, 0, 0),
+}
+
+def session_matrix(files, year=DEFAULT_YEAR):
+    """Days-of-year x (GT, IT, FT) boolean array of which sessions happened on each day."""
+    first = datetime(year, 1, 1).toordinal()
+    days = datetime(year, 12, 31).toordinal() - first + 1
+    matrix = np.zeros((days, len(SESSION_TYPES)), dtype=bool)
+    for column, ordinals in enumerate(extract_session_dates(files).values()):
+        offsets = np.fromiter(ordinals, dtype=np.int64, count=len(ordinals)) - first
+        matrix[offsets[(offsets >= 0) & (offsets < days)], column] = True
+    return matrix
+
+def _cell_colors():
+    # Index = GT | IT << 1 | FT << 2, then (lower half, right half) of the cell; 8 is an empty slot outside the month
+    colors = np.empty((9, 2, 2, 3), dtype=np.uint8)
+    for code in range(8):
+        types = [label for bit, label in enumerate(SESSION_TYPES) if code >> bit & 1]
+        tile = colors[code]
+        if not types:
+            tile[:] = _RGB["lightgrey"]
+        elif len(types) == 1:
+            tile[:] = _RGB[SESSION_COLORS[types[0]]]
+        elif len(types) == 2:
+            tile[0] = _RGB[SESSION_COLORS[types[0]]]
+            tile[1] = _RGB[SESSION_COLORS[types[1]]]
+        else:
+            tile[0, 0] = _RGB["green"]
+            tile[0, 1] = _RGB["orange"]
+            tile[1] = _RGB["blue"]
+    colors[8] = _RGB["white"]
+    return colors
+
+def line_width(points, dpi):
+    """Whole pixels for a line of the given width in points, as the patches backend strokes it."""
+    return max(1, int(round(points * dpi / 72)))
+
+def _text_alpha(text, size, dpi):
+    # Anti-aliased coverage of text in the default font, as matplotlib's Agg backend draws it
+    font = get_font(findfont(FontProperties()))
+    font.set_size(size, dpi)
+    font.set_text(text, 0.0)
+    font.draw_glyphs_to_bitmap(antialiased=True)
+    return np.asarray(font.get_image(), dtype=np.float32)[..., None] / 255.0
+
+@lru_cache(maxsize=8)
+def day_number_glyphs(dpi):
+    """Alpha masks of the day numbers 1-31 at the 6 pt the patches backend labels days with.
+
+    Rendered once per dpi; index 0 is unused.
+    """
+    return [None] + [_text_alpha(str(day), 6, dpi) for day in range(1, 32)]
+
+def _stamp(image, alpha, cy, cx):
+    # Darken image towards black by alpha, centred on (cy, cx)
+    h, w = alpha.shape[:2]
+    top, left = max(0, int(round(cy - h / 2))), max(0, int(round(cx - w / 2)))
+    region = image[top:top + h, left:left + w]
+    region[:] = (region * (1.0 - alpha[:region.shape[0], :region.shape[1]])).astype(np.uint8)
+
+@lru_cache(maxsize=16)
+def grid_positions(year, week_start=0):
+    """(month, row, col, day) arrays placing every day of year in its month's 6x7 grid.
+
+    Columns start on week_start (Monday = 0), the day the audit's weeks start on, so
+    every audit week inside a month is a single run of cells in one row.
+    """
+    first = datetime(year, 1, 1).toordinal()
+    ordinals = np.arange(first, datetime(year, 12, 31).toordinal() + 1)
+    dates = pd.DatetimeIndex((ordinals - datetime(1970, 1, 1).toordinal()).astype("datetime64[D]"))
+    month = dates.month.to_numpy() - 1
+    day = dates.day.to_numpy()
+    col = (weekday(ordinals) - week_start) % 7
+    first_of_month = col - (day - 1)
+    row = (day - 1 + first_of_month % 7) // 7
+    for array in (month, row, col, day):
+        array.flags.writeable = False
+    return month, row, col, day
+
+def week_boxes(year, day_week, missing_weeks, week_start=0):
+    """(month, week, row, first col, last col) of every red box: one per missing week per month."""
+    month, row, col, _ = grid_positions(year, week_start)
+    short = np.isin(day_week, missing_weeks)
+    boxes = []
+    for m, w in sorted(set(zip(month[short].tolist(), day_week[short].tolist()))):
+        in_box = short & (month == m) & (day_week == w)
+        for r in np.unique(row[in_box]).tolist():
+            # With columns starting on week_start there is one row; a segment per row stays exact anyway
+            cols = col[in_box & (row == r)]
+            boxes.append((m, w, r, int(cols.min()), int(cols.max())))
+    return boxes
+
+def missing_weeks_from_matrix(matrix, day_week, required):
+    """Weeks (>= 1) of the year whose GT days fall short of required.
+
+    Only used when the caller has no audit result; otherwise the result's own
+    missing_gt_weeks are drawn.
+    """
+    weeks = np.unique(day_week[day_week >= 1])
+    counts = np.bincount(day_week[matrix[:, 0] & (day_week >= 1)], minlength=int(day_week.max()) + 1)
+    return weeks[counts[weeks] < required].tolist()
+
+@lru_cache(maxsize=64)
+def month_edges(height, width):
+    """Pixel edges of a month box's 7 grid rows (below the weekday header) and 8 columns.
+
+    The box is the patches backend's 7 x 6.5 axes, whose top half row holds the labels.
+    """
+    header = int(round(height * 0.5 / 6.5))
+    rows = np.rint(np.linspace(header, height, 7)).astype(np.int64)
+    cols = np.rint(np.linspace(0, width, 8)).astype(np.int64)
+    rows.flags.writeable = cols.flags.writeable = False
+    return rows, cols
+
+def _halves(edges, length):
+    # Cell of every pixel from edges[0] on, and whether it lies in the cell's second half
+    pixels = np.arange(edges[0], length)
+    cell = np.clip(np.searchsorted(edges, pixels, side="right") - 1, 0, len(edges) - 2)
+    second = (pixels - edges[cell]) * 2 >= edges[cell + 1] - edges[cell]
+    return cell, second.astype(np.int64)
+
+def render_year_raster(matrix, year, day_week, missing_weeks, sizes, dpi, week_start=0):
+    """RGB images (one per month) of the calendar grid, built without per-day artists.
+
+    Each month is drawn directly at its final (height, width) from sizes, the pixel
+    box it fills in the figure, with its weekday header rows left white. Day outlines
+    (0.5 pt), the month frame (1 pt) and red boxes (2 pt) are whole pixels at dpi, so
+    every line of a kind is the same width. day_week gives each day's audit week
+    (see engine.weeks.day_weeks); weeks in missing_weeks get a red box (week_boxes),
+    drawn inside the week's cells. Day numbers are stamped later.
+    """
+    month, row, col, _ = grid_positions(year, week_start)
+    codes = np.full((12, 6, 7), 8, dtype=np.int64)
+    codes[month, row, col] = matrix @ np.array([1, 2, 4])
+    colors = _cell_colors()
+    outline, frame, thick = line_width(0.5, dpi), (line_width(1, dpi) + 1) // 2, line_width(2, dpi)
+    boxes = {}
+    for m, _, r, c0, c1 in week_boxes(year, day_week, missing_weeks, week_start):
+        boxes.setdefault(m, []).append((r, c0, c1))
+
+    images = []
+    for m, (height, width) in enumerate(sizes):
+        rows, cols = month_edges(height, width)
+        row_cell, lower = _halves(rows, height)
+        col_cell, right = _halves(cols, width)
+        image = np.full((height, width, 3), 255, dtype=np.uint8)
+        image[rows[0]:] = colors[codes[m][row_cell][:, col_cell], lower[:, None], right[None, :]]
+
+        # Outline every day, centred on the cell edges like the patches backend's edgecolor
+        lo = outline // 2
+        for r, c in zip(row[month == m].tolist(), col[month == m].tolist()):
+            y0, y1, x0, x1 = rows[r] - lo, rows[r + 1] - lo, max(0, cols[c] - lo), cols[c + 1] - lo
+            image[y0:y0 + outline, x0:x1 + outline] = 0
+            image[y1:y1 + outline, x0:x1 + outline] = 0
+            image[y0:y1 + outline, x0:x0 + outline] = 0
+            image[y0:y1 + outline, x1:x1 + outline] = 0
+        # The template's month frame is centred on the box edge; its inner half is drawn over here
+        image[rows[0]:, :frame] = image[rows[0]:, width - frame:] = 0
+        image[height - frame:] = 0
+
+        # Highlight weeks with insufficient GT
+        for r, c0, c1 in boxes.get(m, ()):
+            y0, y1, x0, x1 = rows[r], rows[r + 1], cols[c0], cols[c1 + 1]
+            image[y0:y0 + thick, x0:x1] = image[y1 - thick:y1, x0:x1] = _RGB["red"]
+            image[y0:y1, x0:x0 + thick] = image[y0:y1, x1 - thick:x1] = _RGB["red"]
+        images.append(image)
+    return images
+
+def _legend_handles():
+    return [
+        mpatches.Patch(color='green', label='GT'),
+        mpatches.Patch(color='orange', label='IT'),
+        mpatches.Patch(color='blue', label='FT'),
+        mpatches.Patch(color='lightgrey', label='No Session'),
+        mpatches.Patch(edgecolor='red', facecolor='none', label='Insufficient GT', linewidth=2),
+    ]
+
+def _figure_skeleton(fig, year, week_start=0):
+    # Static parts shared by every youth's calendar: month frames, headers and legend
+    axs = fig.subplots(3, 4)
+    fig.subplots_adjust(left=0.01, right=0.99, bottom=0.07, top=0.9, wspace=0.04, hspace=0.2)
+    for month in range(1, 13):
+        ax = axs[(month - 1) // 4][(month - 1) % 4]
+        ax.set_xlim(0, 7)
+        ax.set_ylim(0, 6.5)
+        ax.set_title(calendar.month_name[month], fontsize=10)
+        ax.set_axis_off()
+        ax.add_patch(plt.Rectangle((0, 0), 7, 6.5, fill=False, edgecolor='black', linewidth=1))
+        for i, label in enumerate(day_labels(week_start)):
+            ax.text(i + 0.5, 6.25, label, ha="center", va="center", fontsize=6, weight="bold")
+    fig.legend(handles=_legend_handles(), loc='lower center', ncol=5, bbox_to_anchor=(0.5, 0.01))
+    return [axs[(m - 1) // 4][(m - 1) % 4] for m in range(1, 13)]
+
+@lru_cache(maxsize=8)
+def calendar_template(dpi, year=DEFAULT_YEAR, week_start=0):
+    """Rendered background and month pixel boxes, drawn once per (dpi, year, week_start) and reused."""
+    fig = Figure(figsize=(16, 10), dpi=dpi)
+    axes = _figure_skeleton(fig, year, week_start)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    background = np.asarray(canvas.buffer_rgba())[..., :3].copy()
+    height = background.shape[0]
+    boxes = []
+    for ax in axes:
+        extent = ax.get_window_extent()
+        boxes.append((
+            int(round(height - extent.y1)), int(round(height - extent.y0)),
+            int(round(extent.x0)), int(round(extent.x1)),
+        ))
+    background.flags.writeable = False
+    return background, tuple(boxes)
+
+def _draw_title(image, title, dpi):
+    alpha = _text_alpha(title, 16, dpi)
+    h, w = alpha.shape[:2]
+    top = int(image.shape[0] * 0.02)
+    left = max(0, (image.shape[1] - w) // 2)
+    region = image[top:top + h, left:left + w]
+    region[:] = (region * (1.0 - alpha[:region.shape[0], :region.shape[1]])).astype(np.uint8)
+
+def year_weeks(start_date, year, week_start=0):
+    """Audit week of every day of year, shared with the auditor's week alignment."""
+    first = datetime(year, 1, 1).toordinal()
+    days = datetime(year, 12, 31).toordinal() - first + 1
+    return day_weeks(aligned_start(parse_date_ordinal(start_date), week_start), first, days)
+
+def compose_calendar(youth_name, start_date, files, dpi=CALENDAR_DPI, year=DEFAULT_YEAR,
+                     required=DEFAULT_GT_REQUIRED, week_start=0, missing_weeks=None):
+    """Full calendar as an RGB array: cached template plus this youth's month rasters."""
+    background, boxes = calendar_template(dpi, year, week_start)
+    matrix = session_matrix(files, year)
+    day_week = year_weeks(start_date, year, week_start)
+    if missing_weeks is None:
+        missing_weeks = missing_weeks_from_matrix(matrix, day_week, required)
+    sizes = [(y1 - y0, x1 - x0) for y0, y1, x0, x1 in boxes]
+    images = render_year_raster(matrix, year, day_week, missing_weeks, sizes, dpi, week_start)
+
+    canvas = background.copy()
+    for image, (y0, y1, x0, x1) in zip(images, boxes):
+        # Already at the box's size; the template keeps its weekday header rows
+        header = month_edges(y1 - y0, x1 - x0)[0][0]
+        canvas[y0 + header:y1, x0:x1] = image[header:]
+
+    # Day numbers in the template's font, so they look like the patches backend's text
+    glyphs = day_number_glyphs(dpi)
+    month, row, col, day = grid_positions(year, week_start)
+    for m, r, c, d in zip(month.tolist(), row.tolist(), col.tolist(), day.tolist()):
+        y0, y1, x0, x1 = boxes[m]
+        rows, cols = month_edges(y1 - y0, x1 - x0)
+        _stamp(canvas, glyphs[d], y0 + (rows[r] + rows[r + 1]) / 2, x0 + (cols[c] + cols[c + 1]) / 2)
+
+    _draw_title(canvas, f"Therapy Calendar for {youth_name} - {year}", dpi)
+    return canvas
+
+def render_calendar_raster(youth_name, start_date, files, output_file, dpi=CALENDAR_DPI, year=DEFAULT_YEAR,
+                           required=DEFAULT_GT_REQUIRED, week_start=0, missing_weeks=None):
+    canvas = compose_calendar(youth_name, start_date, files, dpi=dpi, year=year, required=required,
+                              week_start=week_start, missing_weeks=missing_weeks)
+    # Flat colour blocks compress well even at a fast zlib level
+    Image.fromarray(canvas).save(output_file, dpi=(dpi, dpi), compress_level=1)
+
+def render_calendar_patches(youth_name, start_date, files, output_file, dpi=CALENDAR_DPI, year=DEFAULT_YEAR,
+                            required=DEFAULT_GT_REQUIRED, week_start=0, missing_weeks=None):
+    day_week = year_weeks(start_date, year, week_start)
+    if missing_weeks is None:
+        missing_weeks = missing_weeks_from_matrix(session_matrix(files, year), day_week, required)
+    missing_weeks = set(missing_weeks)
+    first = datetime(year, 1, 1).toordinal()
+    session_dates = extract_session_dates(files)
+
+    gt_dates_dt = [datetime.fromordinal(d) for d in sorted(session_dates["GT"])]
+    it_dates_dt = [datetime.fromordinal(d) for d in sorted(session_dates["IT"])]
+    ft_dates_dt = [datetime.fromordinal(d) for d in sorted(session_dates["FT"])]
+
+    all_dates = pd.date_range(start=f"{year}-01-01", end=f"{year}-12-31")
+    df = pd.DataFrame(index=all_dates)
+    df["GT"] = df.index.isin(gt_dates_dt)
+    df["IT"] = df.index.isin(it_dates_dt)
+    df["FT"] = df.index.isin(ft_dates_dt)
+
+    # Create figure
+    fig, axs = plt.subplots(3, 4, figsize=(16, 10), constrained_layout=True)
+    fig.suptitle(f"Therapy Calendar for {youth_name} - {year}", fontsize=16)
+
+    for month in range(1, 13):
+        ax = axs[(month - 1) // 4][(month - 1) % 4]
+        month_dates = df[df.index.month == month]
+        ax.set_title(calendar.month_name[month], fontsize=10)
+        ax.set_xlim(0, 7)
+        ax.set_ylim(0, 6.5)
+
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        ax.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
+        ax.xaxis.set_major_locator(plt.NullLocator())
+        ax.yaxis.set_major_locator(plt.NullLocator())
+
+        # Draw weekday headers
+        for i, label in enumerate(day_labels(week_start)):
+            ax.text(i + 0.5, 6.3, label, ha="center", va="center", fontsize=6, weight="bold")
+
+        # Redraw month boundary manually
+        ax.add_patch(plt.Rectangle((0, 0), 7, 6.5, fill=False, edgecolor='black', linewidth=1))
+
+        week_boxes = {}
+
+        for date in month_dates.index:
+            if date.month != month:
+                continue
+
+            # Columns start on the audit's week_start, so each week is one row
+            column = (date.weekday() - week_start) % 7
+            month_start = date.replace(day=1)
+            first_day_column = (month_start.weekday() - week_start) % 7
+            week_of_month = (date.day + first_day_column - 1) // 7
+            x = column
+            y = 5 - week_of_month
+
+            has_gt = df.loc[date, "GT"]
+            has_it = df.loc[date, "IT"]
+            has_ft = df.loc[date, "FT"]
+            types = [c for c, v in zip(["GT", "IT", "FT"], [has_gt, has_it, has_ft]) if v]
+
+            if len(types) == 0:
+                ax.add_patch(plt.Rectangle((x, y), 1, 1, color="lightgrey"))
+            elif len(types) == 1:
+                color = {"GT": "green", "IT": "orange", "FT": "blue"}[types[0]]
+                ax.add_patch(plt.Rectangle((x, y), 1, 1, color=color))
+            elif len(types) == 2:
+                color1 = {"GT": "green", "IT": "orange", "FT": "blue"}[types[0]]
+                color2 = {"GT": "green", "IT": "orange", "FT": "blue"}[types[1]]
+                ax.add_patch(plt.Rectangle((x, y + 0.5), 1, 0.5, color=color1))
+                ax.add_patch(plt.Rectangle((x, y), 1, 0.5, color=color2))
+            else:
+                ax.add_patch(plt.Rectangle((x, y + 0.5), 0.5, 0.5, color="green"))
+                ax.add_patch(plt.Rectangle((x + 0.5, y + 0.5), 0.5, 0.5, color="orange"))
+                ax.add_patch(plt.Rectangle((x, y), 1, 0.5, color="blue"))
+
+            ax.add_patch(plt.Rectangle((x, y), 1, 1, fill=False, edgecolor="black", linewidth=0.5))
+            ax.text(x + 0.5, y + 0.5, str(date.day), ha="center", va="center", fontsize=6)
+
+            week_num = int(day_week[date.toordinal() - first])
+            key = (y, x)
+            week_boxes.setdefault(week_num, []).append(key)
+
+        # Highlight weeks with insufficient GT
+        for week, positions in week_boxes.items():
+            if week in missing_weeks:
+                x0 = min(p[1] for p in positions)
+                y0 = min(p[0] for p in positions)
+                x1 = max(p[1] for p in positions)
+                y1 = max(p[0] for p in positions)
+                ax.add_patch(plt.Rectangle((x0, y0), x1 - x0 + 1, y1 - y0 + 1, fill=False, edgecolor="red", linewidth=2))
+
+    # Legend
+    fig.legend(handles=_legend_handles(), loc='lower center', ncol=5, bbox_to_anchor=(0.5, 0.01))
+
+    plt.tight_layout(rect=[0, 0.05, 1, 0.95])
+
+    fig.savefig(output_file, dpi=dpi)
+    plt.close(fig)
@@ -0,0 +1,372 @@
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from engine.calendar import CALENDAR_BACKENDS, CALENDAR_DPI, PREVIEW_DPI
+from engine.decoder import DECODERS
+from engine.loader import LOGS_DIR, RULES_PATH
+from engine.metrics import METRICS_FORMATS, RunMetrics
+from engine.parallel import DEFAULT_CHUNK_SIZE
+from engine.pipeline import OUTPUT_DIR
+from engine.store import STORE_FORMATS
+from engine.watcher import DEFAULT_CONCURRENCY, DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL
+
+# Keep this module's imports light: each subcommand imports what its stage needs,
+# so e.g. `summary` never loads matplotlib or pandas (see scripts/check_import_time.py).
+
+def stored_results(output_dir, youths=None):
+    """Yield stored *_audit.json results, optionally only for the named youths.
+
+    Runs with --store bulk keep their results in one JSON Lines file instead.
+    """
+    from engine.reporter import bulk_results_file, iter_jsonl_results
+
+    output_dir = Path(output_dir)
+    bulk_file = bulk_results_file(output_dir)
+    if bulk_file is not None:
+        try:
+            yield from iter_jsonl_results(bulk_file, youths)
+        except KeyError as e:
+            raise SystemExit(f"❌ No stored audit result for {e.args[0]} in {bulk_file}; run `audit` first.")
+        return
+    if youths:
+        paths = [output_dir / f"{youth}_audit.json" for youth in youths]
+    else:
+        paths = sorted(output_dir.glob("*_audit.json"))
+    for path in paths:
+        if not path.exists():
+            raise SystemExit(f"❌ No stored audit result at {path}; run `audit` first.")
+        with open(path) as f:
+            yield json.load(f)
+
+def cmd_audit(args):
+    if args.watch:
+        from engine.watcher import watch_logs
+        watch_logs(
+            logs_dir=args.logs_dir,
+            rules_path=args.rules,
+            output_dir=args.output_dir,
+            debounce=args.debounce,
+            concurrency=args.concurrency,
+            poll_interval=args.poll or DEFAULT_POLL_INTERVAL,
+            use_inotify=args.poll is None,
+        )
+        return 0
+
+    from engine.decoder import get_decoder
+    from engine.pipeline import run_pipeline
+    try:
+        get_decoder(args.decoder)
+    except ImportError as e:
+        raise SystemExit(f"❌ {e}")
+    metrics = RunMetrics(profile_dir=args.profile, trace_memory=args.trace_memory, count_bytes=True)
+    run_pipeline(
+        logs_dir=args.logs_dir,
+        rules_path=args.rules,
+        output_dir=args.output_dir,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        calendar_dpi=PREVIEW_DPI if args.preview_calendars else CALENDAR_DPI,
+        lazy_calendars=args.lazy_calendars,
+        full=args.full,
+        store=args.store,
+        store_format=args.store_format,
+        history=args.history,
+        background_writer=args.background_writer,
+        decoder=args.decoder,
+        cross_check=args.cross_check,
+        metrics=metrics,
+    )
+    if args.metrics:
+        fmt = args.metrics_format or ("prometheus" if args.metrics.suffix == ".prom" else "json")
+        metrics.save(args.metrics, fmt)
+        print(f"📊 Run metrics saved to {args.metrics}")
+    if args.profile:
+        print(f"🔬 Per-stage cProfile stats saved to {args.profile}/<stage>.prof")
+    return 0
+
+def cmd_report(args):
+    from engine.reporter import (
+        DashboardSummaryWriter, SummaryCsvWriter, save_individual_csv_reports
+    )
+
+    count = 0
+    if args.youths:
+        # A subset only refreshes its own reports; the run-wide summaries stay as they are
+        for result in stored_results(args.output_dir, args.youths):
+            save_individual_csv_reports([result], args.output_dir)
+            count += 1
+    else:
+        output_dir = Path(args.output_dir)
+        with SummaryCsvWriter(output_dir / "summary.csv") as summary, \
+                DashboardSummaryWriter(output_dir / "dashboard_summary.json") as dashboard:
+            for result in stored_results(output_dir):
+                save_individual_csv_reports([result], output_dir)
+                summary.write([result])
+                dashboard.write([result])
+                count += 1
+    print(f"📄 Rebuilt {count} report(s) in {args.output_dir}/")
+    return 0
+
+def cmd_render(args):
+    from engine.calendar import generate_gt_calendar
+    from engine.loader import load_rules
+    from engine.rules import compile_rules
+
+    plan = compile_rules(load_rules(args.rules))
+    calendar_dir = args.calendar_dir or Path(args.output_dir) / "calendars"
+    dpi = PREVIEW_DPI if args.preview else args.dpi
+    if args.pdf or args.sprites:
+        from engine.calendar_export import export_calendars
+
+        output, fmt = (args.pdf, "pdf") if args.pdf else (args.sprites, "sprites")
+        count = export_calendars(
+            stored_results(args.output_dir, args.youths), plan, output, fmt=fmt, dpi=dpi,
+            workers=args.workers, columns=args.columns, per_sheet=args.per_sheet,
+        )
+        print(f"📚 Exported {count} calendar(s) to {output}")
+        return 0
+    count = 0
+    for result in stored_results(args.output_dir, args.youths):
+        generate_gt_calendar(
+            youth_name=result["youth"],
+            start_date=result["start_date"],
+            files=result["valid_gt_files"] + result["misnamed"],
+            output_dir=calendar_dir,
+            backend=args.backend,
+            dpi=dpi,
+            **plan.calendar_options(result),
+        )
+        count += 1
+    print(f"📅 Rendered {count} calendar(s) to {calendar_dir}/")
+    return 0
+
+def cmd_facilities(args):
+    from engine.sharding import load_facilities, merge_partials, run_facilities, select_facilities
+
+    try:
+        config = load_facilities(args.config)
+        facilities = select_facilities(config, args.facility)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"❌ {e}")
+
+    if args.action == "merge":
+        missing = merge_partials(config)
+        return 1 if missing and args.strict else 0
+
+    print(f"🏢 Auditing {len(facilities)} facilities...")
+    outcomes = run_facilities(
+        facilities,
+        processes=args.processes,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        calendar_dpi=PREVIEW_DPI if args.preview_calendars else CALENDAR_DPI,
+        lazy_calendars=args.lazy_calendars,
+        full=args.full,
+        store=args.store,
+        decoder=args.decoder,
+    )
+    failed = sorted(name for name, outcome in outcomes.items() if "error" in outcome)
+    for name in sorted(outcomes):
+        outcome = outcomes[name]
+        if "error" in outcome:
+            print(f"❌ {name}: {outcome['error']}")
+        else:
+            print(f"✅ {name}: {outcome['youths']} youth in {outcome['elapsed']:.1f}s "
+                  f"({outcome['recomputed']} recomputed, {outcome['reused']} reused)")
+    # Nodes auditing a subset with --facility leave the merge to a final `facilities merge`
+    if not args.no_merge and not args.facility:
+        merge_partials(config)
+    return 1 if failed else 0
+
+def cmd_archive(args):
+    from engine.archive import ARCHIVE_DIR, SessionArchive
+    from engine.decoder import get_decoder, rule_levels
+    from engine.loader import load_rules
+    from engine.reporter import save_dashboard_summary, save_summary_rows_to_csv
+
+    try:
+        get_decoder(args.decoder)
+        archive = SessionArchive(args.archive or ARCHIVE_DIR)
+    except (ImportError, ValueError) as e:
+        raise SystemExit(f"❌ {e}")
+    rules = load_rules(args.rules)
+    if args.action == "update" or not args.no_update:
+        quarantine = []
+        archive.update(args.logs_dir, args.decoder, rule_levels(rules), quarantine, rebuild=args.rebuild)
+        if quarantine:
+            print(f"🚧 Skipped {len(quarantine)} invalid log(s)")
+    if args.action == "audit":
+        rows = archive.summary_rows(rules)
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        save_summary_rows_to_csv(rows, output_dir / "summary.csv")
+        save_dashboard_summary(rows, output_dir / "dashboard_summary.json")
+        print(f"📄 Summarized {len(rows)} youth from the archive into {output_dir}/summary.csv")
+    return 0
+
+SUMMARY_COLUMNS = ["youth", "security_level", "start_date", "missing_gt_sessions", "weeks_missing_gt", "misnamed_count"]
+
+def cmd_summary(args):
+    from engine.reporter import load_dashboard_summary
+
+    path = Path(args.output_dir) / "dashboard_summary.json"
+    if not path.exists():
+        raise SystemExit(f"❌ No summary at {path}; run `audit` first.")
+    rows = load_dashboard_summary(path)
+    if args.level:
+        rows = [r for r in rows if r["security_level"] == args.level]
+    if args.noncompliant:
+        rows = [r for r in rows if r["weeks_missing_gt"]]
+
+    if args.format == "json":
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    elif args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=SUMMARY_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        widths = {c: max([len(c)] + [len(str(r[c])) for r in rows]) for c in SUMMARY_COLUMNS}
+        print("  ".join(c.ljust(widths[c]) for c in SUMMARY_COLUMNS))
+        for r in rows:
+            print("  ".join(str(r[c]).ljust(widths[c]) for c in SUMMARY_COLUMNS))
+        print(f"\n{len(rows)} youth, {sum(1 for r in rows if r['weeks_missing_gt'])} with weeks missing GT")
+    return 0
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def add_audit_arguments(parser):
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for auditing and report writing (0 = one per core)")
+    parser.add_argument("--chunk-size", type=positive_int, default=DEFAULT_CHUNK_SIZE,
+                        help="youths loaded and handed to a worker per batch")
+    parser.add_argument("--preview-calendars", action="store_true",
+                        help=f"render calendars at {PREVIEW_DPI} dpi instead of {CALENDAR_DPI} dpi")
+    parser.add_argument("--lazy-calendars", action="store_true",
+                        help="skip eager calendar rendering; calendars are rendered on demand by the dashboard")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the manifest and re-audit every youth")
+    parser.add_argument("--store", choices=["files", "bulk", "columnar", "both"], default="files",
+                        help="per-youth JSON/CSV files; bulk: one audit_results.jsonl and one reports.zip; "
+                             "a columnar dataset under store/; or files and columnar "
+                             "(bulk and columnar-only runs skip the manifest and re-audit every youth)")
+    parser.add_argument("--decoder", choices=DECODERS, default="auto",
+                        help="JSON parser for raw logs (auto: msgspec, then orjson, then the standard library)")
+    parser.add_argument("--background-writer", action="store_true",
+                        help="write summaries and bulk outputs on a background thread, overlapping auditing")
+    parser.add_argument("--cross-check", action="store_true",
+                        help="index every filename across youths and write duplicates, misfiled notes "
+                             "and same-day double counts to cross_check.json")
+    parser.add_argument("--store-format", choices=STORE_FORMATS, default="arrow",
+                        help="file format of the columnar dataset")
+    parser.add_argument("--history", metavar="DB",
+                        help="also record this run in a SQLite audit history database")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and re-audit youths as their raw logs change")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="seconds without new writes before a burst of changes is audited (--watch)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="youths re-audited at once (--watch)")
+    parser.add_argument("--poll", type=float, nargs="?", const=DEFAULT_POLL_INTERVAL, metavar="SECONDS",
+                        help="poll raw_logs instead of using filesystem events (--watch)")
+    parser.add_argument("--metrics", type=Path, metavar="FILE",
+                        help="write per-stage timings, items, bytes written and peak RSS for the run to FILE")
+    parser.add_argument("--metrics-format", choices=METRICS_FORMATS,
+                        help="metrics file format (default: prometheus for *.prom, otherwise json)")
+    parser.add_argument("--profile", type=Path, metavar="DIR",
+                        help="run each stage under cProfile and write DIR/<stage>.prof")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record each stage's peak Python allocation with tracemalloc (slower)")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m engine", description="Audit youth therapy logs.")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR,
+                        help=f"where results are written and read (default {OUTPUT_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    audit = commands.add_parser("audit", help="audit raw logs and write all outputs")
+    audit.add_argument("--logs-dir", type=Path, default=LOGS_DIR, help=f"raw logs (default {LOGS_DIR})")
+    audit.add_argument("--rules", type=Path, default=RULES_PATH, help=f"audit rules (default {RULES_PATH})")
+    add_audit_arguments(audit)
+    audit.set_defaults(func=cmd_audit)
+
+    report = commands.add_parser("report", help="rebuild CSV reports and summaries from stored results")
+    report.add_argument("youths", nargs="*", help="only these youths (default: all, plus the summaries)")
+    report.set_defaults(func=cmd_report)
+
+    render = commands.add_parser("render", help="render calendars from stored results")
+    render.add_argument("youths", nargs="*", help="only these youths (default: all)")
+    render.add_argument("--calendar-dir", type=Path, help="default: <output-dir>/calendars")
+    render.add_argument("--dpi", type=int, default=CALENDAR_DPI)
+    render.add_argument("--preview", action="store_true", help=f"render at {PREVIEW_DPI} dpi")
+    render.add_argument("--backend", choices=CALENDAR_BACKENDS, default="raster")
+    render.add_argument("--rules", type=Path, default=RULES_PATH,
+                        help="audit rules giving the calendar year and GT requirement")
+    export = render.add_mutually_exclusive_group()
+    export.add_argument("--pdf", type=Path, metavar="FILE",
+                        help="write every calendar as one page of a single PDF instead of separate PNGs")
+    export.add_argument("--sprites", type=Path, metavar="DIR",
+                        help="tile the calendars into PNG sprite sheets with a calendars_index.json")
+    render.add_argument("--workers", type=int, default=1,
+                        help="processes composing calendars for --pdf/--sprites (0 = one per core)")
+    render.add_argument("--columns", type=int, default=4, help="calendars per sprite sheet row")
+    render.add_argument("--per-sheet", type=int, default=16, help="calendars per sprite sheet")
+    render.set_defaults(func=cmd_render)
+
+    facilities = commands.add_parser("facilities", help="audit several facilities in parallel and merge their summaries")
+    facilities.add_argument("config", type=Path, help="facilities config (JSON)")
+    facilities.add_argument("action", choices=["audit", "merge"],
+                            help="audit facilities (then merge), or only merge their partial summaries")
+    facilities.add_argument("--facility", action="append",
+                            help="only this facility (repeatable); the merge is then left to `merge`")
+    facilities.add_argument("--processes", type=int,
+                            help="facilities audited at once (default: one per core)")
+    facilities.add_argument("--workers", type=int, default=1, help="worker processes within each facility")
+    facilities.add_argument("--chunk-size", type=positive_int, default=DEFAULT_CHUNK_SIZE)
+    facilities.add_argument("--preview-calendars", action="store_true")
+    facilities.add_argument("--lazy-calendars", action="store_true")
+    facilities.add_argument("--full", action="store_true")
+    facilities.add_argument("--store", choices=["files", "bulk"], default="files")
+    facilities.add_argument("--decoder", choices=DECODERS, default="auto")
+    facilities.add_argument("--no-merge", action="store_true", help="skip the merge after auditing")
+    facilities.add_argument("--strict", action="store_true",
+                            help="merge: exit 1 if a facility has no partial summary yet")
+    facilities.set_defaults(func=cmd_facilities)
+
+    archive = commands.add_parser("archive", help="keep a binary session archive of the raw logs and audit from it")
+    archive.add_argument("action", choices=["update", "audit"],
+                         help="update the archive from the raw logs, or update it and write summary.csv "
+                              "and dashboard_summary.json from it")
+    archive.add_argument("--archive", type=Path, help="archive directory (default data/archive)")
+    archive.add_argument("--logs-dir", type=Path, default=LOGS_DIR, help=f"raw logs (default {LOGS_DIR})")
+    archive.add_argument("--rules", type=Path, default=RULES_PATH, help=f"audit rules (default {RULES_PATH})")
+    archive.add_argument("--decoder", choices=DECODERS, default="auto")
+    archive.add_argument("--rebuild", action="store_true", help="discard the archive and read every log again")
+    archive.add_argument("--no-update", action="store_true", help="audit: use the archive as it is")
+    archive.set_defaults(func=cmd_archive)
+
+    summary = commands.add_parser("summary", help="print the per-youth summary of the last run")
+    summary.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    summary.add_argument("--level", help="only this security level")
+    summary.add_argument("--noncompliant", action="store_true", help="only youths with weeks missing GT")
+    summary.set_defaults(func=cmd_summary)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "audit" and args.watch and (args.store != "files" or args.history):
+        parser.error("--watch keeps the per-youth files and summaries current; "
+                     "record columnar/history runs with a batch run instead")
+    if args.command == "audit" and args.watch and (args.metrics or args.profile or args.trace_memory):
+        parser.error("--metrics, --profile and --trace-memory measure a batch run, not --watch")
+    if args.command == "audit" and args.watch and args.cross_check:
+        parser.error("--cross-check indexes a whole batch run, not --watch")
+    return args.func(args)
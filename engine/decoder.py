@@ -0,0 +1,101 @@
+import json
+from functools import lru_cache
+
+from engine.validator import parse_date_ordinal
+
+DECODERS = ("auto", "msgspec", "orjson", "json")
+
+# Field -> expected type of a raw youth log; other fields are allowed and kept
+YOUTH_LOG_SCHEMA = {
+    "youth": str,
+    "security_level": str,
+    "start_date": str,
+    "files": list,
+}
+
+class LogValidationError(ValueError):
+    """A raw log that cannot be decoded or does not match YOUTH_LOG_SCHEMA."""
+
+    def __init__(self, source, errors, youth=None):
+        self.source = str(source)
+        self.errors = list(errors)
+        self.youth = youth
+        super().__init__(f"{self.source}: {'; '.join(self.errors)}")
+
+    def to_dict(self):
+        return {"path": self.source, "youth": self.youth, "errors": self.errors}
+
+@lru_cache(maxsize=None)
+def get_decoder(name="auto"):
+    """(name, loads) for a JSON parser; "auto" picks msgspec, then orjson, then the stdlib.
+
+    loads accepts bytes. Naming a parser that is not installed raises ImportError.
+    """
+    if name not in DECODERS:
+        raise ValueError(f"Unknown decoder {name!r}, expected one of {DECODERS}")
+    for candidate in (("msgspec", "orjson") if name == "auto" else (name,)):
+        if candidate == "msgspec":
+            try:
+                import msgspec
+            except ImportError:
+                if name == "auto":
+                    continue
+                raise ImportError("The msgspec decoder requires msgspec (pip install msgspec).") from None
+            return "msgspec", msgspec.json.Decoder().decode
+        if candidate == "orjson":
+            try:
+                import orjson
+            except ImportError:
+                if name == "auto":
+                    continue
+                raise ImportError("The orjson decoder requires orjson (pip install orjson).") from None
+            return "orjson", orjson.loads
+    return "json", json.loads
+
+def validate_youth_log(data, levels=None):
+    """Problems with a decoded youth log, as readable messages (empty if it is valid).
+
+    levels, if given, are the security levels the rules know about.
+    """
+    if not isinstance(data, dict):
+        return [f"expected a JSON object, got {type(data).__name__}"]
+
+    errors = []
+    for field, expected in YOUTH_LOG_SCHEMA.items():
+        if field not in data:
+            errors.append(f"{field}: missing")
+        elif not isinstance(data[field], expected):
+            errors.append(f"{field}: expected {expected.__name__}, got {type(data[field]).__name__}")
+    if errors:
+        return errors
+
+    youth = data["youth"]
+    # The name becomes part of output file names
+    if not youth.strip() or any(c in youth for c in "/\\\0") or youth in (".", ".."):
+        errors.append(f"youth: {youth!r} is not a usable name")
+    if levels and data["security_level"] not in levels:
+        errors.append(f"security_level: {data['security_level']!r} is not one of {sorted(levels)}")
+    if parse_date_ordinal(data["start_date"]) is None:
+        errors.append(f"start_date: {data['start_date']!r} is not a YYYY-MM-DD date")
+    bad_files = [f for f in data["files"] if not isinstance(f, str)]
+    if bad_files:
+        errors.append(f"files: {len(bad_files)} entries are not strings, e.g. {bad_files[0]!r}")
+    return errors
+
+def rule_levels(audit_rules):
+    """Security levels a log may use: those the rules set a GT requirement for (None = any)."""
+    return frozenset(audit_rules.get("group_therapy", {})) or None
+
+def decode_youth_log(raw, source="<log>", decoder="auto", levels=None):
+    """Decode and validate one raw log, raising LogValidationError if it is unusable."""
+    _, loads = get_decoder(decoder)
+    try:
+        data = loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        # orjson and msgspec errors subclass ValueError, like json.JSONDecodeError
+        raise LogValidationError(source, [f"invalid JSON: {e}"]) from None
+    errors = validate_youth_log(data, levels)
+    if errors:
+        youth = data.get("youth") if isinstance(data, dict) and isinstance(data.get("youth"), str) else None
+        raise LogValidationError(source, errors, youth)
+    return data
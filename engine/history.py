@@ -0,0 +1,259 @@
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from engine import __version__ as ENGINE_VERSION
+from engine.rules import compile_rules
+from engine.manifest import rules_digest
+from engine.validator import group_files_by_week
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    engine_version TEXT NOT NULL,
+    rules_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS youths (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    youth TEXT NOT NULL,
+    security_level TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    misnamed_count INTEGER NOT NULL,
+    weeks_missing_gt INTEGER NOT NULL,
+    PRIMARY KEY (run_id, youth)
+);
+CREATE TABLE IF NOT EXISTS weekly_gt (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    youth TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    week_start TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    required INTEGER NOT NULL,
+    PRIMARY KEY (run_id, youth, week)
+);
+CREATE TABLE IF NOT EXISTS misnamed_files (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    youth TEXT NOT NULL,
+    filename TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_weekly_gt_youth_week ON weekly_gt (youth, week_start);
+CREATE INDEX IF NOT EXISTS idx_youths_run_level ON youths (run_id, security_level);
+CREATE INDEX IF NOT EXISTS idx_misnamed_run_youth ON misnamed_files (run_id, youth);
+CREATE INDEX IF NOT EXISTS idx_youths_youth_run ON youths (youth, run_id);
+"""
+
+# Inclusive YYYY-MM-DD bounds used when a date range is left open
+EARLIEST = "0000-00-00"
+LATEST = "9999-99-99"
+
+def connect(db_path):
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def weekly_gt_rows(run_id, result, audit_rules):
+    """Every audited week for a youth, including compliant ones, as weekly_gt rows."""
+    plan = compile_rules(audit_rules)
+    start_date = datetime.strptime(result["start_date"], "%Y-%m-%d")
+    aligned_start = datetime.fromordinal(plan.aligned_start(start_date.toordinal()))
+    required = plan.gt_required(result["security_level"])
+    total_weeks = plan.total_weeks(start_date.toordinal())
+    grouped = group_files_by_week(result["valid_gt_files"], start_date, plan.week_start, total_weeks)
+    return [
+        (
+            run_id, result["youth"], week,
+            (aligned_start + timedelta(days=7 * (week - 1))).strftime("%Y-%m-%d"),
+            len(grouped.get(f"week_{week}", [])), required,
+        )
+        for week in range(plan.first_week(start_date.toordinal()), total_weeks + 1)
+    ]
+
+class HistoryRunWriter:
+    """Records one audit run. Everything is written in a single transaction that is
+    committed on close, so an aborted run leaves no partial history behind.
+
+    Youths are keyed by name within a run. A second result with a name already
+    recorded (two logs for the same youth) is not written; its name is listed in
+    `conflicts` instead of failing the whole run's insert.
+    """
+
+    def __init__(self, db_path, run_id, audit_rules):
+        self.run_id = run_id
+        self.audit_rules = audit_rules
+        self.count = 0
+        self.conflicts = []
+        self._recorded = set()
+        self.conn = connect(db_path)
+        self.conn.execute("BEGIN")
+        self.conn.execute(
+            "INSERT INTO runs (run_id, started_at, engine_version, rules_hash) VALUES (?, ?, ?, ?)",
+            (run_id, datetime.now().isoformat(timespec="seconds"), ENGINE_VERSION, rules_digest(audit_rules))
+        )
+
+    def write(self, results):
+        fresh = []
+        for r in results:
+            if r["youth"] in self._recorded:
+                self.conflicts.append(r["youth"])
+            else:
+                self._recorded.add(r["youth"])
+                fresh.append(r)
+        results = fresh
+        self.conn.executemany(
+            "INSERT INTO youths VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (self.run_id, r["youth"], r["security_level"], r["start_date"],
+                 len(r["misnamed"]), len(r["missing_gt_weeks"]))
+                for r in results
+            ]
+        )
+        self.conn.executemany(
+            "INSERT INTO weekly_gt VALUES (?, ?, ?, ?, ?, ?)",
+            [row for r in results for row in weekly_gt_rows(self.run_id, r, self.audit_rules)]
+        )
+        self.conn.executemany(
+            "INSERT INTO misnamed_files VALUES (?, ?, ?)",
+            [(self.run_id, r["youth"], f) for r in results for f in r["misnamed"]]
+        )
+        self.count += len(results)
+
+    def close(self, commit=True):
+        if commit:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+class AuditHistory:
+    """Read-only queries over recorded runs.
+
+    Single-run queries default to the latest run; the *_over_runs queries span every
+    run in a date range.
+    """
+
+    def __init__(self, db_path):
+        self.conn = connect(db_path)
+
+    def close(self):
+        self.conn.close()
+
+    def _rows(self, sql, params=()):
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def list_runs(self):
+        return self._rows("SELECT * FROM runs ORDER BY run_id")
+
+    def latest_run_id(self):
+        row = self.conn.execute("SELECT MAX(run_id) FROM runs").fetchone()
+        return row[0]
+
+    def _run(self, run_id):
+        return run_id if run_id is not None else self.latest_run_id()
+
+    def compliance_by_level(self, run_id=None):
+        return self._rows(
+            """
+            SELECT security_level,
+                   COUNT(*) AS youths,
+                   SUM(weeks_missing_gt > 0) AS out_of_compliance,
+                   AVG(weeks_missing_gt) AS avg_weeks_missing_gt,
+                   SUM(misnamed_count) AS misnamed_files
+            FROM youths WHERE run_id = ?
+            GROUP BY security_level ORDER BY security_level
+            """,
+            (self._run(run_id),)
+        )
+
+    def youth_trend(self, youth, since=None, run_id=None):
+        return self._rows(
+            """
+            SELECT week, week_start, count, required, count >= required AS compliant
+            FROM weekly_gt
+            WHERE youth = ? AND week_start >= ? AND run_id = ?
+            ORDER BY week_start
+            """,
+            (youth, since or EARLIEST, self._run(run_id))
+        )
+
+    def consecutive_noncompliant(self, min_weeks=3, since=None, run_id=None):
+        """Runs of at least min_weeks consecutive weeks below the GT requirement."""
+        return self._rows(
+            """
+            WITH short AS (
+                SELECT youth, week, week_start,
+                       week - ROW_NUMBER() OVER (PARTITION BY youth ORDER BY week) AS streak
+                FROM weekly_gt
+                WHERE run_id = ? AND week_start >= ? AND count < required
+            )
+            SELECT youth, MIN(week_start) AS first_week, MAX(week_start) AS last_week, COUNT(*) AS weeks
+            FROM short
+            GROUP BY youth, streak
+            HAVING COUNT(*) >= ?
+            ORDER BY weeks DESC, youth, first_week
+            """,
+            (self._run(run_id), since or EARLIEST, min_weeks)
+        )
+
+    def compliance_over_runs(self, since=None, until=None, security_level=None):
+        """Per-run compliance for runs started between since and until (YYYY-MM-DD), oldest first."""
+        return self._rows(
+            """
+            SELECT r.run_id, r.started_at,
+                   COUNT(*) AS youths,
+                   SUM(y.weeks_missing_gt > 0) AS out_of_compliance,
+                   AVG(y.weeks_missing_gt) AS avg_weeks_missing_gt,
+                   SUM(y.misnamed_count) AS misnamed_files
+            FROM runs r JOIN youths y ON y.run_id = r.run_id
+            WHERE substr(r.started_at, 1, 10) BETWEEN ? AND ? AND (? IS NULL OR y.security_level = ?)
+            GROUP BY r.run_id ORDER BY r.run_id
+            """,
+            (since or EARLIEST, until or LATEST, security_level, security_level)
+        )
+
+    def youth_over_runs(self, youth, since=None, until=None):
+        """One youth's compliance in every run started between since and until, oldest first."""
+        return self._rows(
+            """
+            SELECT r.run_id, r.started_at, y.security_level, y.weeks_missing_gt, y.misnamed_count,
+                   (SELECT COUNT(*) FROM weekly_gt w
+                    WHERE w.run_id = y.run_id AND w.youth = y.youth AND w.count >= w.required) AS weeks_compliant,
+                   (SELECT COUNT(*) FROM weekly_gt w
+                    WHERE w.run_id = y.run_id AND w.youth = y.youth) AS weeks_audited
+            FROM youths y JOIN runs r ON r.run_id = y.run_id
+            WHERE y.youth = ? AND substr(r.started_at, 1, 10) BETWEEN ? AND ?
+            ORDER BY r.run_id
+            """,
+            (youth, since or EARLIEST, until or LATEST)
+        )
+
+    def youth_weeks_over_runs(self, youth, since=None, until=None):
+        """A youth's weekly GT counts for weeks starting between since and until, as recorded by each run.
+
+        Shows how a week's count changed from run to run, e.g. as late notes were filed.
+        """
+        return self._rows(
+            """
+            SELECT w.week_start, w.run_id, r.started_at, w.count, w.required, w.count >= w.required AS compliant
+            FROM weekly_gt w JOIN runs r ON r.run_id = w.run_id
+            WHERE w.youth = ? AND w.week_start BETWEEN ? AND ?
+            ORDER BY w.week_start, w.run_id
+            """,
+            (youth, since or EARLIEST, until or LATEST)
+        )
+
+    def misnamed_files(self, youth, run_id=None):
+        return [
+            row["filename"] for row in self._rows(
+                "SELECT filename FROM misnamed_files WHERE run_id = ? AND youth = ? ORDER BY filename",
+                (self._run(run_id), youth)
+            )
+        ]
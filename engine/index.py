@@ -0,0 +1,199 @@
+import json
+import re
+from collections import Counter, defaultdict
+from datetime import date
+
+from engine.validator import _DATE_RE, classify_filename
+
+SESSION_LABELS = ("gt", "it", "ft", "ipp")
+FUZZY_THRESHOLD = 0.5  # trigram Jaccard similarity needed to call two names the same youth
+FINDINGS_FILE = "cross_check.json"
+
+_TOKEN_SPLIT_RE = re.compile(r"[^0-9A-Za-z]+")
+
+def normalize_name(name):
+    """Lowercase letters and digits only, so "Jordan Smith" and "jordan_smith" compare equal."""
+    return "".join(_TOKEN_SPLIT_RE.split(name)).lower()
+
+def claimed_name(filename):
+    """The youth name a filename claims, normalized, or None.
+
+    Handles the usual "<youth> GT <date>.docx", and also names with the parts swapped
+    ("GT <youth> <date>.docx") or run together ("<youth>GT<date>.docx"): the date,
+    extension, session labels and bare numbers are dropped and the rest is the name.
+    """
+    stem = filename.rpartition(".")[0] or filename
+    tokens = [
+        token for token in _TOKEN_SPLIT_RE.split(_DATE_RE.sub(" ", stem).lower())
+        if token and token not in SESSION_LABELS and not token.isdigit()
+    ]
+    return "".join(tokens) or None
+
+def trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FilenameIndex:
+    """Global (claimed youth, session type, date) -> occurrences index across every log.
+
+    Built while logs are loaded. Only compact integers are kept per file: the owner (the
+    youth whose log lists it) and whether it is a valid GT note. Filenames are kept only
+    for the few that do not follow "<youth> <TYPE> <date>". Claimed names are resolved
+    to known youths once per distinct name: exactly, with a session label stripped
+    ("JordanSmithGT"), or through a trigram index for misspellings. Nothing is compared
+    pairwise.
+    """
+
+    def __init__(self, fuzzy_threshold=FUZZY_THRESHOLD):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.names = []  # youth id -> name as written in its log
+        self._youth_ids = {}  # normalized name -> youth id
+        self._claims = {}  # normalized claimed name -> claim id
+        self._claim_names = []
+        self.occurrences = defaultdict(list)  # (claim id, session type, ordinal) -> [owner id << 1 | valid GT]
+        self.off_pattern = []  # (owner id, claim id, filename) for files not named "<owner> ..."
+        self.files = 0
+
+    def _youth_id(self, name):
+        key = normalize_name(name)
+        if key not in self._youth_ids:
+            self._youth_ids[key] = len(self.names)
+            self.names.append(name)
+        return self._youth_ids[key]
+
+    def _claim_id(self, claim):
+        if claim not in self._claims:
+            self._claims[claim] = len(self._claim_names)
+            self._claim_names.append(claim)
+        return self._claims[claim]
+
+    def add(self, youth_data):
+        owner = self._youth_id(youth_data["youth"])
+        prefix = f"{youth_data['youth']} "
+        for filename in youth_data["files"]:
+            record = classify_filename(filename)
+            self.files += 1
+            # Only dated session notes can be duplicated or double counted
+            session_type = record.counted_type
+            if session_type is None or record.date_ordinal is None:
+                continue
+            claim = claimed_name(filename)
+            if claim is None:
+                continue
+            claim_id = self._claim_id(claim)
+            self.occurrences[(claim_id, session_type, record.date_ordinal)].append(
+                owner << 1 | record.is_valid_gt
+            )
+            if not filename.startswith(prefix):
+                self.off_pattern.append((owner, claim_id, filename))
+
+    def _resolve_claims(self):
+        """Known youth id (or None) for every claimed name, and how it was matched."""
+        grams = defaultdict(list)  # trigram -> youth ids whose name contains it
+        sizes = [0] * len(self.names)
+        for key, youth_id in self._youth_ids.items():
+            key_grams = trigrams(key)
+            sizes[youth_id] = len(key_grams)
+            for gram in key_grams:
+                grams[gram].append(youth_id)
+
+        resolved = []
+        for claim in self._claim_names:
+            youth_id = self._youth_ids.get(claim)
+            how = "exact"
+            if youth_id is None:
+                for label in SESSION_LABELS:
+                    if claim.endswith(label) and claim[:-len(label)] in self._youth_ids:
+                        youth_id, how = self._youth_ids[claim[:-len(label)]], "label"
+                        break
+            if youth_id is None:
+                youth_id, how = self._fuzzy_match(claim, grams, sizes), "fuzzy"
+            resolved.append((youth_id, how if youth_id is not None else None))
+        return resolved
+
+    def _fuzzy_match(self, claim, grams, sizes):
+        claim_grams = trigrams(claim)
+        shared = Counter()
+        for gram in claim_grams:
+            shared.update(grams.get(gram, ()))
+        best, best_score = None, self.fuzzy_threshold
+        for youth_id, common in shared.items():
+            score = common / (len(claim_grams) + sizes[youth_id] - common)
+            if score >= best_score:
+                best, best_score = youth_id, score
+        return best
+
+    def findings(self):
+        """Cross-youth problems as JSON-ready lists; see README for each category."""
+        resolved = self._resolve_claims()
+        names = self.names
+
+        def when(ordinal):
+            return date.fromordinal(ordinal).isoformat()
+
+        by_youth = defaultdict(list)  # (resolved youth, session type, ordinal) -> packed owners
+        unknown = []
+        for (claim_id, session_type, ordinal), owners in self.occurrences.items():
+            youth_id = resolved[claim_id][0]
+            if youth_id is None:
+                unknown.extend((owner >> 1, claim_id, session_type, ordinal) for owner in owners)
+                continue
+            by_youth[(youth_id, session_type, ordinal)].extend(owners)
+
+        duplicates, double_counts = [], []
+        for (youth_id, session_type, ordinal), owners in by_youth.items():
+            owner_ids = {o >> 1 for o in owners}
+            if len(owner_ids) > 1:
+                duplicates.append({
+                    "youth": names[youth_id], "session_type": session_type, "date": when(ordinal),
+                    "filed_under": sorted(names[o] for o in owner_ids),
+                })
+            if session_type == "GT":
+                valid = Counter(o >> 1 for o in owners if o & 1)
+                for owner_id, count in valid.items():
+                    if count > 1:
+                        double_counts.append({"youth": names[owner_id], "date": when(ordinal), "count": count})
+
+        # A file filed under its own youth always starts with "<youth> ", so these are the only candidates
+        misfiled, name_mismatches = [], []
+        for owner_id, claim_id, filename in self.off_pattern:
+            youth_id, how = resolved[claim_id]
+            if youth_id is None:
+                continue
+            if youth_id == owner_id:
+                name_mismatches.append({"youth": names[owner_id], "filename": filename, "matched": how})
+            else:
+                misfiled.append({
+                    "filed_under": names[owner_id], "filename": filename,
+                    "belongs_to": names[youth_id], "matched": how,
+                })
+
+        return {
+            "files_indexed": self.files,
+            "youths": len(names),
+            "misfiled": sorted(misfiled, key=lambda f: (f["filed_under"], f["filename"])),
+            "duplicates": sorted(duplicates, key=lambda f: (f["youth"], f["date"])),
+            "double_counts": sorted(double_counts, key=lambda f: (f["youth"], f["date"])),
+            "name_mismatches": sorted(name_mismatches, key=lambda f: (f["youth"], f["filename"])),
+            "unknown_names": sorted(
+                ({"filed_under": names[o], "claimed": self._claim_names[c], "session_type": t, "date": when(d)}
+                 for o, c, t, d in unknown),
+                key=lambda f: (f["filed_under"], f["date"]),
+            ),
+        }
+
+def build_index(youth_logs):
+    index = FilenameIndex()
+    for youth_data in youth_logs:
+        index.add(youth_data)
+    return index
+
+def save_findings(findings, output_file):
+    with open(output_file, "w") as f:
+        json.dump(findings, f, indent=2)
+
+def findings_summary(findings):
+    return ", ".join(
+        f"{len(findings[k])} {k.replace('_', ' ')}"
+        for k in ("misfiled", "duplicates", "double_counts", "name_mismatches", "unknown_names")
+    )
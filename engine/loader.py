@@ -1,17 +1,61 @@
 import json
+from itertools import islice
 from pathlib import Path
 
+from engine.decoder import LogValidationError, decode_youth_log, get_decoder
+
 RULES_PATH = Path("data/audit_rules.json")
 LOGS_DIR = Path("data/raw_logs")
 
-def load_rules():
-    with open(RULES_PATH) as f:
+def load_rules(rules_path=None):
+    with open(rules_path or RULES_PATH) as f:
         return json.load(f)
 
-def load_youth_logs():
-    logs = []
-    for log_path in LOGS_DIR.glob("*.json"):
-        with open(log_path) as f:
-            data = json.load(f)
-            logs.append(data)
-    return logs
\ No newline at end of file
+def batched(items, size):
+    if size < 1:
+        # islice(..., 0) would end the stream at once and silently skip every log
+        raise ValueError(f"batch size must be at least 1, got {size}")
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def iter_log_paths(logs_dir=None):
+    return Path(logs_dir or LOGS_DIR).glob("*.json")
+
+def load_youth_log(log_path, decoder="auto"):
+    # Raw bytes straight into the fastest installed parser (see engine.decoder)
+    with open(log_path, "rb") as f:
+        return get_decoder(decoder)[1](f.read())
+
+def read_youth_log(log_path, decoder="auto", levels=None):
+    """Load and validate one log; raises engine.decoder.LogValidationError if it is unusable."""
+    with open(log_path, "rb") as f:
+        return decode_youth_log(f.read(), log_path, decoder, levels)
+
+def _validated_logs(log_paths, decoder, levels, quarantine):
+    for log_path in log_paths:
+        try:
+            yield read_youth_log(log_path, decoder, levels)
+        except LogValidationError as e:
+            quarantine.append(e.to_dict())
+
+def iter_youth_logs(batch_size=None, logs_dir=None, decoder="auto", levels=None, quarantine=None):
+    """Yield youth logs one at a time, or as lists of up to batch_size, reading lazily.
+
+    With a quarantine list, logs are validated as they are decoded; invalid ones are
+    skipped and their errors appended to the list.
+    """
+    log_paths = iter_log_paths(logs_dir)
+    if quarantine is None:
+        logs = (load_youth_log(log_path, decoder) for log_path in log_paths)
+    else:
+        logs = _validated_logs(log_paths, decoder, levels, quarantine)
+    if batch_size is None:
+        return logs
+    return batched(logs, batch_size)
+
+def load_youth_logs(logs_dir=None, decoder="auto", levels=None, quarantine=None):
+    return list(iter_youth_logs(logs_dir=logs_dir, decoder=decoder, levels=levels, quarantine=quarantine))
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from engine import __version__ as ENGINE_VERSION
+
+MANIFEST_NAME = ".audit_manifest.json"
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def rules_digest(audit_rules):
+    return hashlib.sha256(json.dumps(audit_rules, sort_keys=True).encode()).hexdigest()
+
+def output_paths(youth, output_dir, calendar_dir=None):
+    paths = [
+        Path(output_dir) / f"{youth}_audit.json",
+        Path(output_dir) / f"{youth}_report.csv",
+    ]
+    if calendar_dir is not None:
+        paths.append(Path(calendar_dir) / f"{youth}_GT_Calendar.png")
+    return paths
+
+class AuditManifest:
+    """Fingerprints of each raw log from the last run, used to skip unchanged youths.
+
+    An entry is reusable when the log's mtime and size are unchanged, or when they
+    changed but the content hash did not. The whole manifest is discarded when the
+    rules, output options or the engine version differ from the run that wrote it.
+    """
+
+    def __init__(self, path, audit_rules, engine_version=ENGINE_VERSION, options=None):
+        self.path = Path(path)
+        # Output options (e.g. calendar resolution) change the stored files too
+        self.rules_hash = rules_digest({"rules": audit_rules, "options": options or {}})
+        self.engine_version = engine_version
+        self.entries = {}
+        self.invalidated = False
+        self.reused = 0
+        self.recomputed = 0
+        self._seen = set()
+
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+            if stored.get("rules_hash") == self.rules_hash and stored.get("engine_version") == engine_version:
+                self.entries = stored.get("entries", {})
+            else:
+                self.invalidated = bool(stored)
+
+    def reusable_entry(self, log_path, output_dir, calendar_dir=None):
+        key = str(log_path)
+        self._seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        stat = os.stat(log_path)
+        if (entry["mtime_ns"], entry["size"]) != (stat.st_mtime_ns, stat.st_size):
+            if file_digest(log_path) != entry["sha256"]:
+                return None
+            entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+
+        if not all(p.exists() for p in output_paths(entry["youth"], output_dir, calendar_dir)):
+            return None
+        return entry
+
+    def load_reused(self, entry, output_dir):
+        """The stored result of a reusable entry; raises OSError/ValueError if it cannot be read."""
+        stored = load_stored_result(entry["youth"], output_dir)
+        self.reused += 1
+        return stored
+
+    def fingerprint(self, log_path):
+        # Taken before the log is read so edits made mid-run are picked up next time
+        stat = os.stat(log_path)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_digest(log_path)}
+
+    def record(self, log_path, youth, fingerprint):
+        self.entries[str(log_path)] = {"youth": youth, **fingerprint}
+        self.recomputed += 1
+
+    def forget(self, log_path):
+        return self.entries.pop(str(log_path), None)
+
+    def save(self, prune=True):
+        # Drop logs that no longer exist in raw_logs
+        entries = {k: v for k, v in self.entries.items() if k in self._seen} if prune else self.entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({
+                "engine_version": self.engine_version,
+                "rules_hash": self.rules_hash,
+                "entries": entries,
+            }, f, indent=2)
+
+def load_stored_result(youth, output_dir):
+    with open(Path(output_dir) / f"{youth}_audit.json") as f:
+        return json.load(f)
@@ -0,0 +1,305 @@
+import heapq
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+METRICS_FORMATS = ("json", "prometheus")
+SLOWEST_YOUTHS = 10
+
+# One profiler per stage per process; they keep accumulating across chunks and are
+# dumped to <profile_dir>/<stage>.<pid>.prof, then merged when the run finishes.
+_profilers = {}
+_active = set()
+
+def peak_rss_bytes(who="self"):
+    """Peak resident set size of this process ("self") or of its finished workers ("children")."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+def file_bytes(paths):
+    total = 0
+    for path in paths:
+        try:
+            total += os.stat(path).st_size
+        except OSError:
+            pass
+    return total
+
+def union_spans(spans):
+    """Sorted, non-overlapping [start, end] spans covering the same time as spans."""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def format_bytes(count):
+    return f"{count / 2**20:.1f} MB" if count >= 2**20 else f"{count / 1024:.1f} KB"
+
+class StageSample:
+    """Counts a `with metrics.stage(...)` block adds to its stage besides the timings."""
+    __slots__ = ("items", "bytes_written", "seconds")
+
+    def __init__(self, items=0):
+        self.items = items
+        self.bytes_written = 0
+        self.seconds = None  # wall time, set when the block exits
+
+class RunMetrics:
+    """Per-stage wall/CPU time, items and bytes written for one audit run.
+
+    Stages run in whichever process does the work. Worker chunks build their own
+    RunMetrics from options() and send state() back to be merge()d, so the totals
+    cover every process. Their time, summed over processes, is kept as
+    worker_seconds; they also record when each stage ran, so wall_seconds stays
+    the real elapsed time during which some process was in the stage. With profile_dir each stage is also run under cProfile,
+    and with trace_memory its peak Python allocation is recorded with tracemalloc.
+    """
+
+    def __init__(self, profile_dir=None, trace_memory=False, count_bytes=False, slowest=SLOWEST_YOUTHS,
+                 record_spans=False):
+        self.profile_dir = str(profile_dir) if profile_dir else None
+        self.trace_memory = trace_memory
+        self.count_bytes = count_bytes
+        self.slowest = slowest
+        self.record_spans = record_spans
+        self.stages = {}
+        # [start, end] epoch times per stage: what a worker ran, or the merged union
+        self.spans = {}
+        self._last_closed = None
+        self.slow = []  # min-heap of (seconds, youth, stage)
+        self.run = {}
+
+    def options(self):
+        return {
+            "profile_dir": self.profile_dir,
+            "trace_memory": self.trace_memory,
+            "count_bytes": self.count_bytes,
+            "slowest": self.slowest,
+            "record_spans": True,
+        }
+
+    def _totals(self, name):
+        if name not in self.stages:
+            self.stages[name] = {"calls": 0, "items": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "bytes_written": 0}
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name, items=0):
+        sample = StageSample(items)
+        # Nested stages are timed, but only the outermost one is profiled or traced
+        instrument = not _active
+        _active.add(name)
+        profiler = self._start_profile(name) if instrument and self.profile_dir else None
+        tracing = instrument and self.trace_memory
+        if tracing:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        started, wall, cpu = time.time(), time.perf_counter(), time.process_time()
+        try:
+            yield sample
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            sample.seconds = wall
+            if profiler is not None:
+                profiler.disable()
+            _active.discard(name)
+            totals = self._totals(name)
+            totals["calls"] += 1
+            totals["items"] += sample.items
+            totals["wall_seconds"] += wall
+            totals["cpu_seconds"] += cpu
+            totals["bytes_written"] += sample.bytes_written
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                totals["peak_traced_bytes"] = max(totals.get("peak_traced_bytes", 0), peak)
+            if self.record_spans:
+                self._add_span(name, started, started + wall)
+
+    def _add_span(self, name, start, end):
+        spans = self.spans.setdefault(name, [])
+        # Back-to-back blocks of one stage (a chunk's youths) make a single span
+        if self._last_closed == name and spans:
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+        self._last_closed = name
+
+    def _start_profile(self, name):
+        import cProfile
+        profiler = _profilers.get(name)
+        if profiler is None:
+            profiler = _profilers[name] = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def dump_profiles(self):
+        # Called after every chunk; each process overwrites its own files with its running totals
+        if not self.profile_dir:
+            return
+        Path(self.profile_dir).mkdir(parents=True, exist_ok=True)
+        for name, profiler in _profilers.items():
+            profiler.dump_stats(Path(self.profile_dir) / f"{name}.{os.getpid()}.prof")
+
+    def add_bytes(self, name, paths):
+        if self.count_bytes:
+            self._totals(name)["bytes_written"] += file_bytes(paths)
+
+    def youth(self, youth, stage, seconds):
+        """Remember a youth's time in a stage if it is among the slowest seen."""
+        self._keep_slowest((seconds, youth, stage))
+
+    def _keep_slowest(self, entry):
+        if len(self.slow) < self.slowest:
+            heapq.heappush(self.slow, entry)
+        elif entry > self.slow[0]:
+            heapq.heapreplace(self.slow, entry)
+
+    def state(self):
+        return {"stages": self.stages, "slow": self.slow, "spans": self.spans}
+
+    def merge(self, state):
+        for name, stage in state["stages"].items():
+            totals = self._totals(name)
+            for key, value in stage.items():
+                if key == "peak_traced_bytes":
+                    totals[key] = max(totals.get(key, 0), value)
+                elif key == "wall_seconds":
+                    # Processes overlap, so their summed time is not wall time
+                    totals["worker_seconds"] = totals.get("worker_seconds", 0.0) + value
+                else:
+                    totals[key] += value
+        for name, spans in state.get("spans", {}).items():
+            self.spans[name] = union_spans(self.spans.get(name, []) + spans)
+        for entry in state["slow"]:
+            self._keep_slowest(tuple(entry))
+
+    def finish(self, **run):
+        """Record run-level figures (youth counts, run id, ...) and merge the cProfile dumps."""
+        self.run = {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            **run,
+            "peak_rss_bytes": peak_rss_bytes("self"),
+            "worker_peak_rss_bytes": peak_rss_bytes("children"),
+        }
+        self._merge_profiles()
+
+    def _merge_profiles(self):
+        if not self.profile_dir:
+            return
+        import pstats
+        self.dump_profiles()
+        profile_dir = Path(self.profile_dir)
+        for name in self.stages:
+            parts = sorted(profile_dir.glob(f"{name}.*.prof"))
+            if not parts:
+                continue
+            stats = pstats.Stats(str(parts[0]))
+            for part in parts[1:]:
+                stats.add(str(part))
+            stats.dump_stats(profile_dir / f"{name}.prof")
+            for part in parts:
+                part.unlink()
+        _profilers.clear()
+
+    def wall_seconds(self, name):
+        """Real elapsed time of a stage: its blocks in this process plus the merged worker spans."""
+        stage = self.stages[name]
+        return stage["wall_seconds"] + sum(end - start for start, end in self.spans.get(name, ()))
+
+    def to_dict(self):
+        stages = {}
+        for name, stage in self.stages.items():
+            wall = self.wall_seconds(name)
+            stages[name] = {
+                **stage,
+                "wall_seconds": round(wall, 6),
+                "cpu_seconds": round(stage["cpu_seconds"], 6),
+                "items_per_second": round(stage["items"] / wall, 1) if wall and stage["items"] else None,
+            }
+            if "worker_seconds" in stage:
+                stages[name]["worker_seconds"] = round(stage["worker_seconds"], 6)
+        slowest = [
+            {"youth": youth, "stage": stage, "seconds": round(seconds, 6)}
+            for seconds, youth, stage in sorted(self.slow, reverse=True)
+        ]
+        return {"run": self.run, "stages": stages, "slowest_youths": slowest}
+
+    def summary_lines(self):
+        """Human-readable per-stage lines for the run log, slowest stage first."""
+        lines = []
+        for name, stage in sorted(self.stages.items(), key=lambda kv: -self.wall_seconds(kv[0])):
+            line = f"⏱️ {name}: {self.wall_seconds(name):.2f}s wall"
+            if "worker_seconds" in stage:
+                line += f" ({stage['worker_seconds']:.2f}s summed over processes)"
+            line += f", {stage['cpu_seconds']:.2f}s CPU"
+            if stage["items"]:
+                line += f", {stage['items']} items"
+            if stage["bytes_written"]:
+                line += f", {format_bytes(stage['bytes_written'])} written"
+            if "peak_traced_bytes" in stage:
+                line += f", {format_bytes(stage['peak_traced_bytes'])} peak traced"
+            lines.append(line)
+        return lines
+
+    def to_prometheus(self):
+        """Prometheus text exposition, for the node_exporter textfile collector."""
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        stages = self.stages.items()
+        metric("audit_stage_wall_seconds", "Elapsed wall-clock seconds during which some process was in each stage.",
+               [({"stage": n}, round(self.wall_seconds(n), 6)) for n, s in stages])
+        worker = [({"stage": n}, round(s["worker_seconds"], 6)) for n, s in stages if "worker_seconds" in s]
+        if worker:
+            metric("audit_stage_worker_seconds", "Seconds worker chunks spent in each stage, summed over processes.",
+                   worker)
+        metric("audit_stage_cpu_seconds", "CPU seconds spent in each stage, summed over processes.",
+               [({"stage": n}, round(s["cpu_seconds"], 6)) for n, s in stages])
+        metric("audit_stage_items", "Items processed by each stage.", [({"stage": n}, s["items"]) for n, s in stages])
+        metric("audit_stage_bytes_written", "Bytes written by each stage.",
+               [({"stage": n}, s["bytes_written"]) for n, s in stages])
+        traced = [({"stage": n}, s["peak_traced_bytes"]) for n, s in stages if "peak_traced_bytes" in s]
+        if traced:
+            metric("audit_stage_peak_traced_bytes", "Peak traced Python allocation within each stage.", traced)
+        for key in ("youths", "recomputed", "reused", "failures", "elapsed_seconds",
+                    "peak_rss_bytes", "worker_peak_rss_bytes"):
+            value = self.run.get(key)
+            if value is not None:
+                metric(f"audit_run_{key}", f"{key.replace('_', ' ').capitalize()} of the last audit run.",
+                       [({}, round(value, 6) if isinstance(value, float) else value)])
+        metric("audit_run_timestamp_seconds", "Unix time the last audit run finished.", [({}, int(time.time()))])
+        return "\n".join(lines) + "\n"
+
+    def save(self, output_file, fmt="json"):
+        """Write the metrics as JSON or a Prometheus textfile, replacing the file atomically."""
+        if fmt not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format {fmt!r}, expected one of {METRICS_FORMATS}")
+        output_file = Path(output_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = output_file.with_name(f".{output_file.name}.tmp")
+        with open(tmp_file, "w") as f:
+            if fmt == "json":
+                json.dump(self.to_dict(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+        os.replace(tmp_file, output_file)
@@ -0,0 +1,232 @@
+import sys
+from dataclasses import dataclass
+from datetime import date
+from enum import IntEnum
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from engine.rules import compile_rules
+from engine.validator import classify_files, parse_date_ordinal
+from engine.weeks import population_weeks
+from engine.windows import streaks
+
+class SessionType(IntEnum):
+    NONE = 0
+    GT = 1
+    IT = 2
+    FT = 3
+    IPP = 4
+
+    @classmethod
+    def from_label(cls, label):
+        return cls.NONE if label is None else cls[label]
+
+# Ordinal 0 is never a real date (date.min is ordinal 1), so it marks "no date"
+NO_DATE = 0
+
+# One row per file: everything the audit needs besides the name itself
+FILE_DTYPE = np.dtype([
+    ("session_type", np.int8),
+    ("date", np.int32),
+    ("valid_gt", np.bool_),
+    ("prefixed", np.bool_),
+])
+
+@dataclass(slots=True)
+class YouthFiles:
+    """A youth's filenames, stored without the repeated "<youth> " prefix.
+
+    Suffixes such as "GT 2024-03-04.docx" are interned, so every youth with a session on
+    that day shares one string. Per-file metadata lives in a single FILE_DTYPE array.
+    """
+    youth: str
+    suffixes: tuple
+    info: np.ndarray
+
+    @classmethod
+    def from_filenames(cls, youth, filenames):
+        prefix = f"{youth} "
+        info = np.zeros(len(filenames), dtype=FILE_DTYPE)
+        suffixes = []
+        for i, record in enumerate(classify_files(filenames)):
+            name = record.filename
+            prefixed = name.startswith(prefix)
+            suffixes.append(sys.intern(name[len(prefix):] if prefixed else name))
+            info[i] = (
+                SessionType.from_label(record.session_type),
+                NO_DATE if record.date_ordinal is None else record.date_ordinal,
+                record.is_valid_gt,
+                prefixed,
+            )
+        return cls(sys.intern(youth), tuple(suffixes), info)
+
+    def __len__(self):
+        return len(self.suffixes)
+
+    def filenames(self, mask=None):
+        prefix = f"{self.youth} "
+        indices = range(len(self.suffixes)) if mask is None else np.flatnonzero(mask).tolist()
+        prefixed = self.info["prefixed"]
+        return [prefix + self.suffixes[i] if prefixed[i] else self.suffixes[i] for i in indices]
+
+    def dates(self, session_type):
+        """Ordinals of every dated file of one session type."""
+        info = self.info
+        return info["date"][(info["session_type"] == session_type) & (info["date"] != NO_DATE)]
+
+@dataclass(slots=True)
+class YouthLog:
+    youth: str
+    security_level: str
+    start_ordinal: int
+    files: YouthFiles
+
+    @classmethod
+    def from_dict(cls, youth_data):
+        return cls(
+            sys.intern(youth_data["youth"]),
+            sys.intern(youth_data["security_level"]),
+            parse_date_ordinal(youth_data["start_date"]),
+            YouthFiles.from_filenames(youth_data["youth"], youth_data["files"]),
+        )
+
+    @property
+    def start_date(self):
+        return date.fromordinal(self.start_ordinal).isoformat()
+
+    def to_dict(self):
+        return {
+            "youth": self.youth,
+            "security_level": self.security_level,
+            "start_date": self.start_date,
+            "files": self.files.filenames(),
+        }
+
+def weekly_gt_counts(files, aligned_start, total_weeks):
+    """GT sessions per audit week as an int32 array; index 0 is week 1."""
+    info = files.info
+    dated = info["date"][info["valid_gt"] & (info["date"] != NO_DATE)]
+    week = population_weeks(np.full(len(dated), aligned_start), dated, aligned_start, 7 * total_weeks)
+    return np.bincount(week[week >= 1] - 1, minlength=total_weeks).astype(np.int32)
+
+@lru_cache(maxsize=64)
+def _week_key_order(total_weeks):
+    # audit_youth sorts missing weeks by their "week_N" key ("week_10" before "week_2")
+    order = sorted(range(1, total_weeks + 1), key=lambda i: f"week_{i}")
+    return np.array(order, dtype=np.int32)
+
+@dataclass(slots=True)
+class AuditResult:
+    """Compact audit_youth result: per-week GT counts as an array instead of week dicts.
+
+    to_dict() produces exactly the dict audit_youth returns.
+    """
+    youth: str
+    security_level: str
+    start_ordinal: int
+    files: YouthFiles
+    required: int
+    weekly_gt: np.ndarray
+    first_week: int = 1  # weeks before the audit period starts are not checked
+    missing_sessions: Optional[list] = None  # set when the rules add non-weekly-GT requirements
+    gt_streaks: Optional[list] = None  # set when the rules ask for streak_weeks
+
+    @classmethod
+    def from_log(cls, log, plan):
+        start = log.start_ordinal
+        result = cls(
+            log.youth, log.security_level, start, log.files, plan.gt_required(log.security_level),
+            weekly_gt_counts(log.files, plan.aligned_start(start), plan.total_weeks(start)),
+            plan.first_week(start),
+        )
+        if plan.extra:
+            result.missing_sessions = plan.evaluate_files(start, log.security_level, log.files.filenames())
+        if plan.streak_weeks:
+            result.gt_streaks = plan.gt_streaks(streaks(result.missing_mask().tolist(), plan.streak_weeks))
+        return result
+
+    @property
+    def start_date(self):
+        return date.fromordinal(self.start_ordinal).isoformat()
+
+    @property
+    def total_weeks(self):
+        return len(self.weekly_gt)
+
+    def missing_mask(self):
+        """Boolean array over weeks (index 0 is week 1) of weeks short of required GT sessions."""
+        mask = self.weekly_gt < self.required
+        mask[:self.first_week - 1] = False
+        return mask
+
+    def missing_weeks(self):
+        """Week numbers short of GT sessions, in the order audit_youth lists them."""
+        order = _week_key_order(self.total_weeks)
+        return order[self.missing_mask()[order - 1]]
+
+    @property
+    def valid_gt_files(self):
+        return self.files.filenames(self.files.info["valid_gt"])
+
+    @property
+    def misnamed(self):
+        return self.files.filenames(~self.files.info["valid_gt"])
+
+    def to_dict(self):
+        result = {
+            "youth": self.youth,
+            "security_level": self.security_level,
+            "start_date": self.start_date,
+            "valid_gt_files": self.valid_gt_files,
+            "misnamed": self.misnamed,
+            "missing_gt_weeks": [
+                {"week": f"week_{w}", "count": int(self.weekly_gt[w - 1]), "required": self.required}
+                for w in self.missing_weeks().tolist()
+            ],
+        }
+        if self.missing_sessions is not None:
+            result["missing_sessions"] = self.missing_sessions
+        if self.gt_streaks is not None:
+            result["gt_streaks"] = self.gt_streaks
+        return result
+
+    @classmethod
+    def from_dict(cls, result, audit_rules=None):
+        """Rebuild from today's JSON schema. Weekly counts are recomputed from valid_gt_files.
+
+        The requirement comes from audit_rules when given, otherwise from the stored
+        missing weeks. A fully compliant result read without rules gets required=0.
+        Without rules the default audit period and Monday weeks are assumed.
+        """
+        plan = compile_rules(audit_rules if audit_rules is not None else {})
+        if result["missing_gt_weeks"]:
+            required = result["missing_gt_weeks"][0]["required"]
+        else:
+            required = 0
+        log = YouthLog(
+            sys.intern(result["youth"]), sys.intern(result["security_level"]),
+            parse_date_ordinal(result["start_date"]),
+            YouthFiles.from_filenames(result["youth"], result["valid_gt_files"] + result["misnamed"]),
+        )
+        restored = cls.from_log(log, plan)
+        if audit_rules is None:
+            restored.required = required
+            # Stored extra findings are kept as they are; without rules they cannot be recomputed
+            restored.missing_sessions = result.get("missing_sessions")
+            restored.gt_streaks = result.get("gt_streaks")
+        return restored
+
+def compliance_matrix(results):
+    """Stack results into (counts, required, missing) arrays of shape (youths, weeks).
+
+    Weeks past a youth's audit period are counted as -1 and never flagged as missing.
+    """
+    max_weeks = max((r.total_weeks for r in results), default=0)
+    counts = np.full((len(results), max_weeks), -1, dtype=np.int32)
+    for i, r in enumerate(results):
+        counts[i, :r.total_weeks] = r.weekly_gt
+    required = np.array([r.required for r in results], dtype=np.int32)
+    missing = (counts >= 0) & (counts < required[:, None])
+    return counts, required, missing
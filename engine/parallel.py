@@ -0,0 +1,142 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from engine.auditor import audit_all, audit_youth
+from engine.calendar import CALENDAR_DPI, generate_gt_calendar
+from engine.loader import batched
+from engine.manifest import output_paths
+from engine.metrics import RunMetrics
+from engine.reporter import save_results_to_json, save_individual_csv_reports
+from engine.rules import compile_rules
+
+DEFAULT_CHUNK_SIZE = 64
+# Smaller chunks are audited youth by youth, which beats importing and setting up pandas
+VECTORIZE_MIN_YOUTHS = 16
+
+def resolve_workers(workers):
+    # 0 means one worker per core
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def _youth_name(youth_data):
+    return youth_data.get("youth", "Unknown") if isinstance(youth_data, dict) else "Unknown"
+
+def _failure(youth_data, stage, error, key=None):
+    failure = {"youth": _youth_name(youth_data), "stage": stage, "error": f"{type(error).__name__}: {error}"}
+    if key is not None:
+        failure["log"] = str(key)
+    return failure
+
+def audit_chunk(chunk, audit_rules, metrics=None, keys=None):
+    """Audit a chunk of youth logs; returns (results, failures, keys of the audited youths).
+
+    keys identify each log (the pipeline passes log paths, since youth names can
+    repeat) and default to positions in the chunk. Failures carry theirs as "log".
+    """
+    metrics = metrics or RunMetrics()
+    given = keys is not None
+    keys = list(keys) if given else list(range(len(chunk)))
+    if len(chunk) >= VECTORIZE_MIN_YOUTHS:
+        try:
+            with metrics.stage("audit") as sample:
+                results = audit_all(chunk, audit_rules)
+                sample.items = len(results)
+            return results, [], keys
+        except Exception:
+            pass
+
+    # One youth at a time, also the fallback so a single bad log is isolated
+    results, failures, audited = [], [], []
+    for key, youth_data in zip(keys, chunk):
+        with metrics.stage("audit", 1) as sample:
+            try:
+                results.append(audit_youth(youth_data, audit_rules))
+                audited.append(key)
+            except Exception as e:
+                failures.append(_failure(youth_data, "audit", e, key if given else None))
+        metrics.youth(_youth_name(youth_data), "audit", sample.seconds)
+    return results, failures, audited
+
+def write_chunk(results, output_dir, calendar_dir, calendar_dpi=CALENDAR_DPI, audit_rules=None, metrics=None,
+                keys=None):
+    # output_dir=None skips the per-youth JSON/CSV export; keys label failures as in audit_chunk
+    metrics = metrics or RunMetrics()
+    keys = keys if keys is not None else [None] * len(results)
+    failures = []
+    if output_dir is not None:
+        with metrics.stage("report", len(results)):
+            save_results_to_json(results, output_dir, verbose=False)
+            save_individual_csv_reports(results, output_dir)
+        metrics.add_bytes("report", [p for r in results for p in output_paths(r["youth"], output_dir)])
+    if calendar_dir is None:
+        return failures
+    plan = compile_rules(audit_rules) if audit_rules is not None else None
+    for key, result in zip(keys, results):
+        with metrics.stage("calendar", 1) as sample:
+            try:
+                generate_gt_calendar(
+                    youth_name=result["youth"],
+                    start_date=result["start_date"],
+                    files=result["valid_gt_files"] + result["misnamed"],
+                    output_dir=calendar_dir,
+                    dpi=calendar_dpi,
+                    **(plan.calendar_options(result) if plan else {})
+                )
+            except Exception as e:
+                failures.append(_failure(result, "calendar", e, key))
+        metrics.youth(result["youth"], "calendar", sample.seconds)
+        metrics.add_bytes("calendar", [Path(calendar_dir) / f"{result['youth']}_GT_Calendar.png"])
+    return failures
+
+def process_chunk(chunk, audit_rules, output_dir, calendar_dir, calendar_dpi=CALENDAR_DPI, metrics_options=None):
+    """Audit and write one chunk of (key, youth log) pairs.
+
+    Returns (results, failures, metrics state, result keys); the state is for
+    RunMetrics.merge() and the keys say which log each result came from.
+    """
+    metrics = RunMetrics(**(metrics_options or {}))
+    keys = [key for key, _ in chunk]
+    results, failures, audited = audit_chunk([youth_data for _, youth_data in chunk], audit_rules, metrics, keys)
+    try:
+        failures += write_chunk(results, output_dir, calendar_dir, calendar_dpi, audit_rules, metrics, audited)
+    except Exception as e:
+        failures += [_failure(result, "report", e, key) for key, result in zip(audited, results)]
+    metrics.dump_profiles()
+    return results, failures, metrics.state(), audited
+
+def iter_chunks(chunks, audit_rules, output_dir, calendar_dir, workers=1, calendar_dpi=CALENDAR_DPI,
+                metrics_options=None):
+    """Yield process_chunk's outcome for each chunk in input order as soon as it is done.
+
+    Each chunk is a list of (key, youth log) pairs; the key names the log (e.g. its path).
+    """
+    workers = resolve_workers(workers)
+    args = (audit_rules, output_dir, calendar_dir, calendar_dpi, metrics_options)
+    if workers == 1:
+        for chunk in chunks:
+            yield process_chunk(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded window of chunks in flight so memory stays flat
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(process_chunk, chunk, *args))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def run_chunks(youth_logs, audit_rules, output_dir, calendar_dir, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+               calendar_dpi=CALENDAR_DPI):
+    """Audit and write reports for every youth, returning (results, failures) in input order."""
+    chunks = batched(enumerate(youth_logs), chunk_size)
+    return _collect(iter_chunks(chunks, audit_rules, output_dir, calendar_dir, workers, calendar_dpi))
+
+def _collect(outcomes):
+    results, failures = [], []
+    for chunk_results, chunk_failures, _, _ in outcomes:
+        results.extend(chunk_results)
+        failures.extend(chunk_failures)
+    return results, failures
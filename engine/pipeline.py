@@ -0,0 +1,289 @@
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from engine.calendar import CALENDAR_DPI
+from engine.history import HistoryRunWriter
+from engine.decoder import LogValidationError, rule_levels
+from engine.index import FINDINGS_FILE, FilenameIndex, findings_summary, save_findings
+from engine.loader import LOGS_DIR, RULES_PATH, batched, iter_log_paths, load_rules, read_youth_log
+from engine.manifest import MANIFEST_NAME, AuditManifest
+from engine.metrics import RunMetrics
+from engine.parallel import DEFAULT_CHUNK_SIZE, iter_chunks, resolve_workers
+from engine.reporter import (
+    REPORTS_ZIP, RESULTS_JSONL, BackgroundWriter, CsvZipReportWriter, DashboardSummaryWriter,
+    JsonLinesResultWriter, SummaryCsvWriter, save_failures_to_json, save_quarantine_to_json
+)
+from engine.store import ColumnarResultWriter, new_run_id
+
+OUTPUT_DIR = Path("data/audit_results")
+
+def run_pipeline(
+    logs_dir=LOGS_DIR,
+    rules_path=RULES_PATH,
+    output_dir=OUTPUT_DIR,
+    workers=1,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    calendar_dpi=CALENDAR_DPI,
+    lazy_calendars=False,
+    full=False,
+    store="files",
+    store_format="arrow",
+    history=None,
+    background_writer=False,
+    decoder="auto",
+    cross_check=False,
+    progress=None,
+    log=print,
+    metrics=None,
+):
+    """Audit every youth log and write all outputs.
+
+    progress, if given, is called as progress(done, total, eta_seconds) after each
+    batch; log receives the human-readable status lines. store="bulk" streams results
+    into one JSON Lines file and the CSV reports into one zip instead of per-youth files.
+    background_writer moves summary and bulk file writes onto a writer thread.
+    Logs are decoded with `decoder` (see engine.decoder) and validated as they are
+    read; invalid ones are skipped and listed in quarantine.json. cross_check builds a
+    filename index over every log (engine.index) and writes cross-youth duplicates and
+    misfiled notes to cross_check.json. Per-stage timings are
+    collected into metrics (an engine.metrics.RunMetrics) and returned under
+    "metrics"; when metrics is passed in, a per-stage breakdown is also logged.
+    """
+    show_metrics = metrics is not None
+    metrics = metrics if metrics is not None else RunMetrics()
+    output_dir = Path(output_dir)
+    summary_file = output_dir / "summary.csv"
+    calendar_dir = None if lazy_calendars else output_dir / "calendars"
+    per_youth_dir = output_dir if store in ("files", "both") else None
+    started = time.perf_counter()
+
+    log("🔁 Loading rules and streaming logs...")
+    rules = load_rules(rules_path)
+    levels = rule_levels(rules)
+    log_paths = sorted(iter_log_paths(logs_dir))
+    total = len(log_paths)
+    manifest = AuditManifest(output_dir / MANIFEST_NAME, rules, options={"calendar_dpi": calendar_dpi})
+    if full:
+        manifest.entries = {}
+    elif manifest.invalidated:
+        log("♻️ Rules, output options or engine version changed, re-auditing every youth.")
+
+    workers = resolve_workers(workers)
+    log(f"📦 Auditing {total} youth with {workers} worker(s)...")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    failures = []
+    quarantined = []
+    index = FilenameIndex() if cross_check else None
+    pending = {}
+    done = 0
+    # Results are emitted in log path order whichever logs were reused or re-audited,
+    # so summary.csv and dashboard_summary.json rows do not move between runs
+    position = {str(p): i for i, p in enumerate(log_paths)}
+    settled = {}
+    emitted = 0
+
+    def report_progress(count):
+        nonlocal done
+        done += count
+        if progress is not None:
+            elapsed = time.perf_counter() - started
+            eta = elapsed / done * (total - done) if done else None
+            progress(done, total, eta)
+
+    run_id = new_run_id()
+    with ExitStack() as stack:
+        summary = stack.enter_context(SummaryCsvWriter(summary_file))
+        file_sinks = [summary, stack.enter_context(DashboardSummaryWriter(output_dir / "dashboard_summary.json"))]
+        if store == "bulk":
+            bulk = stack.enter_context(JsonLinesResultWriter(output_dir / RESULTS_JSONL))
+            file_sinks += [bulk, stack.enter_context(CsvZipReportWriter(output_dir / REPORTS_ZIP))]
+        if background_writer:
+            # Entered last so it drains before the files it writes to are closed
+            file_sinks = [stack.enter_context(BackgroundWriter(*file_sinks))]
+        sinks = list(file_sinks)
+        if store in ("columnar", "both"):
+            columnar = stack.enter_context(ColumnarResultWriter(output_dir / "store", run_id=run_id, fmt=store_format))
+            sinks.append(columnar)
+        if history:
+            history_writer = stack.enter_context(HistoryRunWriter(history, run_id, rules))
+            sinks.append(history_writer)
+
+        def emit(results):
+            # Summary CSV, dashboard artifact and, when enabled, the columnar store and history
+            with metrics.stage("summary", len(results)):
+                for sink in sinks:
+                    sink.write(results)
+
+        def settle(log_path, results=()):
+            settled[position[str(log_path)]] = results
+
+        def emit_settled():
+            # Emit every settled result that no earlier log is still waiting on
+            nonlocal emitted
+            ready = []
+            while emitted in settled:
+                ready += settled.pop(emitted)
+                emitted += 1
+            if ready:
+                emit(ready)
+
+        def logs_to_audit():
+            for log_path in log_paths:
+                # Reuse needs the stored per-youth JSON, so columnar-only runs always re-audit
+                if per_youth_dir is not None:
+                    with metrics.stage("manifest"):
+                        entry = manifest.reusable_entry(log_path, output_dir, calendar_dir)
+                    if entry is not None:
+                        with metrics.stage("reuse", 1):
+                            try:
+                                stored = manifest.load_reused(entry, output_dir)
+                            except (OSError, ValueError) as e:
+                                log(f"⚠️ Stored result for {log_path} is unreadable ({type(e).__name__}: {e}), "
+                                    f"re-auditing it.")
+                                entry = None
+                    if entry is not None:
+                        settle(log_path, [stored])
+                        emit_settled()
+                        if index is not None:
+                            # The index spans every youth, so unchanged logs are still read
+                            with metrics.stage("index", 1):
+                                try:
+                                    index.add(read_youth_log(log_path, decoder, levels))
+                                except LogValidationError:
+                                    pass
+                        report_progress(1)
+                        continue
+                with metrics.stage("manifest"):
+                    fingerprint = manifest.fingerprint(log_path)
+                with metrics.stage("load", 1) as sample:
+                    try:
+                        youth_data = read_youth_log(log_path, decoder, levels)
+                    except LogValidationError as e:
+                        youth_data = None
+                        quarantined.append(e.to_dict())
+                if youth_data is None:
+                    settle(log_path)
+                    emit_settled()
+                    report_progress(1)
+                    continue
+                metrics.youth(youth_data.get("youth"), "load", sample.seconds)
+                if index is not None:
+                    with metrics.stage("index", 1):
+                        index.add(youth_data)
+                # Keyed by path: two logs may name the same youth
+                pending[str(log_path)] = fingerprint
+                yield str(log_path), youth_data
+
+        batches = batched(logs_to_audit(), chunk_size)
+        chunks = iter_chunks(batches, rules, per_youth_dir, calendar_dir, workers, calendar_dpi, metrics.options())
+        for results, chunk_failures, chunk_metrics, keys in chunks:
+            metrics.merge(chunk_metrics)
+            for log_path, result in zip(keys, results):
+                manifest.record(log_path, result["youth"], pending.pop(log_path))
+                settle(log_path, [result])
+            for failure in chunk_failures:
+                pending.pop(failure["log"], None)
+                # A failed calendar or report still has its result, settled above
+                if failure["log"] not in keys:
+                    settle(failure["log"])
+            emit_settled()
+            failures.extend(chunk_failures)
+            # A youth whose calendar or report failed is in both lists, so count logs
+            report_progress(len(set(keys).union(f["log"] for f in chunk_failures)))
+
+    if per_youth_dir is not None:
+        with metrics.stage("manifest"):
+            manifest.save()
+        metrics.add_bytes("manifest", [manifest.path])
+        log(f"✅ Saved {summary.count} JSON results to {output_dir}/")
+        log(f"♻️ Recomputed {manifest.recomputed} youth, reused {manifest.reused} unchanged youth.")
+    if store == "bulk":
+        log(f"🗃️ Saved {bulk.count} results to {output_dir / RESULTS_JSONL} and reports to {output_dir / REPORTS_ZIP}")
+        metrics.add_bytes("summary", [output_dir / RESULTS_JSONL, output_dir / REPORTS_ZIP])
+    if store in ("columnar", "both"):
+        log(f"🗃️ Saved {columnar.count} results to {columnar.run_dir}/")
+    if history:
+        log(f"🕓 Recorded run {run_id} in {history}")
+        if history_writer.conflicts:
+            log(f"⚠️ {len(history_writer.conflicts)} result(s) share a youth name with another log and were not "
+                f"recorded in the history: {', '.join(sorted(set(history_writer.conflicts)))}")
+    log(f"📄 CSV summary saved to {summary_file}")
+    # Both rewritten every run, so a fixed log drops off its list
+    save_failures_to_json(failures, output_dir / "failures.json", log)
+    save_quarantine_to_json(quarantined, output_dir / "quarantine.json")
+    if quarantined:
+        log(f"🚧 Quarantined {len(quarantined)} invalid log(s), see {output_dir / 'quarantine.json'}")
+    findings = None
+    if index is not None:
+        with metrics.stage("index"):
+            findings = index.findings()
+            save_findings(findings, output_dir / FINDINGS_FILE)
+        log(f"🔎 Cross-checked {findings['files_indexed']} files: {findings_summary(findings)}, "
+            f"see {output_dir / FINDINGS_FILE}")
+    metrics.add_bytes("summary", [summary_file, output_dir / "dashboard_summary.json"])
+    elapsed = time.perf_counter() - started
+    metrics.finish(
+        run_id=run_id, youths=summary.count, recomputed=manifest.recomputed, reused=manifest.reused,
+        failures=len(failures), quarantined=len(quarantined), workers=workers, elapsed_seconds=elapsed,
+    )
+    if show_metrics:
+        for line in metrics.summary_lines():
+            log(line)
+    log("✅ Audit complete.")
+
+    return {
+        "run_id": run_id,
+        "youths": summary.count,
+        "recomputed": manifest.recomputed,
+        "reused": manifest.reused,
+        "failures": failures,
+        "quarantined": quarantined,
+        "cross_check": findings,
+        "elapsed": elapsed,
+        "metrics": metrics.to_dict(),
+    }
+
+class AuditJob:
+    """Runs run_pipeline on a background thread and exposes its progress.
+
+    Used by the dashboard so an audit does not need a fresh interpreter.
+    """
+
+    def __init__(self, on_complete=None, **options):
+        self.options = options
+        self.on_complete = on_complete
+        self.done = 0
+        self.total = None
+        self.eta = None
+        self.messages = []
+        self.result = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="audit-job", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def finished(self):
+        return self.result is not None or self.error is not None
+
+    def _progress(self, done, total, eta):
+        self.done, self.total, self.eta = done, total, eta
+
+    def _run(self):
+        try:
+            self.result = run_pipeline(progress=self._progress, log=self.messages.append, **self.options)
+        except Exception as e:
+            self.error = e
+        if self.on_complete is not None:
+            self.on_complete(self)
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
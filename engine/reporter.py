@@ -1,58 +1,347 @@
 import csv
+import io
+import os
+import queue
+import threading
+import zipfile
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime
 import json
 
-def save_results_to_json(results, output_dir):
+from engine.manifest import MANIFEST_NAME
+from engine.validator import parse_date_ordinal
+
+RESULTS_JSONL = "audit_results.jsonl"
+RESULTS_INDEX = "audit_results.index.json"
+REPORTS_ZIP = "reports.zip"
+WRITE_BUFFER_SIZE = 1 << 20
+WEEK_LABEL_CACHE_SIZE = 8192
+
+def save_results_to_json(results, output_dir, verbose=True):
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     for result in results:
         name = result["youth"]
         out_file = Path(output_dir) / f"{name}_audit.json"
         with open(out_file, "w") as f:
             json.dump(result, f, indent=2)
-    print(f"✅ Saved {len(results)} JSON results to {output_dir}/")
+    if verbose:
+        print(f"✅ Saved {len(results)} JSON results to {output_dir}/")
 
-def save_summary_to_csv(results, output_file):
-    headers = [
-        "youth", "security_level", "start_date",
-        "misnamed_count", "weeks_missing_gt"
-    ]
+SUMMARY_HEADERS = [
+    "youth", "security_level", "start_date",
+    "misnamed_count", "weeks_missing_gt"
+]
 
-    with open(output_file, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
+class SummaryCsvWriter:
+    """Appends summary rows as results arrive instead of waiting for the whole run."""
 
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.count = 0
+        self._file = open(output_file, "w", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=SUMMARY_HEADERS)
+        self._writer.writeheader()
+
+    def write(self, results):
         for r in results:
-            writer.writerow({
+            self._writer.writerow({
                 "youth": r["youth"],
                 "security_level": r["security_level"],
                 "start_date": r["start_date"],
                 "misnamed_count": len(r["misnamed"]),
                 "weeks_missing_gt": len(r["missing_gt_weeks"])
             })
+            self.count += 1
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def save_summary_to_csv(results, output_file):
+    with SummaryCsvWriter(output_file) as writer:
+        writer.write(results)
 
     print(f"📄 CSV summary saved to {output_file}")
 
+def dashboard_summary_row(result):
+    return {
+        "youth": result["youth"],
+        "security_level": result["security_level"],
+        "start_date": result["start_date"],
+        "missing_gt_sessions": sum(w["count"] for w in result["missing_gt_weeks"]),
+        "weeks_missing_gt": len(result["missing_gt_weeks"]),
+        "misnamed_count": len(result["misnamed"]),
+    }
+
+class DashboardSummaryWriter:
+    """Collects one small row per youth and writes the dashboard's summary artifact on close.
+
+    The file is replaced atomically so the dashboard never reads a half-written summary.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = Path(output_file)
+        self.rows = []
+
+    @property
+    def count(self):
+        return len(self.rows)
+
+    def write(self, results):
+        self.rows.extend(dashboard_summary_row(r) for r in results)
+
+    def close(self):
+        save_dashboard_summary(self.rows, self.output_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Keep the previous summary if the run failed part way
+        if exc_type is None:
+            self.close()
+
+def save_dashboard_summary(rows, output_file):
+    output_file = Path(output_file)
+    tmp_file = output_file.with_name(f".{output_file.name}.tmp")
+    with open(tmp_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(timespec="seconds"), "youths": rows}, f)
+    os.replace(tmp_file, output_file)
+
+def load_dashboard_summary(output_file):
+    with open(output_file) as f:
+        return json.load(f)["youths"]
+
+def save_summary_rows_to_csv(rows, output_file, fieldnames=SUMMARY_HEADERS):
+    """Rewrite summary.csv from dashboard summary rows, replacing the file atomically."""
+    output_file = Path(output_file)
+    tmp_file = output_file.with_name(f".{output_file.name}.tmp")
+    with open(tmp_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_file, output_file)
+
+def save_failures_to_json(failures, output_file, log=print):
+    """Record youths that failed to audit or render; an empty list removes the file."""
+    output_file = Path(output_file)
+    if not failures:
+        output_file.unlink(missing_ok=True)
+        return
+    with open(output_file, "w") as f:
+        json.dump(failures, f, indent=2)
+    log(f"⚠️ {len(failures)} failures recorded in {output_file}")
+
+@lru_cache(maxsize=WEEK_LABEL_CACHE_SIZE)
+def week_label(start_ordinal, week):
+    # Youths share start dates, so each (start, week) label is formatted once
+    return f"Week of {date.fromordinal(start_ordinal + (week - 1) * 7).isoformat()}"
+
+def report_rows(result):
+    """Rows of a youth's CSV report, header first."""
+    yield ["Issue Type", "Details"]
+
+    # Missing GT sessions
+    start_ordinal = parse_date_ordinal(result["start_date"])
+    for week_info in result.get("missing_gt_weeks", []):
+        label = week_label(start_ordinal, int(week_info["week"].rpartition("_")[2]))
+        yield ["Missing GT", f"{label}: {week_info['count']} of {week_info['required']} sessions"]
+
+    # Shortfalls against the extra requirements in audit_rules.json, if any
+    for item in result.get("missing_sessions", []):
+        yield [f"Missing {item['session_type']}", f"{item['period']}: {item['count']} of {item['required']} sessions"]
+
+    # Runs of consecutive weeks short of GT, when the rules set streak_weeks
+    for streak in result.get("gt_streaks", []):
+        first = week_label(start_ordinal, int(streak["first_week"].rpartition("_")[2]))
+        last = week_label(start_ordinal, int(streak["last_week"].rpartition("_")[2]))
+        yield ["GT Streak", f"{streak['weeks']} consecutive weeks short of GT: {first} to {last[len('Week of '):]}"]
+
+    # Misnamed files
+    for bad_file in result.get("misnamed", []):
+        yield ["Misnamed File", bad_file]
+
+def save_quarantine_to_json(quarantined, output_file):
+    """List logs skipped as invalid; an empty list removes the file."""
+    output_file = Path(output_file)
+    if not quarantined:
+        output_file.unlink(missing_ok=True)
+        return
+    with open(output_file, "w") as f:
+        json.dump(quarantined, f, indent=2)
+
 def save_individual_csv_reports(results, output_dir):
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     for result in results:
-        youth = result["youth"]
-        file_path = output_dir / f"{youth}_report.csv"
-
+        file_path = output_dir / f"{result['youth']}_report.csv"
         with open(file_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Issue Type", "Details"])
-
-            # Missing GT sessions
-            for week_info in result.get("missing_gt_weeks", []):
-                week_num = int(week_info["week"].replace("week_", ""))
-                start_date = datetime.strptime(result["start_date"], "%Y-%m-%d")
-                week_start = start_date + timedelta(days=(week_num - 1) * 7)
-                week_label = week_start.strftime("Week of %Y-%m-%d")
-                writer.writerow(["Missing GT", f"{week_label}: {week_info['count']} of {week_info['required']} sessions"])
-
-            # Misnamed files
-            for bad_file in result.get("misnamed", []):
-                writer.writerow(["Misnamed File", bad_file])
+            csv.writer(f).writerows(report_rows(result))
+
+class JsonLinesResultWriter:
+    """Streams every result into one JSON Lines file through a single buffered handle.
+
+    Alongside it, an index maps each youth to the (offset, length) of its line, so one
+    result can be read back without scanning the file. Both are replaced atomically on close.
+    """
+
+    def __init__(self, output_file, index_file=None):
+        self.output_file = Path(output_file)
+        self.index_file = Path(index_file) if index_file else self.output_file.with_name(RESULTS_INDEX)
+        self.index = {}
+        self._offset = 0
+        self._tmp_file = self.output_file.with_name(f".{self.output_file.name}.tmp")
+        self._file = open(self._tmp_file, "wb", buffering=WRITE_BUFFER_SIZE)
+
+    @property
+    def count(self):
+        return len(self.index)
+
+    def write(self, results):
+        for result in results:
+            line = json.dumps(result, separators=(",", ":")).encode() + b"\n"
+            self._file.write(line)
+            self.index[result["youth"]] = (self._offset, len(line))
+            self._offset += len(line)
+
+    def close(self):
+        self._file.close()
+        os.replace(self._tmp_file, self.output_file)
+        tmp_index = self.index_file.with_name(f".{self.index_file.name}.tmp")
+        with open(tmp_index, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_index, self.index_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the previous run's file if this one failed part way
+            self._file.close()
+            self._tmp_file.unlink(missing_ok=True)
+
+def load_results_index(index_file):
+    with open(index_file) as f:
+        return json.load(f)
+
+def read_indexed_result(results_file, offset, length):
+    with open(results_file, "rb") as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+def bulk_results_file(output_dir):
+    """The bulk JSON Lines results in output_dir, if they are newer than the per-youth files."""
+    results_file = Path(output_dir) / RESULTS_JSONL
+    if not results_file.exists():
+        return None
+    # Per-youth runs always save the manifest; a later bulk run supersedes them
+    manifest_file = Path(output_dir) / MANIFEST_NAME
+    if manifest_file.exists() and manifest_file.stat().st_mtime_ns > results_file.stat().st_mtime_ns:
+        return None
+    return results_file
+
+def iter_jsonl_results(results_file, youths=None):
+    """Yield results from a JSON Lines file, optionally only the named youths via its index."""
+    results_file = Path(results_file)
+    if not youths:
+        with open(results_file, "rb") as f:
+            for line in f:
+                yield json.loads(line)
+        return
+    index = load_results_index(results_file.with_name(RESULTS_INDEX))
+    for youth in youths:
+        if youth not in index:
+            raise KeyError(youth)
+        yield read_indexed_result(results_file, *index[youth])
+
+class CsvZipReportWriter:
+    """Writes every youth's CSV report as a member of one zip archive instead of one file each."""
+
+    def __init__(self, output_file):
+        self.output_file = Path(output_file)
+        self.count = 0
+        self._tmp_file = self.output_file.with_name(f".{self.output_file.name}.tmp")
+        self._zip = zipfile.ZipFile(self._tmp_file, "w", compression=zipfile.ZIP_DEFLATED)
+        self._buffer = io.StringIO()
+
+    def write(self, results):
+        for result in results:
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            csv.writer(self._buffer).writerows(report_rows(result))
+            self._zip.writestr(f"{result['youth']}_report.csv", self._buffer.getvalue())
+            self.count += 1
+
+    def close(self):
+        self._zip.close()
+        os.replace(self._tmp_file, self.output_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._zip.close()
+            self._tmp_file.unlink(missing_ok=True)
+
+class BackgroundWriter:
+    """Runs sinks' write() on a writer thread, so file I/O overlaps auditing.
+
+    write() only queues the results; at most max_pending batches wait, after which
+    it blocks so memory stays bounded. An error on the writer thread is raised from
+    the next write() or from close().
+    """
+
+    _DONE = object()
+
+    def __init__(self, *sinks, max_pending=8):
+        self.sinks = sinks
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="report-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            results = self._queue.get()
+            if results is self._DONE:
+                return
+            if self.error is not None:
+                continue
+            try:
+                for sink in self.sinks:
+                    sink.write(results)
+            except Exception as e:
+                self.error = e
+
+    def _raise(self):
+        if self.error is not None:
+            raise RuntimeError(f"Background report writer failed: {self.error}") from self.error
+
+    def write(self, results):
+        self._raise()
+        self._queue.put(results)
+
+    def close(self):
+        self._queue.put(self._DONE)
+        self._thread.join()
+        self._raise()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,310 @@
+import json
+from datetime import date
+from functools import lru_cache
+from math import ceil
+from typing import NamedTuple, Optional
+
+from engine.validator import classify_files, parse_date_ordinal, parse_ipp_month
+from engine.weeks import aligned_start, week_key
+from engine.windows import population_prefix_counts, population_window_counts, prefix_counts, window_count
+
+DEFAULT_AUDIT_END = "2024-12-31"
+DEFAULT_GT_REQUIRED = 2  # GT sessions per week for a level the rules do not list
+SESSION_LABELS = ("GT", "IT", "FT", "IPP")
+PERIOD_KINDS = ("week", "month", "rolling", "window")
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+IPP_EXTENSIONS = (".docx", ".pdf")
+
+class Requirement(NamedTuple):
+    session_type: str
+    period: str
+    required: dict  # security level -> sessions per period
+    default: int
+    days: Optional[int] = None  # rolling window length
+    step: Optional[int] = None  # rolling window stride
+    windows: tuple = ()  # explicit (first, last) ordinal pairs
+
+    def required_for(self, level):
+        return self.required.get(level, self.default)
+
+def _ordinal(value, field):
+    ordinal = parse_date_ordinal(value) if isinstance(value, str) else None
+    if ordinal is None:
+        raise ValueError(f"audit rules: {field} must be a YYYY-MM-DD date, got {value!r}")
+    return ordinal
+
+def _requirement(spec):
+    session_type = spec.get("session_type")
+    if session_type not in SESSION_LABELS:
+        raise ValueError(f"audit rules: session_type must be one of {SESSION_LABELS}, got {session_type!r}")
+    period = spec.get("period", "week")
+    if period not in PERIOD_KINDS:
+        raise ValueError(f"audit rules: period must be one of {PERIOD_KINDS}, got {period!r}")
+
+    required = spec.get("required", 0)
+    levels = required if isinstance(required, dict) else {}
+    default = spec.get("default", 0 if isinstance(required, dict) else required)
+
+    days = step = None
+    windows = ()
+    if period == "rolling":
+        days = int(spec.get("days", 7))
+        step = int(spec.get("step", days))
+        if days < 1 or step < 1:
+            raise ValueError("audit rules: rolling periods need days >= 1 and step >= 1")
+    elif period == "window":
+        windows = tuple(
+            (_ordinal(w["start"], "window start"), _ordinal(w["end"], "window end"))
+            for w in spec.get("windows", [])
+        )
+    return Requirement(session_type, period, levels, default, days, step, windows)
+
+def session_dates(records, start_ordinal):
+    """Dates each session type counts toward requirements, from a youth's FileRecords.
+
+    Notes count when they are dated .docx files (GT notes must also be valid). IPP
+    updates may be PDFs named by month ("IPP March 2025.pdf") and count on the first of
+    that month, or on the start date for the month the youth starts in, so the update
+    falls inside that month's period. A month without a year is in the youth's start year.
+    """
+    start = date.fromordinal(start_ordinal)
+    by_type = {}
+    for r in records:
+        session_type = r.counted_type
+        if session_type is None:
+            continue
+        ordinal = r.date_ordinal
+        if session_type == "IPP":
+            if r.extension not in IPP_EXTENSIONS:
+                continue
+            if ordinal is None:
+                month = parse_ipp_month(r.filename)
+                if month is None:
+                    continue
+                year = month[0] or start.year
+                ordinal = date(year, month[1], 1).toordinal()
+                if (year, month[1]) == (start.year, start.month):
+                    ordinal = start_ordinal
+        elif ordinal is None or r.extension != ".docx":
+            continue
+        if session_type == "GT" and not r.is_valid_gt:
+            continue
+        by_type.setdefault(session_type, []).append(ordinal)
+    return by_type
+
+class RulePlan:
+    """audit_rules.json compiled once per run into what the auditor evaluates per youth.
+
+    group_therapy stays the weekly GT requirement behind missing_gt_weeks. Optional
+    `requirements` add GT/IT/FT/IPP checks per week, calendar month, rolling window or
+    explicit date window. Their shortfalls are reported as missing_sessions.
+    Period boundaries depend only on a youth's start date. They are built once per start
+    date and shared by every youth who starts the same day. Sessions are counted
+    from per-day prefix sums (engine.windows), so each period costs O(1) however many
+    days it spans. streak_weeks adds gt_streaks: runs of at least that many
+    consecutive weeks short of GT sessions.
+    """
+
+    def __init__(self, audit_rules):
+        self.rules = audit_rules
+        week_start = audit_rules.get("week_start", "monday").lower()
+        if week_start not in WEEKDAYS:
+            raise ValueError(f"audit rules: week_start must be a weekday name, got {week_start!r}")
+        self.week_start = WEEKDAYS.index(week_start)
+
+        period = audit_rules.get("audit_period", {})
+        self.start_ordinal = _ordinal(period["start"], "audit_period.start") if period.get("start") else None
+        self.end_ordinal = _ordinal(period.get("end", DEFAULT_AUDIT_END), "audit_period.end")
+
+        self.gt = Requirement("GT", "week", dict(audit_rules.get("group_therapy", {})), DEFAULT_GT_REQUIRED)
+        self.extra = [_requirement(spec) for spec in audit_rules.get("requirements", [])]
+        self.streak_weeks = audit_rules.get("streak_weeks", 0)
+        if not isinstance(self.streak_weeks, int) or self.streak_weeks < 0:
+            raise ValueError(f"audit rules: streak_weeks must be a whole number of weeks, got {self.streak_weeks!r}")
+        self._periods = {}
+        self._spans = {}
+        self._bounds = {}
+
+    def gt_required(self, level):
+        return self.gt.required_for(level)
+
+    def aligned_start(self, start_ordinal):
+        # First day of the week containing the start date
+        return aligned_start(start_ordinal, self.week_start)
+
+    def total_weeks(self, start_ordinal):
+        return max(ceil((self.end_ordinal - start_ordinal) / 7), 0)
+
+    def first_week(self, start_ordinal):
+        """First week number inside the audit period; earlier weeks are not checked."""
+        if self.start_ordinal is None:
+            return 1
+        return max(1, (self.start_ordinal - self.aligned_start(start_ordinal)) // 7 + 1)
+
+    def calendar_year(self, start_ordinal):
+        # The year the audit period ends in, unless the youth only starts after it
+        return max(date.fromordinal(self.end_ordinal).year, date.fromordinal(start_ordinal).year)
+
+    def calendar_options(self, result):
+        """Renderer options that make a youth's calendar match its audit result.
+
+        The calendar uses the same week alignment as the auditor and draws red boxes for
+        exactly the result's missing_gt_weeks.
+        """
+        start_ordinal = parse_date_ordinal(result["start_date"])
+        return {
+            "required": self.gt_required(result["security_level"]),
+            "year": self.calendar_year(start_ordinal),
+            "week_start": self.week_start,
+            "missing_weeks": [int(w["week"].rpartition("_")[2]) for w in result["missing_gt_weeks"]],
+        }
+
+    def periods(self, index, start_ordinal):
+        """(label, first, last) of each period of requirement `index` for a youth starting on start_ordinal."""
+        key = (index, start_ordinal)
+        if key not in self._periods:
+            self._periods[key] = self._build_periods(self.extra[index], start_ordinal)
+        return self._periods[key]
+
+    def period_bounds(self, index, start_ordinal):
+        """periods() as two int64 arrays of first and last ordinals, for population counting."""
+        key = (index, start_ordinal)
+        if key not in self._bounds:
+            import numpy as np
+            periods = self.periods(index, start_ordinal)
+            self._bounds[key] = (
+                np.array([lo for _, lo, _ in periods], dtype=np.int64),
+                np.array([hi for _, _, hi in periods], dtype=np.int64),
+            )
+        return self._bounds[key]
+
+    def _build_periods(self, requirement, start_ordinal):
+        first = max(start_ordinal, self.start_ordinal or start_ordinal)
+        last = self.end_ordinal
+        spans = []
+        if requirement.period == "week":
+            aligned = self.aligned_start(start_ordinal)
+            for week in range(self.first_week(start_ordinal), self.total_weeks(start_ordinal) + 1):
+                lo = aligned + 7 * (week - 1)
+                spans.append((week_key(week), lo, lo + 6))
+        elif requirement.period == "month":
+            day = date.fromordinal(first).replace(day=1)
+            while day.toordinal() <= last:
+                following = day.replace(year=day.year + day.month // 12, month=day.month % 12 + 1)
+                spans.append((day.strftime("%Y-%m"), max(day.toordinal(), first), min(following.toordinal() - 1, last)))
+                day = following
+        elif requirement.period == "rolling":
+            lo = first
+            while lo + requirement.days - 1 <= last:
+                spans.append((None, lo, lo + requirement.days - 1))
+                lo += requirement.step
+        else:
+            spans = [(None, lo, hi) for lo, hi in requirement.windows if hi >= first and lo <= last]
+
+        return [
+            (label or f"{date.fromordinal(lo).isoformat()}..{date.fromordinal(hi).isoformat()}", lo, hi)
+            for label, lo, hi in spans
+        ]
+
+    def day_span(self, start_ordinal):
+        """(first, last) ordinal covering every period of every extra requirement for a youth."""
+        if start_ordinal not in self._spans:
+            periods = [p for index in range(len(self.extra)) for p in self.periods(index, start_ordinal)]
+            if periods:
+                self._spans[start_ordinal] = (min(lo for _, lo, _ in periods), max(hi for _, _, hi in periods))
+            else:
+                self._spans[start_ordinal] = (start_ordinal, start_ordinal)
+        return self._spans[start_ordinal]
+
+    def evaluate(self, start_ordinal, level, records):
+        """missing_sessions entries for one youth from its classified FileRecords."""
+        first, last = self.day_span(start_ordinal)
+        prefixes = {
+            session_type: prefix_counts(dates, first, last - first + 1)
+            for session_type, dates in session_dates(records, start_ordinal).items()
+        }
+
+        missing = []
+        for index, requirement in enumerate(self.extra):
+            required = requirement.required_for(level)
+            if required <= 0:
+                continue
+            prefix = prefixes.get(requirement.session_type)
+            for label, lo, hi in self.periods(index, start_ordinal):
+                count = window_count(prefix, first, lo, hi) if prefix else 0
+                if count < required:
+                    missing.append({
+                        "session_type": requirement.session_type,
+                        "period": label,
+                        "count": count,
+                        "required": required,
+                    })
+        return missing
+
+    def evaluate_population(self, start_ordinals, levels, records_by_youth):
+        """evaluate() for many youths at once, counting every period of every youth in one gather per requirement."""
+        import numpy as np
+
+        youths = len(start_ordinals)
+        missing = [[] for _ in range(youths)]
+        if not youths or not self.extra:
+            return missing
+        spans = [self.day_span(o) for o in start_ordinals]
+        first = min(lo for lo, _ in spans)
+        days = max(hi for _, hi in spans) - first + 1
+
+        rows, ordinals = {}, {}
+        for i, (start_ordinal, records) in enumerate(zip(start_ordinals, records_by_youth)):
+            for session_type, dates in session_dates(records, start_ordinal).items():
+                rows.setdefault(session_type, []).extend([i] * len(dates))
+                ordinals.setdefault(session_type, []).extend(dates)
+        prefixes = {t: population_prefix_counts(rows[t], ordinals[t], first, days, youths) for t in rows}
+
+        for index, requirement in enumerate(self.extra):
+            required = np.array([requirement.required_for(level) for level in levels], dtype=np.int64)
+            bounds = [self.period_bounds(index, o) for o in start_ordinals]
+            lengths = [len(lo) for lo, _ in bounds]
+            if not sum(lengths):
+                continue
+            period_rows = np.repeat(np.arange(youths), lengths)
+            prefix = prefixes.get(requirement.session_type)
+            if prefix is None:
+                counts = np.zeros(len(period_rows), dtype=np.int64)
+            else:
+                lo = np.concatenate([lo for lo, _ in bounds])
+                hi = np.concatenate([hi for _, hi in bounds])
+                counts = population_window_counts(prefix, period_rows, first, lo, hi)
+            short = np.flatnonzero((counts < required[period_rows]) & (required[period_rows] > 0))
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+            rows_short = period_rows[short]
+            positions = (short - offsets[rows_short]).tolist()
+            session_type = requirement.session_type
+            for row, position, count in zip(rows_short.tolist(), positions, counts[short].tolist()):
+                missing[row].append({
+                    "session_type": session_type,
+                    "period": self.periods(index, start_ordinals[row])[position][0],
+                    "count": count,
+                    "required": int(required[row]),
+                })
+        return missing
+
+    def gt_streaks(self, runs, first_week=1):
+        """gt_streaks entries from (start index, length) runs over weeks numbered from first_week."""
+        return [
+            {"first_week": week_key(first_week + start), "last_week": week_key(first_week + start + length - 1),
+             "weeks": length}
+            for start, length in runs
+        ]
+
+    def evaluate_files(self, start_ordinal, level, files):
+        return self.evaluate(start_ordinal, level, classify_files(files))
+
+@lru_cache(maxsize=16)
+def _compile(rules_json):
+    return RulePlan(json.loads(rules_json))
+
+def compile_rules(audit_rules):
+    """RulePlan for audit_rules (a dict from audit_rules.json or an existing plan), cached."""
+    if isinstance(audit_rules, RulePlan):
+        return audit_rules
+    return _compile(json.dumps(audit_rules, sort_keys=True))
@@ -0,0 +1,182 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from engine.reporter import SUMMARY_HEADERS, save_dashboard_summary, save_summary_rows_to_csv
+
+PARTIAL_SUMMARY = "partial_summary.json"
+FACILITY_HEADERS = ["facility"] + SUMMARY_HEADERS
+
+# Per-facility layout, relative to the facility root; the same layout a single-site run uses
+DEFAULT_LOGS_DIR = "data/raw_logs"
+DEFAULT_RULES = "data/audit_rules.json"
+DEFAULT_OUTPUT_DIR = "data/audit_results"
+MERGED_OUTPUT_DIR = "data/merged_results"
+
+class Facility(NamedTuple):
+    name: str
+    logs_dir: Path
+    rules_path: Path
+    output_dir: Path
+
+class FacilitiesConfig(NamedTuple):
+    facilities: list
+    output_dir: Path  # where merged summaries go
+
+def load_facilities(config_path):
+    """Read a facilities config.
+
+    {"output_dir": "data/merged_results", "rules": "shared_rules.json",
+     "facilities": [{"name": "north", "root": "sites/north", "rules": "...", ...}]}
+
+    Paths are relative to the config file; a facility's logs_dir, rules and output_dir
+    are relative to its root and default to the usual data/ layout. A top-level
+    "rules" is used by facilities that do not name their own.
+    """
+    config_path = Path(config_path)
+    with open(config_path) as f:
+        config = json.load(f)
+    base = config_path.parent
+
+    facilities = []
+    for spec in config.get("facilities", []):
+        name = spec.get("name")
+        if not isinstance(name, str) or not name or any(c in name for c in "/\\"):
+            raise ValueError(f"facilities config: every facility needs a file-safe name, got {name!r}")
+        if "root" not in spec:
+            raise ValueError(f"facilities config: facility {name!r} has no root")
+        root = base / spec["root"]
+        if "rules" in spec:
+            rules_path = root / spec["rules"]
+        elif "rules" in config:
+            rules_path = base / config["rules"]
+        else:
+            rules_path = root / DEFAULT_RULES
+        facilities.append(Facility(
+            name,
+            root / spec.get("logs_dir", DEFAULT_LOGS_DIR),
+            rules_path,
+            root / spec.get("output_dir", DEFAULT_OUTPUT_DIR),
+        ))
+
+    if not facilities:
+        raise ValueError("facilities config: no facilities listed")
+    names = [f.name for f in facilities]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"facilities config: duplicate facility names {duplicates}")
+    return FacilitiesConfig(facilities, base / config.get("output_dir", MERGED_OUTPUT_DIR))
+
+def select_facilities(config, names=None):
+    if not names:
+        return config.facilities
+    known = {f.name: f for f in config.facilities}
+    unknown = sorted(set(names) - set(known))
+    if unknown:
+        raise ValueError(f"Unknown facilities {unknown}, expected some of {sorted(known)}")
+    return [known[n] for n in names]
+
+def save_partial_summary(facility, run, rows):
+    """Write a facility's rows and run totals, replacing the previous partial atomically."""
+    output_file = Path(facility.output_dir) / PARTIAL_SUMMARY
+    tmp_file = output_file.with_name(f".{output_file.name}.tmp")
+    partial = {
+        "facility": facility.name,
+        "run_id": run["run_id"],
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "youths": run["youths"],
+        "recomputed": run["recomputed"],
+        "reused": run["reused"],
+        "failures": len(run["failures"]),
+        "quarantined": len(run.get("quarantined", [])),
+        "rows": rows,
+    }
+    with open(tmp_file, "w") as f:
+        json.dump(partial, f)
+    os.replace(tmp_file, output_file)
+    return output_file
+
+def audit_facility(facility, **options):
+    """Audit one facility (the map step) and write its partial summary. Runs in its own process."""
+    from engine.pipeline import run_pipeline
+    from engine.reporter import load_dashboard_summary
+
+    run = run_pipeline(
+        logs_dir=facility.logs_dir,
+        rules_path=facility.rules_path,
+        output_dir=facility.output_dir,
+        # One write per line, so lines from facilities running side by side do not interleave
+        log=lambda message: print(f"[{facility.name}] {message}\n", end="", flush=True),
+        **options,
+    )
+    # The run's dashboard artifact already holds one small row per youth
+    rows = load_dashboard_summary(Path(facility.output_dir) / "dashboard_summary.json")
+    save_partial_summary(facility, run, rows)
+    return facility.name, {k: run[k] for k in ("youths", "recomputed", "reused", "elapsed")}
+
+def run_facilities(facilities, processes=None, **options):
+    """Audit facilities in parallel, one process each (at most `processes` at a time).
+
+    Returns {facility: run totals}; a facility that fails is reported with its error
+    and the others still finish.
+    """
+    processes = min(processes or os.cpu_count() or 1, len(facilities))
+    outcomes = {}
+    if processes == 1:
+        for facility in facilities:
+            try:
+                name, totals = audit_facility(facility, **options)
+                outcomes[name] = totals
+            except Exception as e:
+                outcomes[facility.name] = {"error": f"{type(e).__name__}: {e}"}
+        return outcomes
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {pool.submit(audit_facility, facility, **options): facility for facility in facilities}
+        for future in as_completed(futures):
+            facility = futures[future]
+            try:
+                name, totals = future.result()
+                outcomes[name] = totals
+            except Exception as e:
+                outcomes[facility.name] = {"error": f"{type(e).__name__}: {e}"}
+    return outcomes
+
+def load_partial_summary(facility):
+    path = Path(facility.output_dir) / PARTIAL_SUMMARY
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def merge_partials(config, log=print):
+    """Combine every facility's partial summary into the global summary.csv and dashboard artifact.
+
+    Only the partials are read, never per-youth results. Rows are tagged with their
+    facility, since youth names may repeat across facilities. Returns the names of
+    facilities that have no partial summary yet.
+    """
+    rows, totals, missing = [], [], []
+    for facility in config.facilities:
+        partial = load_partial_summary(facility)
+        if partial is None:
+            missing.append(facility.name)
+            continue
+        rows.extend({"facility": facility.name, **row} for row in partial["rows"])
+        totals.append({k: v for k, v in partial.items() if k != "rows"})
+
+    rows.sort(key=lambda r: (r["facility"], r["youth"]))
+    output_dir = Path(config.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    save_summary_rows_to_csv(rows, output_dir / "summary.csv", FACILITY_HEADERS)
+    save_dashboard_summary(rows, output_dir / "dashboard_summary.json")
+    with open(output_dir / "facilities.json", "w") as f:
+        json.dump(totals, f, indent=2)
+
+    log(f"🧩 Merged {len(rows)} youth from {len(totals)} facilities into {output_dir}/")
+    if missing:
+        log(f"⚠️ No partial summary yet for: {', '.join(missing)}")
+    return missing
@@ -0,0 +1,214 @@
+from datetime import datetime
+from pathlib import Path
+
+# pyarrow is imported on first use so runs that never touch the store skip its import cost
+pa = pc = pq = None
+
+STORE_FORMATS = ("arrow", "parquet")
+
+def _require_pyarrow():
+    global pa, pc, pq
+    if pa is not None:
+        return
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("The columnar results store requires pyarrow (pip install pyarrow).") from None
+    pa, pc, pq = pyarrow, pyarrow.compute, pyarrow.parquet
+
+def _schemas():
+    return {
+        "youths": pa.schema([
+            ("youth", pa.string()),
+            ("security_level", pa.string()),
+            ("start_date", pa.string()),
+            ("valid_gt_count", pa.int32()),
+            ("misnamed_count", pa.int32()),
+            ("weeks_missing_gt", pa.int32()),
+            # Null when the rules do not ask for missing_sessions / gt_streaks
+            ("missing_sessions_count", pa.int32()),
+            ("gt_streak_count", pa.int32()),
+        ]),
+        "missing_weeks": pa.schema([
+            ("youth", pa.string()),
+            ("week", pa.int32()),
+            ("count", pa.int32()),
+            ("required", pa.int32()),
+        ]),
+        "misnamed_files": pa.schema([
+            ("youth", pa.string()),
+            ("filename", pa.string()),
+        ]),
+        "valid_gt_files": pa.schema([
+            ("youth", pa.string()),
+            ("filename", pa.string()),
+        ]),
+        "missing_sessions": pa.schema([
+            ("youth", pa.string()),
+            ("session_type", pa.string()),
+            ("period", pa.string()),
+            ("count", pa.int32()),
+            ("required", pa.int32()),
+        ]),
+        "gt_streaks": pa.schema([
+            ("youth", pa.string()),
+            ("first_week", pa.int32()),
+            ("last_week", pa.int32()),
+            ("weeks", pa.int32()),
+        ]),
+    }
+
+def new_run_id():
+    return datetime.now().strftime("%Y%m%dT%H%M%S%f")
+
+def _columns(results):
+    youths = {name: [] for name in ("youth", "security_level", "start_date", "valid_gt_count", "misnamed_count",
+                                    "weeks_missing_gt", "missing_sessions_count", "gt_streak_count")}
+    missing = {"youth": [], "week": [], "count": [], "required": []}
+    misnamed = {"youth": [], "filename": []}
+    valid = {"youth": [], "filename": []}
+    sessions = {"youth": [], "session_type": [], "period": [], "count": [], "required": []}
+    runs = {"youth": [], "first_week": [], "last_week": [], "weeks": []}
+
+    for r in results:
+        name = r["youth"]
+        youths["youth"].append(name)
+        youths["security_level"].append(r["security_level"])
+        youths["start_date"].append(r["start_date"])
+        youths["valid_gt_count"].append(len(r["valid_gt_files"]))
+        youths["misnamed_count"].append(len(r["misnamed"]))
+        youths["weeks_missing_gt"].append(len(r["missing_gt_weeks"]))
+        for w in r["missing_gt_weeks"]:
+            missing["youth"].append(name)
+            missing["week"].append(int(w["week"].replace("week_", "")))
+            missing["count"].append(w["count"])
+            missing["required"].append(w["required"])
+        misnamed["youth"].extend([name] * len(r["misnamed"]))
+        misnamed["filename"].extend(r["misnamed"])
+        valid["youth"].extend([name] * len(r["valid_gt_files"]))
+        valid["filename"].extend(r["valid_gt_files"])
+        extra = r.get("missing_sessions")
+        youths["missing_sessions_count"].append(None if extra is None else len(extra))
+        for m in extra or ():
+            sessions["youth"].append(name)
+            for key in ("session_type", "period", "count", "required"):
+                sessions[key].append(m[key])
+        streaks = r.get("gt_streaks")
+        youths["gt_streak_count"].append(None if streaks is None else len(streaks))
+        for streak in streaks or ():
+            runs["youth"].append(name)
+            runs["first_week"].append(int(streak["first_week"].replace("week_", "")))
+            runs["last_week"].append(int(streak["last_week"].replace("week_", "")))
+            runs["weeks"].append(streak["weeks"])
+
+    return {"youths": youths, "missing_weeks": missing, "misnamed_files": misnamed, "valid_gt_files": valid,
+            "missing_sessions": sessions, "gt_streaks": runs}
+
+class ColumnarResultWriter:
+    """Streams audit results into one file per table under <store_dir>/run=<run_id>/.
+
+    Arrow IPC files (the default) can be memory-mapped on read; Parquet trades that
+    for smaller files.
+    """
+
+    def __init__(self, store_dir, run_id=None, fmt="arrow"):
+        _require_pyarrow()
+        if fmt not in STORE_FORMATS:
+            raise ValueError(f"Unknown store format {fmt!r}; expected one of {STORE_FORMATS}")
+        self.run_id = run_id or new_run_id()
+        self.run_dir = Path(store_dir) / f"run={self.run_id}"
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.count = 0
+        self.schemas = _schemas()
+        self._writers = {}
+        for table, schema in self.schemas.items():
+            path = self.run_dir / f"{table}.{fmt}"
+            if fmt == "arrow":
+                self._writers[table] = pa.ipc.new_file(str(path), schema)
+            else:
+                self._writers[table] = pq.ParquetWriter(str(path), schema)
+
+    def write(self, results):
+        if not results:
+            return
+        for table, columns in _columns(results).items():
+            batch = pa.RecordBatch.from_pydict(columns, schema=self.schemas[table])
+            if self.fmt == "arrow":
+                self._writers[table].write_batch(batch)
+            else:
+                self._writers[table].write_table(pa.Table.from_batches([batch]))
+        self.count += len(results)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def save_results_to_store(results, store_dir, run_id=None, fmt="arrow"):
+    with ColumnarResultWriter(store_dir, run_id=run_id, fmt=fmt) as writer:
+        writer.write(results)
+    print(f"🗃️ Saved {writer.count} results to {writer.run_dir}/")
+    return writer.run_id
+
+def list_runs(store_dir):
+    runs = [p.name.split("=", 1)[1] for p in Path(store_dir).glob("run=*") if p.is_dir()]
+    return sorted(runs)
+
+def read_table(store_dir, table, run_id=None, memory_map=True):
+    """Read one table of a run (the latest by default) as a pyarrow Table."""
+    _require_pyarrow()
+    if run_id is None:
+        runs = list_runs(store_dir)
+        if not runs:
+            raise FileNotFoundError(f"No audit runs found in {store_dir}")
+        run_id = runs[-1]
+    run_dir = Path(store_dir) / f"run={run_id}"
+
+    arrow_path = run_dir / f"{table}.arrow"
+    if arrow_path.exists():
+        source = pa.memory_map(str(arrow_path)) if memory_map else pa.OSFile(str(arrow_path))
+        return pa.ipc.open_file(source).read_all()
+    return pq.read_table(run_dir / f"{table}.parquet", memory_map=memory_map)
+
+def load_result(store_dir, youth, run_id=None):
+    """Rebuild one youth's audit result dict, in the same shape audit_youth returns."""
+    def rows(table):
+        data = read_table(store_dir, table, run_id)
+        return data.filter(pc.equal(data["youth"], youth)).to_pylist()
+
+    youth_rows = rows("youths")
+    if not youth_rows:
+        return None
+    meta = youth_rows[0]
+    result = {
+        "youth": youth,
+        "security_level": meta["security_level"],
+        "start_date": meta["start_date"],
+        "valid_gt_files": [r["filename"] for r in rows("valid_gt_files")],
+        "misnamed": [r["filename"] for r in rows("misnamed_files")],
+        "missing_gt_weeks": [
+            {"week": f"week_{r['week']}", "count": r["count"], "required": r["required"]}
+            for r in rows("missing_weeks")
+        ],
+    }
+    # Runs written before these tables existed have neither column
+    if meta.get("missing_sessions_count") is not None:
+        result["missing_sessions"] = [
+            {key: r[key] for key in ("session_type", "period", "count", "required")}
+            for r in rows("missing_sessions")
+        ]
+    if meta.get("gt_streak_count") is not None:
+        result["gt_streaks"] = [
+            {"first_week": f"week_{r['first_week']}", "last_week": f"week_{r['last_week']}", "weeks": r["weeks"]}
+            for r in rows("gt_streaks")
+        ]
+    return result
@@ -1,37 +1,126 @@
+import calendar
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from collections import defaultdict
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from engine.weeks import aligned_start, week_index, week_key, week_of
+
+DATE_CACHE_SIZE = 4096
+FILENAME_CACHE_SIZE = 65536
+
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_DATE_SUFFIX_LEN = len("2024-01-01.docx")
+# "IPP March.pdf" / "IPP March 2025.pdf": IPP updates are named by month, not date
+_IPP_MONTH_RE = re.compile(
+    r'ipp\s+(' + '|'.join(calendar.month_name[1:]) + r')(?:\s+(\d{4}))?\b', re.IGNORECASE
+)
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+
+class FileRecord(NamedTuple):
+    filename: str
+    youth: Optional[str]
+    session_type: Optional[str]
+    date_ordinal: Optional[int]
+    extension: str
+    is_valid_gt: bool
+    misname_reason: Optional[str]
+
+    @property
+    def counted_type(self):
+        # A valid GT note counts as GT even when its label is a lowercase "gt"
+        return "GT" if self.is_valid_gt else self.session_type
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date_ordinal(date_str):
+    # Same date strings repeat across thousands of youths, so parse each once
+    try:
+        year, month, day = date_str.split("-")
+        return date(int(year), int(month), int(day)).toordinal()
+    except (ValueError, OverflowError):
+        return None
+
+@lru_cache(maxsize=FILENAME_CACHE_SIZE)
+def classify_filename(filename):
+    lowered = filename.lower()
+    match = _DATE_RE.search(filename)
+    date_ordinal = parse_date_ordinal(match.group()) if match else None
+    extension = "." + lowered.rpartition(".")[2] if "." in filename else ""
+
+    # Equivalent to re.search(r'GT.*\d{4}-\d{2}-\d{2}\.docx$', filename, re.IGNORECASE)
+    is_valid_gt = (
+        extension == ".docx"
+        and _DATE_RE.fullmatch(filename, len(filename) - _DATE_SUFFIX_LEN, len(filename) - 5) is not None
+        and "gt" in lowered[:-_DATE_SUFFIX_LEN]
+    )
+
+    # Same labels the calendar always coloured by: an uppercase "GT" marks a GT session
+    if "GT" in filename:
+        session_type = "GT"
+    elif "IT" in filename:
+        session_type = "IT"
+    elif "FT" in filename:
+        session_type = "FT"
+    elif "ipp" in lowered:
+        session_type = "IPP"
+    else:
+        session_type = None
+
+    if is_valid_gt:
+        misname_reason = None
+    elif not match:
+        misname_reason = "missing_date"
+    elif "gt" not in lowered:
+        misname_reason = "not_group_therapy"
+    elif extension != ".docx":
+        misname_reason = "wrong_extension"
+    else:
+        misname_reason = "malformed"
+
+    youth = filename.split(" ", 1)[0] if " " in filename else None
+    return FileRecord(filename, youth, session_type, date_ordinal, extension, is_valid_gt, misname_reason)
+
+@lru_cache(maxsize=FILENAME_CACHE_SIZE)
+def parse_ipp_month(filename):
+    """(year or None, month) of the month an IPP update is named for, or None."""
+    match = _IPP_MONTH_RE.search(filename)
+    if not match:
+        return None
+    return (int(match.group(2)) if match.group(2) else None), _MONTHS[match.group(1).lower()]
+
+def classify_files(filenames):
+    return [classify_filename(f) for f in filenames]
 
 def is_valid_gt_filename(filename):
     # Match files that contain 'GT' and a valid date ending in .docx
-    return bool(re.search(r'GT.*\d{4}-\d{2}-\d{2}\.docx$', filename, re.IGNORECASE))
+    return classify_filename(filename).is_valid_gt
 
 def extract_date_from_gt_file(filename):
-    match = re.search(r'(\d{4}-\d{2}-\d{2})', filename)
-    if match:
-        try:
-            return datetime.strptime(match.group(1), "%Y-%m-%d")
-        except ValueError:
-            return None
-    return None
-
-def group_files_by_week(filenames, start_date):
-    # Align start_date to the start of the week (Monday)
-    aligned_start = start_date - timedelta(days=start_date.weekday())
+    ordinal = classify_filename(filename).date_ordinal
+    return datetime.fromordinal(ordinal) if ordinal is not None else None
+
+def group_records_by_week(records, start_date, week_start=0, total_weeks=None):
+    # Align start_date to the start of the week (Monday = 0 unless the rules say otherwise)
+    aligned = aligned_start(start_date.toordinal(), week_start)
     weeks = defaultdict(list)
+    dated = [r for r in records if r.date_ordinal is not None and r.date_ordinal >= aligned]
 
-    for f in filenames:
-        dt = extract_date_from_gt_file(f)
-        if not dt:
-            continue
-        if dt < aligned_start:
-            continue
-        delta_days = (dt - aligned_start).days
-        week_num = delta_days // 7 + 1
-        week_key = f"week_{week_num}"
-        weeks[week_key].append(f)
+    if total_weeks is None:
+        for r in dated:
+            weeks[week_key(week_of(r.date_ordinal, aligned))].append(r.filename)
+        return weeks
 
+    # Audited weeks only, looked up in the day -> week index shared by youths with the same aligned start
+    index = week_index(aligned, 7 * total_weeks)
+    for r in dated:
+        offset = r.date_ordinal - aligned
+        if offset < len(index):
+            weeks[week_key(index[offset])].append(r.filename)
     return weeks
 
+def group_files_by_week(filenames, start_date, week_start=0, total_weeks=None):
+    return group_records_by_week(classify_files(filenames), start_date, week_start, total_weeks)
+
 def find_misnamed_files(filenames):
-    return [f for f in filenames if not is_valid_gt_filename(f)]
+    return [r.filename for r in classify_files(filenames) if not r.is_valid_gt]
@@ -0,0 +1,230 @@
+import asyncio
+import os
+from importlib.util import find_spec
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from engine.auditor import audit_youth
+from engine.calendar import CALENDAR_DPI
+from engine.decoder import rule_levels
+from engine.loader import LOGS_DIR, RULES_PATH, iter_log_paths, load_rules, read_youth_log
+from engine.manifest import MANIFEST_NAME, AuditManifest, output_paths
+from engine.parallel import write_chunk
+from engine.pipeline import OUTPUT_DIR, run_pipeline
+from engine.reporter import (
+    dashboard_summary_row, load_dashboard_summary, save_dashboard_summary, save_summary_rows_to_csv
+)
+
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_CONCURRENCY = 4
+
+# Reads (including our own) raise opened/closed_no_write events; only writes matter
+WRITE_EVENTS = {"created", "modified", "moved", "deleted", "closed"}
+
+def scan_logs(logs_dir):
+    """(mtime_ns, size) of every raw log, keyed by path."""
+    stats = {}
+    for path in iter_log_paths(logs_dir):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        stats[str(path)] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+async def poll_changes(logs_dir, queue, interval=DEFAULT_POLL_INTERVAL):
+    """Fallback when inotify is unavailable: diff directory snapshots every interval."""
+    previous = scan_logs(logs_dir)
+    while True:
+        await asyncio.sleep(interval)
+        current = scan_logs(logs_dir)
+        for path in previous.keys() | current.keys():
+            if previous.get(path) != current.get(path):
+                queue.put_nowait(path)
+        previous = current
+
+def start_observer(logs_dir, queue, loop):
+    """Forward filesystem events for *.json logs onto the asyncio queue via watchdog."""
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    logs_dir = Path(logs_dir)
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory or event.event_type not in WRITE_EVENTS:
+                return
+            for path in (event.src_path, getattr(event, "dest_path", "")):
+                if path and str(path).endswith(".json"):
+                    # Normalise to the same form iter_log_paths() and the manifest use
+                    loop.call_soon_threadsafe(queue.put_nowait, str(logs_dir / Path(os.fsdecode(path)).name))
+
+    observer = Observer()
+    observer.schedule(Handler(), str(logs_dir))
+    observer.start()
+    return observer
+
+async def debounced(queue, debounce=DEFAULT_DEBOUNCE):
+    """Yield sets of changed paths once no new event has arrived for `debounce` seconds."""
+    while True:
+        changed = {await queue.get()}
+        while True:
+            try:
+                changed.add(await asyncio.wait_for(queue.get(), timeout=debounce))
+            except asyncio.TimeoutError:
+                break
+        yield changed
+
+class LogWatcher:
+    """Keeps the audit outputs current while raw logs are added, edited or removed.
+
+    Each debounced burst of changes re-audits only the affected youths with
+    audit_youth, at most `concurrency` at a time. It then rewrites their per-youth
+    JSON/CSV, summary.csv, dashboard_summary.json and the manifest, so the next
+    batch run still reuses them. Calendars are left to the dashboard's on-demand cache.
+    Summary rows are kept by log path, like the manifest, since two logs may name
+    the same youth; that youth's outputs go only when neither log is left.
+    """
+
+    def __init__(self, logs_dir=LOGS_DIR, rules_path=RULES_PATH, output_dir=OUTPUT_DIR,
+                 debounce=DEFAULT_DEBOUNCE, concurrency=DEFAULT_CONCURRENCY,
+                 poll_interval=DEFAULT_POLL_INTERVAL, use_inotify=True, log=print):
+        self.logs_dir = Path(logs_dir)
+        self.rules_path = rules_path
+        self.output_dir = Path(output_dir)
+        self.debounce = debounce
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and find_spec("watchdog") is not None
+        self.log = log
+        self.rules = None
+        self.manifest = None
+        self.rows = {}
+
+    def sync(self):
+        """Bring the outputs up to date with an incremental batch run, then load its state."""
+        run_pipeline(logs_dir=self.logs_dir, rules_path=self.rules_path, output_dir=self.output_dir,
+                     lazy_calendars=True, log=self.log)
+        self.rules = load_rules(self.rules_path)
+        self.manifest = AuditManifest(self.output_dir / MANIFEST_NAME, self.rules,
+                                      options={"calendar_dpi": CALENDAR_DPI})
+        # Summary rows are in log path order, so a repeated name's rows pair up with its logs in turn
+        by_youth = {}
+        for row in load_dashboard_summary(self.output_dir / "dashboard_summary.json"):
+            by_youth.setdefault(row["youth"], []).append(row)
+        self.rows = {}
+        for log_path in sorted(self.manifest.entries):
+            rows = by_youth.get(self.manifest.entries[log_path]["youth"])
+            if rows:
+                self.rows[log_path] = rows.pop(0)
+
+    def unchanged(self, log_path):
+        entry = self.manifest.entries.get(str(log_path))
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(log_path)
+        except FileNotFoundError:
+            return False
+        return (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size)
+
+    def reaudit(self, log_path):
+        fingerprint = self.manifest.fingerprint(log_path)
+        youth_data = read_youth_log(log_path, levels=rule_levels(self.rules))
+        result = audit_youth(youth_data, self.rules)
+        write_chunk([result], self.output_dir, None)
+        return result, fingerprint
+
+    def remove(self, log_path):
+        """Forget a log; returns (youth, logs still naming that youth), or None if it was not tracked.
+
+        The youth's outputs are deleted only when no other log names it. Otherwise
+        they may be this log's, so the caller re-audits one of the remaining logs.
+        """
+        entry = self.manifest.forget(log_path)
+        self.rows.pop(str(log_path), None)
+        if entry is None:
+            return None
+        youth = entry["youth"]
+        others = sorted(path for path, other in self.manifest.entries.items() if other["youth"] == youth)
+        if not others:
+            for path in output_paths(youth, self.output_dir):
+                path.unlink(missing_ok=True)
+        return youth, others
+
+    async def apply(self, changed, executor):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def audit(log_path):
+            async with semaphore:
+                try:
+                    result, fingerprint = await loop.run_in_executor(executor, self.reaudit, log_path)
+                except Exception as e:
+                    # Usually a log caught mid-write; its next write event retries it
+                    self.log(f"⚠️ Could not audit {log_path}: {type(e).__name__}: {e}")
+                    return
+            # A log renamed to another youth leaves the old youth's outputs behind otherwise
+            previous = self.manifest.entries.get(str(log_path))
+            if previous is not None and previous["youth"] != result["youth"]:
+                await release(log_path)
+            self.manifest.record(log_path, result["youth"], fingerprint)
+            self.rows[str(log_path)] = dashboard_summary_row(result)
+            self.log(f"🔁 {result['youth']}: {len(result['missing_gt_weeks'])} weeks missing GT")
+
+        async def release(log_path):
+            removed = self.remove(log_path)
+            if removed is None:
+                return None
+            youth, others = removed
+            if others:
+                # The last log in path order is the one a batch run leaves the outputs from
+                await audit(others[-1])
+            return youth
+
+        async def handle(log_path):
+            if not os.path.exists(log_path):
+                youth = await release(log_path)
+                if youth is not None:
+                    self.log(f"🗑️ {log_path} ({youth}) removed")
+                return
+            if self.unchanged(log_path):
+                return
+            await audit(log_path)
+
+        await asyncio.gather(*(handle(path) for path in sorted(changed)))
+        # Log path order, as a batch run writes them
+        rows = [self.rows[log_path] for log_path in sorted(self.rows)]
+        save_summary_rows_to_csv(rows, self.output_dir / "summary.csv")
+        save_dashboard_summary(rows, self.output_dir / "dashboard_summary.json")
+        self.manifest.save(prune=False)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.sync)
+        queue = asyncio.Queue()
+        observer = poller = None
+        if self.use_inotify:
+            observer = start_observer(self.logs_dir, queue, loop)
+        else:
+            poller = asyncio.create_task(poll_changes(self.logs_dir, queue, self.poll_interval))
+        mode = "filesystem events" if observer else f"polling every {self.poll_interval:g}s"
+        self.log(f"👀 Watching {self.logs_dir} ({mode}), press Ctrl+C to stop.")
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                async for changed in debounced(queue, self.debounce):
+                    await self.apply(changed, executor)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            if poller is not None:
+                poller.cancel()
+
+def watch_logs(**options):
+    try:
+        asyncio.run(LogWatcher(**options).run())
+    except KeyboardInterrupt:
+        print("👋 Watcher stopped.")
@@ -0,0 +1,60 @@
+from functools import lru_cache
+
+WEEK_INDEX_CACHE_SIZE = 1024
+
+def weekday(ordinal):
+    # date.fromordinal(1) is a Monday, so Monday = 0 like date.weekday()
+    return (ordinal - 1) % 7
+
+def aligned_start(ordinal, week_start=0):
+    """First day of the week containing ordinal, for weeks starting on week_start (Monday = 0)."""
+    return ordinal - (weekday(ordinal) - week_start) % 7
+
+@lru_cache(maxsize=None)
+def week_key(week):
+    # "week_N" keys are built once and shared instead of formatted for every file
+    return f"week_{week}"
+
+def week_of(ordinal, aligned):
+    """1-based audit week of ordinal for a youth whose weeks start on aligned (<= 0 before it)."""
+    return (ordinal - aligned) // 7 + 1
+
+@lru_cache(maxsize=WEEK_INDEX_CACHE_SIZE)
+def week_index(aligned, days):
+    """day_weeks(aligned, aligned, days) as a tuple, for per-youth lookups without NumPy."""
+    return tuple(week_of(ordinal, aligned) for ordinal in range(aligned, aligned + days))
+
+@lru_cache(maxsize=WEEK_INDEX_CACHE_SIZE)
+def day_weeks(aligned, first, days):
+    """Read-only int32 array of the audit week of each day in [first, first + days).
+
+    Every youth whose weeks start on the same day shares the same array, so assigning
+    dates to weeks is a gather: day_weeks(...)[ordinals - first].
+    """
+    import numpy as np
+
+    weeks = (np.arange(first, first + days, dtype=np.int64) - aligned) // 7 + 1
+    weeks = weeks.astype(np.int32)
+    weeks.flags.writeable = False
+    return weeks
+
+def population_weeks(aligned, ordinals, first, days):
+    """Audit weeks of many sessions at once, as one gather from the shared day_weeks indexes.
+
+    aligned holds the first day of week 1 for each session's youth. The day_weeks index
+    of every distinct aligned start over [first, first + days) is stacked into a table,
+    so a session's week is table[its start, ordinal - first]. Sessions outside that
+    range get week 0, which no audit counts.
+    """
+    import numpy as np
+
+    aligned = np.asarray(aligned, dtype=np.int64)
+    offset = np.asarray(ordinals, dtype=np.int64) - first
+    weeks = np.zeros(len(offset), dtype=np.int32)
+    if not len(offset) or days <= 0:
+        return weeks
+    starts, which = np.unique(aligned, return_inverse=True)
+    table = np.stack([day_weeks(start, first, days) for start in starts.tolist()])
+    inside = (offset >= 0) & (offset < days)
+    weeks[inside] = table[which[inside], offset[inside]]
+    return weeks
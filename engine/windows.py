@@ -0,0 +1,72 @@
+from itertools import accumulate
+
+def prefix_counts(ordinals, first, days):
+    """Running session counts over the days [first, first + days).
+
+    prefix[i] is the number of sessions before day first + i, so any window [lo, hi]
+    inside the span holds prefix[hi - first + 1] - prefix[lo - first] sessions. Built in
+    one pass, after which every window, whatever its length or stride, costs O(1).
+    """
+    counts = [0] * days
+    for ordinal in ordinals:
+        offset = ordinal - first
+        if 0 <= offset < days:
+            counts[offset] += 1
+    return [0, *accumulate(counts)]
+
+def window_count(prefix, first, lo, hi):
+    return prefix[hi - first + 1] - prefix[lo - first]
+
+def streaks(flags, min_length):
+    """(start index, length) of every run of at least min_length consecutive true flags."""
+    runs = []
+    start = None
+    for i, flag in enumerate([*flags, False]):
+        if flag and start is None:
+            start = i
+        elif not flag and start is not None:
+            if i - start >= min_length:
+                runs.append((start, i - start))
+            start = None
+    return runs
+
+def population_prefix_counts(rows, ordinals, first, days, youths):
+    """prefix_counts for a whole population at once: an int64 array of shape (youths, days + 1).
+
+    rows and ordinals are parallel arrays, one entry per session; ordinals outside the
+    span are ignored.
+    """
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    offsets = np.asarray(ordinals, dtype=np.int64) - first
+    keep = (offsets >= 0) & (offsets < days)
+    counts = np.bincount(rows[keep] * days + offsets[keep], minlength=youths * days).reshape(youths, days)
+    prefix = np.zeros((youths, days + 1), dtype=np.int64)
+    np.cumsum(counts, axis=1, out=prefix[:, 1:])
+    return prefix
+
+def population_window_counts(prefix, rows, first, lo, hi):
+    """Session counts of many windows (youth row, [lo, hi]) in one gather."""
+    import numpy as np
+
+    lo = np.asarray(lo, dtype=np.int64) - first
+    hi = np.asarray(hi, dtype=np.int64) - first + 1
+    return prefix[rows, hi] - prefix[rows, lo]
+
+def population_streaks(missing, min_length):
+    """streaks() for every row of a boolean (youths, periods) array, without a per-period loop."""
+    import numpy as np
+
+    youths, periods = missing.shape
+    padded = np.zeros((youths, periods + 2), dtype=np.int8)
+    padded[:, 1:-1] = missing
+    edges = np.diff(padded, axis=1)  # +1 where a run starts, -1 one past where it ends
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    lengths = ends - starts
+    runs = [[] for _ in range(youths)]
+    for row, start, length in zip(start_rows.tolist(), starts.tolist(), lengths.tolist()):
+        if length >= min_length:
+            runs[row].append((start, length))
+    return runs
@@ -0,0 +1,69 @@
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root (one level up from scripts/) to sys.path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from engine.validator import classify_filename, parse_date_ordinal
+
+NAME_COUNT = 200_000
+REPEATS = 3
+
+def make_filenames(count, seed=0):
+    rng = random.Random(seed)
+    youths = [f"Youth{i:05d}" for i in range(count // 200 + 1)]
+    base = datetime(2024, 1, 1)
+    names = []
+    for _ in range(count):
+        day = (base + timedelta(days=rng.randrange(366))).strftime("%Y-%m-%d")
+        label = rng.choice(["GT", "GT", "GT", "IT", "FT"])
+        name = f"{rng.choice(youths)} {label} {day}.docx"
+        if rng.random() < 0.04:
+            name = name.replace(".docx", ".pdf")
+        names.append(name)
+    return names
+
+def legacy_parse(filename):
+    # What the auditor and calendar used to do for every filename
+    valid = bool(re.search(r'GT.*\d{4}-\d{2}-\d{2}\.docx$', filename, re.IGNORECASE))
+    misnamed = not bool(re.search(r'GT.*\d{4}-\d{2}-\d{2}\.docx$', filename, re.IGNORECASE))
+    dt = None
+    if valid:
+        match = re.search(r'(\d{4}-\d{2}-\d{2})', filename)
+        if match:
+            dt = datetime.strptime(match.group(1), "%Y-%m-%d")
+    match = re.search(r"\d{4}-\d{2}-\d{2}", filename)
+    if match:
+        datetime.strptime(match.group(), "%Y-%m-%d")
+    return valid, misnamed, dt
+
+def classifier_parse(filename):
+    return classify_filename(filename)
+
+def names_per_second(parse, names):
+    best = float("inf")
+    for _ in range(REPEATS):
+        classify_filename.cache_clear()
+        parse_date_ordinal.cache_clear()
+        start = time.perf_counter()
+        for name in names:
+            parse(name)
+        best = min(best, time.perf_counter() - start)
+    return len(names) / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else NAME_COUNT
+    names = make_filenames(count)
+    before = names_per_second(legacy_parse, names)
+    after = names_per_second(classifier_parse, names)
+    print(f"legacy regex + strptime: {before:,.0f} names/sec")
+    print(f"compiled classifier:     {after:,.0f} names/sec ({after / before:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add the project root (one level up from scripts/) to sys.path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from engine.auditor import audit_all
+from engine.loader import load_rules, load_youth_logs
+from engine.validator import classify_filename, parse_date_ordinal
+
+def retained_bytes(build):
+    # Memory still held by the returned objects once temporaries and caches are freed
+    gc.collect()
+    tracemalloc.start()
+    results = build()
+    classify_filename.cache_clear()
+    parse_date_ordinal.cache_clear()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return results, held
+
+def main():
+    logs_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    rules = load_rules()
+    logs = load_youth_logs(logs_dir)
+    # Warm up so lazily imported numpy/pandas are not counted
+    audit_all(logs[:1], rules, compact=True)
+    # Round-trip through JSON so the dict results own their strings, as when read from disk
+    dicts, dict_bytes = retained_bytes(lambda: json.loads(json.dumps(audit_all(logs, rules))))
+    compact, compact_bytes = retained_bytes(lambda: audit_all(logs, rules, compact=True))
+    assert [r.to_dict() for r in compact] == dicts
+
+    n = len(logs)
+    print(f"{n} youths")
+    print(f"dict results:    {dict_bytes / n:,.0f} bytes/youth")
+    print(f"compact results: {compact_bytes / n:,.0f} bytes/youth ({dict_bytes / compact_bytes:.1f}x smaller)")
+
+if __name__ == "__main__":
+    main()
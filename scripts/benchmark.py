@@ -0,0 +1,237 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root (one level up from scripts/) to sys.path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from engine.auditor import audit_all
+from engine.calendar import CALENDAR_DPI, generate_gt_calendar
+from engine.loader import load_rules, load_youth_logs
+from engine.reporter import (
+    DashboardSummaryWriter, SummaryCsvWriter, save_individual_csv_reports, save_results_to_json
+)
+from engine.rules import compile_rules
+from engine.validator import classify_files, classify_filename, parse_date_ordinal
+from generate_fake_data import generate_logs, parse_args as generator_args
+
+SIZES = (100, 10_000, 100_000)
+STAGES = ("load", "validate", "audit", "report", "calendar")
+BENCH_DIR = project_root / "data" / "benchmarks"
+HISTORY_FILE = BENCH_DIR / "history.jsonl"
+RULES_PATH = project_root / "data" / "audit_rules.json"
+CALENDAR_SAMPLE = 20  # calendars are timed on the first N youths; throughput is per calendar
+REGRESSION_THRESHOLD = 0.20  # throughput drop, relative to the last other commit, reported as a regression
+
+def dataset(size, seed):
+    """Logs for `size` youths, generated once per (size, seed) and reused by later runs."""
+    logs_dir = BENCH_DIR / "logs" / f"{size}_seed{seed}"
+    done = logs_dir / ".complete"
+    if not done.exists():
+        print(f"🛠️ Generating {size:,} youth logs in {logs_dir} ...")
+        args = generator_args(["--youths", str(size), "--seed", str(seed), "--compact",
+                               "--raw-logs-dir", str(logs_dir), "--no-generation-log"])
+        generate_logs(args)
+        done.touch()
+    return logs_dir
+
+def reset_peak_rss():
+    # Linux resets the VmHWM high-water mark on "5"; elsewhere the peak is process-wide
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+def peak_rss_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def stage_load(state):
+    state["logs"] = load_youth_logs(state["logs_dir"])
+    return len(state["logs"])
+
+def stage_validate(state):
+    classify_filename.cache_clear()
+    parse_date_ordinal.cache_clear()
+    count = 0
+    for youth_data in state["logs"]:
+        count += len(classify_files(youth_data["files"]))
+    return count
+
+def stage_audit(state):
+    state["results"] = audit_all(state["logs"], state["rules"])
+    return len(state["results"])
+
+def stage_report(state):
+    results = state["results"]
+    output_dir = state["output_dir"]
+    save_results_to_json(results, output_dir, verbose=False)
+    save_individual_csv_reports(results, output_dir)
+    with SummaryCsvWriter(output_dir / "summary.csv") as summary, \
+            DashboardSummaryWriter(output_dir / "dashboard_summary.json") as dashboard:
+        summary.write(results)
+        dashboard.write(results)
+    return len(results)
+
+def stage_calendar(state):
+    plan = compile_rules(state["rules"])
+    sample = state["results"][:CALENDAR_SAMPLE]
+    for result in sample:
+        generate_gt_calendar(
+            youth_name=result["youth"],
+            start_date=result["start_date"],
+            files=result["valid_gt_files"] + result["misnamed"],
+            output_dir=state["output_dir"] / "calendars",
+            dpi=CALENDAR_DPI,
+            **plan.calendar_options(result),
+        )
+    return len(sample)
+
+STAGE_FUNCTIONS = {
+    "load": stage_load,
+    "validate": stage_validate,
+    "audit": stage_audit,
+    "report": stage_report,
+    "calendar": stage_calendar,
+}
+
+def run_stage(name, state, repeat):
+    """Best-of-`repeat` wall time, with the CPU time and peak RSS of that run."""
+    best = None
+    for _ in range(repeat):
+        reset_peak_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        items = STAGE_FUNCTIONS[name](state)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        if best is None or wall < best["seconds"]:
+            best = {
+                "stage": name,
+                "items": items,
+                "seconds": round(wall, 4),
+                "cpu_seconds": round(cpu, 4),
+                "per_second": round(items / wall, 1) if wall else None,
+                "peak_rss_mb": round(peak_rss_bytes() / 2**20, 1),
+            }
+    return best
+
+def warm_up(logs_dir, rules):
+    # Import numpy/pandas and matplotlib up front; import cost is covered by check_import_time.py
+    from engine import calendar_render  # noqa: F401
+    audit_all(load_youth_logs(logs_dir)[:1], rules)
+
+def benchmark_size(size, stages, seed, repeat):
+    state = {"logs_dir": dataset(size, seed), "rules": load_rules(RULES_PATH)}
+    warm_up(state["logs_dir"], state["rules"])
+    # Later stages need the earlier stages' output even when they are not reported
+    needed = STAGES[:max(STAGES.index(s) for s in stages) + 1]
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="audit_bench_") as output_dir:
+        state["output_dir"] = Path(output_dir)
+        for name in needed:
+            row = run_stage(name, state, repeat if name in stages else 1)
+            if name in stages:
+                rows.append({"size": size, **row})
+                print_row(rows[-1])
+    return rows
+
+def git_commit():
+    def git(*args):
+        proc = subprocess.run(["git", *args], cwd=project_root, capture_output=True, text=True)
+        return proc.stdout.strip() if proc.returncode == 0 else None
+    commit = git("rev-parse", "--short", "HEAD")
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    return commit, dirty
+
+def load_history():
+    if not HISTORY_FILE.exists():
+        return []
+    with open(HISTORY_FILE) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def baseline_for(history, commit):
+    """Latest recorded row per (size, stage) from a different commit than this one."""
+    baseline = {}
+    for run in history:
+        if run["commit"] == commit:
+            continue
+        for row in run["results"]:
+            baseline[(row["size"], row["stage"])] = dict(row, commit=run["commit"])
+    return baseline
+
+def print_row(row):
+    print(f"  {row['size']:>8,} {row['stage']:<9} {row['items']:>10,} items  {row['seconds']:>9.3f} s  "
+          f"{row['per_second'] or 0:>12,.0f}/s  cpu {row['cpu_seconds']:>8.3f} s  peak {row['peak_rss_mb']:>8.1f} MB")
+
+def compare(rows, baseline, threshold):
+    regressions = []
+    for row in rows:
+        before = baseline.get((row["size"], row["stage"]))
+        if not before or not before.get("per_second") or not row["per_second"]:
+            continue
+        change = row["per_second"] / before["per_second"] - 1
+        regressed = change < -threshold
+        status = "❌" if regressed else "✅"
+        print(f"{status} {row['size']:>8,} {row['stage']:<9} {change:+7.1%} throughput, "
+              f"{row['peak_rss_mb'] - before['peak_rss_mb']:+8.1f} MB peak vs {before['commit']}")
+        if regressed:
+            regressions.append(row)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the loader, validator, auditor, reporter and calendar stages at several data sizes "
+                    "and compare throughput and peak memory with earlier commits."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="youth counts to benchmark")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--seed", type=int, default=0, help="generator seed; each (size, seed) data set is cached")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the fastest is kept")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="throughput drop reported as a regression (0.2 = 20%%)")
+    parser.add_argument("--no-save", action="store_true", help=f"do not append this run to {HISTORY_FILE}")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any stage regressed")
+    args = parser.parse_args(argv)
+
+    commit, dirty = git_commit()
+    print(f"⏱️ Benchmarking commit {commit}{' (uncommitted changes)' if dirty else ''}")
+    rows = []
+    for size in args.sizes:
+        rows += benchmark_size(size, args.stages, args.seed, args.repeat)
+
+    history = load_history()
+    regressions = compare(rows, baseline_for(history, commit), args.threshold)
+
+    if not args.no_save:
+        HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(HISTORY_FILE, "a") as f:
+            f.write(json.dumps({
+                "commit": commit,
+                "dirty": dirty,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "seed": args.seed,
+                "results": rows,
+            }) + "\n")
+        print(f"📈 Results appended to {HISTORY_FILE}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Add the project root (one level up from scripts/) to sys.path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from engine.auditor import audit_youth
+from engine.calendar import WEEKDAY_LABELS
+from engine.loader import LOGS_DIR, RULES_PATH, iter_youth_logs, load_rules
+from engine.rules import WEEKDAYS, compile_rules
+
+# Small cells keep the check fast; the box geometry does not depend on the size.
+# A 7 x 6.5 cell month box puts every grid edge on a whole multiple of CELL.
+CELL = 12
+SIZE = (CELL * 13 // 2, CELL * 7)
+
+def boxed_cells(images, header, cell):
+    """(month, row, col) of every grid cell with red pixels in it."""
+    import numpy as np
+
+    red = (images[..., 0] == 255) & (images[..., 1] == 0) & (images[..., 2] == 0)
+    grid = red[:, header:header + 6 * cell].reshape(12, 6, cell, 7, cell).any(axis=(2, 4))
+    return set(zip(*(a.tolist() for a in np.nonzero(grid))))
+
+def check_youth(youth_data, plan):
+    """Problems with the red boxes of one youth's raster calendar, compared with its audit result."""
+    import numpy as np
+    from engine.calendar_render import grid_positions, render_year_raster, session_matrix, year_weeks
+
+    result = audit_youth(youth_data, plan)
+    options = plan.calendar_options(result)
+    year, week_start, missing = options["year"], options["week_start"], set(options["missing_weeks"])
+    day_week = year_weeks(result["start_date"], year, week_start)
+    matrix = session_matrix(youth_data["files"], year)
+    images = np.stack(render_year_raster(matrix, year, day_week, sorted(missing), [SIZE] * 12, 72, week_start))
+    boxed = boxed_cells(images, CELL // 2, CELL)
+
+    problems = []
+    month, row, col, day = grid_positions(year, week_start)
+    for m, r, c, d, w in zip(month.tolist(), row.tolist(), col.tolist(), day.tolist(), day_week.tolist()):
+        in_box = (m, r, c) in boxed
+        if in_box and w not in missing:
+            problems.append(f"{year}-{m + 1:02d}-{d:02d} is boxed but week_{w} is not missing")
+        elif not in_box and w in missing:
+            problems.append(f"{year}-{m + 1:02d}-{d:02d} is in missing week_{w} but not boxed")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that every red-boxed calendar day falls in one of the youth's missing_gt_weeks, and back."
+    )
+    parser.add_argument("--logs-dir", type=Path, default=LOGS_DIR)
+    parser.add_argument("--rules", type=Path, default=RULES_PATH)
+    parser.add_argument("--week-start", action="append", choices=[d.lower() for d in WEEKDAY_LABELS],
+                        help="check with this week_start instead of the rules' (repeatable, e.g. mon and sun)")
+    parser.add_argument("--limit", type=int, default=20, help="youths to check (default 20)")
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    starts = args.week_start or [None]
+    logs = []
+    for youth_data in iter_youth_logs(logs_dir=args.logs_dir):
+        logs.append(youth_data)
+        if len(logs) == args.limit:
+            break
+
+    failed = 0
+    for start in starts:
+        week_rules = rules if start is None else {
+            **rules, "week_start": next(d for d in WEEKDAYS if d.startswith(start))
+        }
+        plan = compile_rules(week_rules)
+        for youth_data in logs:
+            problems = check_youth(youth_data, plan)
+            if problems:
+                failed += 1
+                print(f"❌ {youth_data['youth']} ({week_rules.get('week_start', 'monday')}): {problems[0]}"
+                      + (f" (+{len(problems) - 1} more)" if len(problems) > 1 else ""))
+        print(f"{'✅' if not failed else '❌'} {len(logs)} calendars checked with week_start "
+              f"{week_rules.get('week_start', 'monday')}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
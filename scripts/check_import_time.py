@@ -0,0 +1,62 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+# Run from anywhere: the engine package lives one level up from scripts/
+project_root = Path(__file__).resolve().parent.parent
+
+# Plotting, dataframe and columnar dependencies; only the stages that need them may load them
+HEAVY = ("matplotlib", "pandas", "numpy", "PIL", "pyarrow", "watchdog")
+
+# Module -> import budget in milliseconds (cumulative, as reported by -X importtime)
+CHECKS = {
+    "engine.cli": 150,
+    "engine.pipeline": 100,
+    "engine.auditor": 30,
+    "engine.reporter": 30,
+    "engine.calendar": 30,
+    "engine.watcher": 120,
+}
+
+def import_times(module):
+    """Cumulative import time in microseconds per module imported by `import module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+def check(module, budget_ms, runs=3):
+    # Best of a few runs, so a busy machine does not fail the check
+    best = None
+    for _ in range(runs):
+        times = import_times(module)
+        if best is None or times[module] < best[module]:
+            best = times
+    heavy = sorted({name.split(".")[0] for name in best} & set(HEAVY))
+    took_ms = best[module] / 1000
+    ok = not heavy and took_ms <= budget_ms
+    status = "✅" if ok else "❌"
+    print(f"{status} {module}: {took_ms:.1f} ms (budget {budget_ms} ms)"
+          + (f", imports {', '.join(heavy)}" if heavy else ""))
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if engine entry points import slowly or eagerly load heavy dependencies.")
+    parser.add_argument("modules", nargs="*", help=f"modules to check (default: {', '.join(CHECKS)})")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, e.g. for slow CI machines")
+    args = parser.parse_args()
+
+    modules = args.modules or list(CHECKS)
+    results = [check(m, CHECKS.get(m, CHECKS["engine.cli"]) * args.scale) for m in modules]
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from engine.reporter import RESULTS_INDEX, bulk_results_file, load_results_index, read_indexed_result
+from engine.store import load_result
+
+SUMMARY_ARTIFACT = "dashboard_summary.json"
+
+DISPLAY_COLUMNS = {
+    "youth": "Youth",
+    "security_level": "Security Level",
+    "start_date": "Start Date",
+    "missing_gt_sessions": "Missing GT Sessions",
+    "misnamed_count": "Misnamed Files",
+}
+
+def _mtime_ns(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+# Cached results are keyed on the file's mtime, so a new audit run invalidates them
+@st.cache_data(show_spinner=False)
+def _read_summary(path, mtime_ns):
+    with open(path) as f:
+        rows = json.load(f)["youths"]
+    return pd.DataFrame(rows, columns=list(DISPLAY_COLUMNS) + ["weeks_missing_gt"])
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _read_youth(path, mtime_ns):
+    with open(path) as f:
+        return json.load(f)
+
+@st.cache_data(show_spinner=False)
+def _read_index(path, mtime_ns):
+    return load_results_index(path)
+
+def refresh():
+    """Drop cached summary and youth data, e.g. after an in-process audit run."""
+    _read_summary.clear()
+    _read_youth.clear()
+    _read_index.clear()
+
+def load_summary(audit_dir):
+    """Precomputed per-youth summary written by the audit run (empty if none yet)."""
+    path = Path(audit_dir) / SUMMARY_ARTIFACT
+    mtime_ns = _mtime_ns(path)
+    if mtime_ns is None:
+        return pd.DataFrame(columns=list(DISPLAY_COLUMNS) + ["weeks_missing_gt"])
+    return _read_summary(str(path), mtime_ns)
+
+def summary_table(audit_dir):
+    return load_summary(audit_dir)[list(DISPLAY_COLUMNS)].rename(columns=DISPLAY_COLUMNS)
+
+def youth_names(audit_dir):
+    return sorted(load_summary(audit_dir)["youth"].tolist())
+
+def load_youth_detail(audit_dir, youth):
+    """One youth's full audit result, read only when that youth is selected."""
+    path = Path(audit_dir) / f"{youth}_audit.json"
+    bulk_file = bulk_results_file(audit_dir)
+    if bulk_file is not None:
+        # Bulk runs: seek straight to the youth's line using the offset index
+        index_path = bulk_file.with_name(RESULTS_INDEX)
+        entry = _read_index(str(index_path), _mtime_ns(index_path)).get(youth)
+        return read_indexed_result(bulk_file, *entry) if entry else None
+
+    mtime_ns = _mtime_ns(path)
+    if mtime_ns is not None:
+        return _read_youth(str(path), mtime_ns)
+
+    # Columnar-only runs have no per-youth JSON
+    store_dir = Path(audit_dir) / "store"
+    if store_dir.exists():
+        return load_result(store_dir, youth)
+    return None
@@ -1,3 +1,4 @@
+import argparse
 import json
 import random
 import shutil
@@ -5,8 +6,10 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import csv
 
-# Configurable parameters
+# Defaults; each can be overridden on the command line (see --help)
 YOUTH_COUNT = 100
+FIRST_YEAR = 2024
+YEARS = 1
 RAW_LOG_DIR = Path("data/raw_logs")
 AUDIT_RESULT_DIR = Path("data/audit_results")
 GEN_LOG_CSV = Path("data/audit_results/file_generation_log.csv")
@@ -21,7 +24,8 @@ MISSING_CHANCE = 1 / 50  # 2% chance
 MISSING_OTHER_PERCENT = 0.15
 JUNK_FILE_RATE = 0.05
 
-START_DATE_RANGE = (datetime(2024, 1, 1), datetime(2024, 3, 1))
+def start_date_range(first_year):
+    return datetime(first_year, 1, 1), datetime(first_year, 3, 1)
 
 # Expanded lists with more names (example with 20 names each; add more as needed)
 FIRST_NAMES = [
@@ -35,10 +39,17 @@ LAST_NAMES = [
     "Robinson", "Clark", "Lewis", "Lee"
 ]
 
-MONTHS = [datetime(2024, m, 1).strftime('%B') for m in range(2, 13)]
+NAME_COMBINATIONS = len(FIRST_NAMES) * len(LAST_NAMES)
 
-def clear_old_data():
-    for path in [RAW_LOG_DIR, AUDIT_RESULT_DIR]:
+def ipp_months(first_year, years):
+    """IPP update labels: February-December of the first year, then every month of later years."""
+    months = [datetime(first_year, m, 1).strftime('%B') for m in range(2, 13)]
+    for year in range(first_year + 1, first_year + years):
+        months += [datetime(year, m, 1).strftime('%B %Y') for m in range(1, 13)]
+    return months
+
+def clear_old_data(paths=(RAW_LOG_DIR, AUDIT_RESULT_DIR)):
+    for path in paths:
         if path.exists():
             shutil.rmtree(path)
         path.mkdir(parents=True, exist_ok=True)
@@ -48,9 +59,12 @@ def random_date(start, end):
 
 def generate_name(existing_names):
     """Generate a unique youth name by randomly combining first and last names.
-    Repeats until a unique name is found."""
+    Repeats until a unique name is found. Once every combination is taken, a
+    running number is appended instead (e.g. JordanSmith412)."""
     while True:
         name = f"{random.choice(FIRST_NAMES)}{random.choice(LAST_NAMES)}"
+        if len(existing_names) >= NAME_COMBINATIONS:
+            name = f"{name}{len(existing_names)}"
         if name not in existing_names:
             existing_names.add(name)
             return name
@@ -68,12 +82,13 @@ def maybe_misname(filename):
             return " ".join(parts)
     return filename
 
-def generate_weekly_files(youth, start_date, label, per_week, ext=".docx", every_other=False, log_writer=None):
+def generate_weekly_files(youth, start_date, label, per_week, ext=".docx", every_other=False, log_writer=None,
+                          end_date=datetime(2024, 12, 31), missing_chance=MISSING_CHANCE, misname_chance=MISNAME_CHANCE):
     current = start_date
     week_counter = 0
     filenames = []
 
-    while current <= datetime(2024, 12, 31):
+    while current <= end_date:
         if every_other and week_counter % 2 != 0:
             current += timedelta(days=7)
             week_counter += 1
@@ -86,13 +101,13 @@ def generate_weekly_files(youth, start_date, label, per_week, ext=".docx", every
             original_name = f"{youth} {label} {day.strftime('%Y-%m-%d')}{ext}"
             status = "valid"
 
-            if label == "GT" and random.random() < MISSING_CHANCE:
+            if label == "GT" and random.random() < missing_chance:
                 status = "skipped"
                 if log_writer:
                     log_writer.writerow([youth, label, day.strftime('%Y-%m-%d'), "", status])
                 continue
 
-            if label == "GT" and random.random() < MISNAME_CHANCE:
+            if label == "GT" and random.random() < misname_chance:
                 misnamed = maybe_misname(original_name)
                 filenames.append(misnamed)
                 status = "misnamed"
@@ -108,64 +123,108 @@ def generate_weekly_files(youth, start_date, label, per_week, ext=".docx", every
 
     return filenames
 
-def generate_ipp_filenames(youth):
+def generate_ipp_filenames(youth, months, missing_percent=MISSING_OTHER_PERCENT):
     filenames = []
     initial = f"{youth} Ipp Initial.pdf"
-    if random.random() > MISSING_OTHER_PERCENT:
+    if random.random() > missing_percent:
         filenames.append(initial)
 
-    for month in MONTHS:
+    for month in months:
         update = f"{youth} IPP {month}.pdf"
-        if random.random() > MISSING_OTHER_PERCENT:
+        if random.random() > missing_percent:
             filenames.append(update)
 
     return filenames
 
-def generate_junk_files(youth):
+def generate_junk_files(youth, junk_rate=JUNK_FILE_RATE):
     junk_names = [
         f"{youth}_junk1.docx",
         f"{youth}-old.doc",
         f"{youth}_backup.txt",
         f"{youth}_archive_copy.pdf"
     ]
-    return random.sample(junk_names, k=int(len(junk_names) * JUNK_FILE_RATE))
+    return random.sample(junk_names, k=int(len(junk_names) * junk_rate))
+
+def generate_youth(existing_names, args, months, log_writer=None):
+    youth = generate_name(existing_names)
+    level = random.choice(SECURITY_LEVELS)
+    start_date = random_date(*start_date_range(args.first_year))
+    end_date = datetime(args.first_year + args.years - 1, 12, 31)
+    rates = {"end_date": end_date, "missing_chance": args.missing_rate, "misname_chance": args.misname_rate}
+
+    gt_files = generate_weekly_files(youth, start_date, "GT", GT_SESSIONS_PER_WEEK[level], log_writer=log_writer, **rates)
+    it_files = generate_weekly_files(youth, start_date, "IT", IT_FREQUENCY, **rates)
+    ft_files = generate_weekly_files(youth, start_date, "FT", FT_FREQUENCY, every_other=True, **rates)
+    ipp_files = generate_ipp_filenames(youth, months, args.missing_other_rate)
+    junk_files = generate_junk_files(youth, args.junk_rate)
+
+    final_files = gt_files + it_files + ft_files + ipp_files + junk_files
+
+    return {
+        "youth": youth,
+        "security_level": level,
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "files": sorted(final_files)
+    }
+
+def generate_logs(args, log_writer=None):
+    """Write args.youths raw logs, spread round-robin over args.shards subdirectories when > 1."""
+    random.seed(args.seed)
+    months = ipp_months(args.first_year, args.years)
+    shard_dirs = [args.raw_logs_dir]
+    if args.shards > 1:
+        shard_dirs = [args.raw_logs_dir / f"shard_{i:02d}" for i in range(args.shards)]
+    for shard_dir in shard_dirs:
+        shard_dir.mkdir(parents=True, exist_ok=True)
+
+    existing_names = set()  # To track and ensure unique youth names
+    for i in range(args.youths):
+        json_data = generate_youth(existing_names, args, months, log_writer)
+        with open(shard_dirs[i % len(shard_dirs)] / f"{json_data['youth']}.json", "w") as f:
+            json.dump(json_data, f, indent=None if args.compact else 2)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic youth therapy logs.")
+    parser.add_argument("--youths", type=int, default=YOUTH_COUNT, help="number of youth logs")
+    parser.add_argument("--first-year", type=int, default=FIRST_YEAR, help="year the youths start in")
+    parser.add_argument("--years", type=int, default=YEARS, help="years of sessions per youth")
+    parser.add_argument("--misname-rate", type=float, default=MISNAME_CHANCE, help="chance a GT note is misnamed")
+    parser.add_argument("--missing-rate", type=float, default=MISSING_CHANCE, help="chance a GT session has no note")
+    parser.add_argument("--missing-other-rate", type=float, default=MISSING_OTHER_PERCENT,
+                        help="chance an IPP document is missing")
+    parser.add_argument("--junk-rate", type=float, default=JUNK_FILE_RATE, help="share of junk files per youth")
+    parser.add_argument("--seed", type=int, help="random seed, for reproducible data sets")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="split the logs over this many shard_NN/ subdirectories (each one a --logs-dir)")
+    parser.add_argument("--compact", action="store_true", help="write unindented JSON (smaller, faster to load)")
+    parser.add_argument("--raw-logs-dir", type=Path, default=RAW_LOG_DIR)
+    parser.add_argument("--results-dir", type=Path, default=AUDIT_RESULT_DIR)
+    parser.add_argument("--no-clean", action="store_true",
+                        help="keep existing logs and results instead of deleting them first")
+    parser.add_argument("--no-generation-log", action="store_true",
+                        help="skip the per-file generation log CSV (large at scale)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.no_clean:
+        clear_old_data([args.raw_logs_dir, args.results_dir])
+
+    if args.no_generation_log:
+        generate_logs(args)
+        print(f"✅ Generated {args.youths} youth logs in {args.raw_logs_dir}")
+        return
 
-def main():
-    clear_old_data()
-    
     # Ensure the audit_results directory exists before writing the CSV log.
-    AUDIT_RESULT_DIR.mkdir(parents=True, exist_ok=True)
-    
-    with open(GEN_LOG_CSV, "w", newline="") as log_file:
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    gen_log_csv = args.results_dir / GEN_LOG_CSV.name
+
+    with open(gen_log_csv, "w", newline="") as log_file:
         log_writer = csv.writer(log_file)
         log_writer.writerow(["Youth", "Label", "Date", "Filename", "Status"])
-        
-        existing_names = set()  # To track and ensure unique youth names
-
-        for _ in range(YOUTH_COUNT):
-            youth = generate_name(existing_names)
-            level = random.choice(SECURITY_LEVELS)
-            start_date = random_date(*START_DATE_RANGE)
-
-            gt_files = generate_weekly_files(youth, start_date, "GT", GT_SESSIONS_PER_WEEK[level], log_writer=log_writer)
-            it_files = generate_weekly_files(youth, start_date, "IT", IT_FREQUENCY)
-            ft_files = generate_weekly_files(youth, start_date, "FT", FT_FREQUENCY, every_other=True)
-            ipp_files = generate_ipp_filenames(youth)
-            junk_files = generate_junk_files(youth)
-
-            final_files = gt_files + it_files + ft_files + ipp_files + junk_files
-
-            json_data = {
-                "youth": youth,
-                "security_level": level,
-                "start_date": start_date.strftime("%Y-%m-%d"),
-                "files": sorted(final_files)
-            }
-
-            with open(RAW_LOG_DIR / f"{youth}.json", "w") as f:
-                json.dump(json_data, f, indent=2)
+        generate_logs(args, log_writer)
 
-    print(f"✅ Generated {YOUTH_COUNT} youth logs and file generation log at {GEN_LOG_CSV}")
+    print(f"✅ Generated {args.youths} youth logs and file generation log at {gen_log_csv}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
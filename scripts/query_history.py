@@ -0,0 +1,67 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Add the project root (one level up from scripts/) to sys.path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from engine.history import AuditHistory
+
+HISTORY_DB = "data/audit_history.sqlite"
+
+def print_rows(rows):
+    if not rows:
+        print("(no rows)")
+        return
+    headers = list(rows[0])
+    print("\t".join(headers))
+    for row in rows:
+        print("\t".join(str(row[h]) for h in headers))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the SQLite audit history.")
+    parser.add_argument("--db", default=HISTORY_DB)
+    parser.add_argument("--run", help="run id (defaults to the latest run)")
+    sub = parser.add_subparsers(dest="query", required=True)
+    sub.add_parser("runs", help="list recorded runs")
+    sub.add_parser("levels", help="compliance per security level")
+    streaks = sub.add_parser("streaks", help="consecutive weeks below the GT requirement")
+    streaks.add_argument("--min-weeks", type=int, default=3)
+    streaks.add_argument("--since", help="only weeks starting on or after YYYY-MM-DD")
+    trend = sub.add_parser("trend", help="weekly GT counts for one youth")
+    trend.add_argument("youth")
+    trend.add_argument("--since")
+    over_runs = sub.add_parser("over-runs", help="compliance per run, or one youth's compliance per run")
+    over_runs.add_argument("youth", nargs="?")
+    over_runs.add_argument("--since", help="only runs started on or after YYYY-MM-DD")
+    over_runs.add_argument("--until", help="only runs started on or before YYYY-MM-DD")
+    over_runs.add_argument("--level", help="only this security level (without a youth)")
+    weeks = sub.add_parser("weeks", help="one youth's weekly GT counts as recorded by every run")
+    weeks.add_argument("youth")
+    weeks.add_argument("--since", help="only weeks starting on or after YYYY-MM-DD")
+    weeks.add_argument("--until", help="only weeks starting on or before YYYY-MM-DD")
+    args = parser.parse_args(argv)
+
+    history = AuditHistory(args.db)
+    try:
+        if args.query == "runs":
+            print_rows(history.list_runs())
+        elif args.query == "levels":
+            print_rows(history.compliance_by_level(args.run))
+        elif args.query == "streaks":
+            print_rows(history.consecutive_noncompliant(args.min_weeks, args.since, args.run))
+        elif args.query == "trend":
+            print_rows(history.youth_trend(args.youth, args.since, args.run))
+        elif args.query == "over-runs" and args.youth:
+            print_rows(history.youth_over_runs(args.youth, args.since, args.until))
+        elif args.query == "over-runs":
+            print_rows(history.compliance_over_runs(args.since, args.until, args.level))
+        elif args.query == "weeks":
+            print_rows(history.youth_weeks_over_runs(args.youth, args.since, args.until))
+    finally:
+        history.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,16 @@
-from engine.loader import load_rules, load_youth_logs
-from engine.auditor import audit_youth
-from engine.reporter import save_results_to_json, save_summary_to_csv, save_individual_csv_reports
-from engine.calendar import generate_gt_calendar
-from pathlib import Path  # Add this import
 import sys
+from pathlib import Path
+
 # Add the project root (one level up from scripts/) to sys.path
 project_root = Path(__file__).resolve().parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from engine.loader import load_rules, load_youth_logs
-
-OUTPUT_DIR = "data/audit_results"
-SUMMARY_FILE = f"{OUTPUT_DIR}/summary.csv"
-
-def main():
-    print("🔁 Loading rules and logs...")
-    rules = load_rules()
-    youth_logs = load_youth_logs()
-
-    print(f"📦 Auditing {len(youth_logs)} youth...")
-    results = [audit_youth(youth, rules) for youth in youth_logs]
+from engine.cli import main as cli_main
 
-    print("💾 Saving results...")
-    save_results_to_json(results, OUTPUT_DIR)
-    save_summary_to_csv(results, SUMMARY_FILE)
-    save_individual_csv_reports(results, OUTPUT_DIR)
-    calendar_dir = "data/audit_results/calendars"
-    for result in results:
-        generate_gt_calendar(
-            youth_name=result["youth"],
-            start_date=result["start_date"],
-            files=result["valid_gt_files"] + result["misnamed"],
-            output_dir=calendar_dir
-        )
-    print("✅ Audit complete.")
+def main(argv=None):
+    # Same as `python -m engine audit ...`
+    return cli_main(["audit", *(sys.argv[1:] if argv is None else argv)])
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
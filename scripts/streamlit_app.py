@@ -2,14 +2,29 @@ import streamlit as st
 st.set_page_config(page_title="Youth Audit Dashboard", layout="wide")
 
 import json
-import subprocess
-import os
 import re
+import sys
+import time
 import calendar
 import warnings
+from contextlib import redirect_stdout
 from datetime import datetime, timedelta
+from io import StringIO
 from pathlib import Path
 
+# Add the project root (one level up from scripts/) to sys.path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from engine.calendar_cache import DEFAULT_CACHE_BYTES, CalendarCache
+from engine.history import AuditHistory
+from engine.loader import load_rules
+from engine.pipeline import AuditJob
+
+import dashboard_data
+import generate_fake_data
+
 import pandas as pd
 import altair as alt
 from PIL import Image
@@ -20,7 +35,13 @@ warnings.filterwarnings("ignore", message="The figure layout has changed to tigh
 # Define Paths
 # -----------------------------
 AUDIT_RESULTS = Path("../data/audit_results")
-CALENDAR_DIR = AUDIT_RESULTS / "calendars"  # Folder where calendar PNGs are stored
+CALENDAR_CACHE_DIR = AUDIT_RESULTS / "calendar_cache"  # Calendars rendered on demand
+HISTORY_DB = Path("../data/audit_history.sqlite")  # Written by run_audit.py --history
+
+@st.cache_resource
+def get_calendar_cache():
+    rules = load_rules(project_root / "data/audit_rules.json")
+    return CalendarCache(CALENDAR_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES, audit_rules=rules)
 
 # -----------------------------
 # Sidebar: Navigation & Actions
@@ -29,72 +50,78 @@ st.sidebar.header("Navigation")
 page = st.sidebar.radio("Select View", ["Detailed View", "Summary Dashboard"])
 
 st.sidebar.header("Actions")
-def run_command(cmd):
-    project_root = str(Path(__file__).resolve().parent.parent)
-    env = os.environ.copy()
-    env['PYTHONPATH'] = project_root + os.pathsep + env.get('PYTHONPATH', '')
-    result = subprocess.run(
-        ["python"] + cmd,
-        cwd=project_root,
-        env=env,
-        capture_output=True,
-        text=True
-    )
-    return result
-
-if st.sidebar.button("Generate New Data"):
-    result = run_command(["scripts/generate_fake_data.py"])
-    st.sidebar.write(result.stdout)
-    st.write("Please refresh your browser to see changes.")
-
-if st.sidebar.button("Run Audit"):
-    result = run_command(["scripts/run_audit.py"])
-    st.sidebar.write("Audit Script Output:")
-    st.sidebar.write(result.stdout)
-    if result.stderr:
-        st.sidebar.error("Audit Script Errors:")
-        st.sidebar.error(result.stderr)
-    st.write("Please refresh your browser to see changes.")
+# Generated in this process; it wipes the results, so not while an audit is writing them
+if st.sidebar.button("Generate New Data", disabled="audit_job" in st.session_state):
+    output = StringIO()
+    with st.spinner("Generating logs..."), redirect_stdout(output):
+        generate_fake_data.main([
+            "--raw-logs-dir", str(project_root / "data/raw_logs"),
+            "--results-dir", str(project_root / "data/audit_results"),
+        ])
+    dashboard_data.refresh()
+    get_calendar_cache.clear()
+    st.session_state.audit_messages = [output.getvalue().strip()]
+
+# The audit runs in this process on a background thread; the page polls its progress
+if st.sidebar.button("Run Audit", disabled="audit_job" in st.session_state):
+    st.session_state.audit_job = AuditJob(
+        logs_dir=project_root / "data/raw_logs",
+        rules_path=project_root / "data/audit_rules.json",
+        output_dir=project_root / "data/audit_results",
+        lazy_calendars=True,
+    ).start()
+
+@st.fragment(run_every=0.5)
+def audit_progress():
+    audit_job = st.session_state.get("audit_job")
+    if audit_job is None:
+        return
+    if audit_job.running:
+        total = audit_job.total or 0
+        eta = f", about {audit_job.eta:.0f}s left" if audit_job.eta is not None else ""
+        st.progress(audit_job.done / total if total else 0.0,
+                    text=f"Audited {audit_job.done}/{total} youth{eta}")
+        return
+    del st.session_state.audit_job
+    if audit_job.error is not None:
+        st.session_state.audit_messages = [f"❌ Audit failed: {audit_job.error}"]
+    else:
+        dashboard_data.refresh()
+        st.session_state.audit_messages = audit_job.messages
+    st.rerun(scope="app")
+
+with st.sidebar:
+    audit_progress()
+
+if "audit_messages" in st.session_state:
+    st.sidebar.write("Audit Output:")
+    st.sidebar.write("\n\n".join(st.session_state.audit_messages))
 
 # -----------------------------
 # Detailed View Page
 # -----------------------------
 if page == "Detailed View":
     st.header("Detailed Youth Audit View")
-    audit_files = sorted(AUDIT_RESULTS.glob("*.json"))
-    youth_data = []
-    for f in audit_files:
-        if f.name.lower() == "summary.csv":
-            continue
-        try:
-            with open(f, "r") as json_file:
-                content = json.load(json_file)
-            youth_data.append((content, f))
-        except Exception as e:
-            st.error(f"Error reading {f.name}: {e}")
-
-    if not youth_data:
+    youth_names = dashboard_data.youth_names(AUDIT_RESULTS)
+    if not youth_names:
         st.warning("No audit files found. Please run the audit first.")
         st.stop()
 
-    youth_names = [entry[0].get("youth", "Unknown") for entry in youth_data]
     selected_youth = st.sidebar.selectbox("Select a Youth", youth_names)
-    selected_data = next((data for data in youth_data if data[0].get("youth", "") == selected_youth), None)
-    if selected_data is None:
+    data = dashboard_data.load_youth_detail(AUDIT_RESULTS, selected_youth)
+    if data is None:
         st.error("Selected youth data not found.")
         st.stop()
 
-    data, audit_path = selected_data
     youth_name = data.get("youth", "Unknown")
-    start_date = data.get("start_date", "2024-01-01")
-    files = data.get("files", [])
 
     st.subheader(f"Audit Details for {youth_name}")
-    calendar_path = CALENDAR_DIR / f"{youth_name}_GT_Calendar.png"
-    if calendar_path.exists():
+    try:
+        with st.spinner("Rendering calendar..."):
+            calendar_path = get_calendar_cache().get(data)
         st.image(str(calendar_path), caption="Group Therapy Calendar", use_container_width=True)
-    else:
-        st.warning("Calendar image not found. Please run the audit to generate it.")
+    except (KeyError, ValueError) as e:
+        st.warning(f"Calendar could not be rendered for {youth_name}: {e}")
 
     # st.subheader("Missing Group Therapy Weeks")
     # missing_weeks = data.get("missing_gt_weeks", [])
@@ -115,7 +142,7 @@ if page == "Detailed View":
     #     st.success("No misnamed files found.")
 
     # st.subheader("Debug Info")
-    # st.code(f"Audit file: {audit_path}")
+    # st.code(f"Audit file: {AUDIT_RESULTS / f'{youth_name}_audit.json'}")
 
 # -----------------------------
 # Summary Dashboard Page
@@ -123,36 +150,7 @@ if page == "Detailed View":
 elif page == "Summary Dashboard":
     st.header("Youth Audit Summary Dashboard")
     
-    # Function to generate summary DataFrame from JSON files
-    def generate_summary_from_json(audit_dir: Path):
-        summary_data = []
-        audit_files = sorted(audit_dir.glob("*.json"))
-        for f in audit_files:
-            if f.name.lower() == "summary.csv":
-                continue
-            try:
-                with open(f, "r") as json_file:
-                    content = json.load(json_file)
-                youth = content.get("youth", "")
-                security = content.get("security_level", "")
-                start_date_str = content.get("start_date", "")
-                files = content.get("files", [])
-                total_sessions = len(files)
-                missing_gt = sum(item.get("count", 0) for item in content.get("missing_gt_weeks", [])) if content.get("missing_gt_weeks") else 0
-                misnamed = len(content.get("misnamed", []))
-                summary_data.append({
-                    "Youth": youth,
-                    "Security Level": security,
-                    "Start Date": start_date_str,
-                    # "Total Sessions": total_sessions,   # Removed as requested
-                    "Missing GT Sessions": missing_gt,
-                    "Misnamed Files": misnamed,
-                })
-            except Exception as e:
-                st.error(f"Error reading {f.name}: {e}")
-        return pd.DataFrame(summary_data)
-
-    df_summary = generate_summary_from_json(AUDIT_RESULTS)
+    df_summary = dashboard_data.summary_table(AUDIT_RESULTS)
     if df_summary.empty:
         st.warning("No audit summary data available. Please run the audit first.")
         st.stop()
@@ -178,6 +176,20 @@ elif page == "Summary Dashboard":
     st.subheader("Detailed Youth Audit Data")
     st.dataframe(df_summary)
 
+    # Compliance streaks from the audit history, when runs have been recorded
+    if HISTORY_DB.exists():
+        st.subheader("Consecutive Weeks Out of Compliance")
+        min_weeks = st.slider("Minimum consecutive weeks", 2, 12, 3)
+        history = AuditHistory(HISTORY_DB)
+        try:
+            streaks = pd.DataFrame(history.consecutive_noncompliant(min_weeks=min_weeks))
+        finally:
+            history.close()
+        if streaks.empty:
+            st.success(f"No youth out of compliance for {min_weeks}+ consecutive weeks.")
+        else:
+            st.dataframe(streaks)
+
     # Optional: Download button for the summary table
     csv_data = df_summary.to_csv(index=False).encode('utf-8')
     st.download_button(
@@ -185,4 +197,4 @@ elif page == "Summary Dashboard":
         data=csv_data,
         file_name='youth_audit_summary_generated.csv',
         mime='text/csv'
-    )
\ No newline at end of file
+    )